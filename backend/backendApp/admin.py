@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Player, SeasonStat, PlayerGameStat
+from .models import Player, SeasonStat, PlayerGameStat, PlayerFeatures
 
 # Register your models here.
 @admin.register(Player)
@@ -17,4 +17,7 @@ class PlayerGameStatAdmin(admin.ModelAdmin):
     list_display = ('player', 'game_date', 'game_type', 'team', 'opponent', 'win', 'home', 'minutes', 'points', 'assists', 'blocks', 'steals', 'fg_percent', 'threepa', 'threep', 'threep_percent', 'fta', 'ft', 'ft_percent', 'total_rebounds', 'personal_fouls', 'turnovers')
     list_filter = ('player', 'team', 'game_date')
 
-
+@admin.register(PlayerFeatures)
+class PlayerFeaturesAdmin(admin.ModelAdmin):
+    list_display = ('player', 'last_game_date', 'avg_minutes_last5', 'avg_points_last5', 'avg_did_play_last10', 'updated_at')
+    search_fields = ('player__name',)
@@ -0,0 +1,137 @@
+# merges concurrent prediction requests into one model call
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+from django.conf import settings
+
+
+class PredictionCoalescer:
+    """
+    Collects feature rows from concurrent requests and scores them with one predict call.
+
+    A request submits its rows and waits on a Future. A single collector thread takes
+    the first queued request, keeps collecting for up to `window_ms` or until
+    `max_batch` rows are waiting, runs one predict per model bundle in the group and
+    hands every request its slice of the output. Forest predict cost is dominated by
+    per-call dispatch, so a batch of N rows costs far less than N single-row calls.
+
+    Works from threads (predict() blocks) and from async views (predict_async() awaits
+    the same Future). The thread starts lazily in the process that uses it.
+    """
+
+    def __init__(self, window_ms=2, max_batch=256):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread_pid = None
+
+    def submit(self, bundle, features):
+        self._start()
+        future = Future()
+        self._queue.put((bundle, features, future))
+        return future
+
+    def predict(self, bundle, features):
+        return self.submit(bundle, features).result()
+
+    async def predict_async(self, bundle, features):
+        return await asyncio.wrap_future(self.submit(bundle, features))
+
+    def stats(self):
+        return {
+            'window_ms': self.window * 1000,
+            'max_batch': self.max_batch,
+            'batches': self.batches,
+            'requests': self.requests,
+            'requests_per_batch': self.requests / self.batches if self.batches else None,
+        }
+
+    def _start(self):
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid != os.getpid():
+                # a forked worker gets a fresh queue; the parent's collector isn't running here
+                self._queue = queue.Queue()
+                threading.Thread(target=self._run, name='prediction-coalescer', daemon=True).start()
+                self._thread_pid = os.getpid()
+
+    def _run(self):
+        while True:
+            group = [self._queue.get()]
+            rows = len(group[0][1])
+            deadline = time.monotonic() + self.window
+            while rows < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                group.append(item)
+                rows += len(item[1])
+            try:
+                self._score(group)
+            except Exception as e:
+                # the collector must outlive any batch; its waiters get the error
+                print(f"Prediction coalescer batch failed: {e}")
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _score(self, group):
+        # a model reload can leave requests for the old and the new bundle in one group;
+        # a request whose caller gave up (a cancelled predict_async) is dropped, and the
+        # rest are marked running so they can no longer be cancelled
+        by_bundle = {}
+        for item in group:
+            if item[2].set_running_or_notify_cancel():
+                by_bundle.setdefault(id(item[0]), []).append(item)
+
+        for items in by_bundle.values():
+            bundle = items[0][0]
+            try:
+                predictions = bundle.predict(np.vstack([features for _, features, _ in items]))
+            except Exception as e:
+                for _, _, future in items:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for _, features, future in items:
+                future.set_result(predictions[start:start + len(features)])
+                start += len(features)
+            self.batches += 1
+            self.requests += len(items)
+
+
+_coalescer = None
+
+
+def get_coalescer():
+    """The process-wide coalescer, or None when PREDICTION_COALESCE_WINDOW_MS is 0."""
+    global _coalescer
+    if not settings.PREDICTION_COALESCE_WINDOW_MS:
+        return None
+    if _coalescer is None:
+        _coalescer = PredictionCoalescer(
+            window_ms=settings.PREDICTION_COALESCE_WINDOW_MS,
+            max_batch=settings.PREDICTION_COALESCE_MAX_BATCH,
+        )
+    return _coalescer
+
+
+def predictor(bundle):
+    """The `predict` callable for cached_predict_items: coalesced when enabled, else None."""
+    coalescer = get_coalescer()
+    if coalescer is None:
+        return None
+    return lambda features: coalescer.predict(bundle, features)
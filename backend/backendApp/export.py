@@ -0,0 +1,194 @@
+# streaming bulk export of PlayerGameStat (CSV / NDJSON / Parquet) in bounded memory
+import csv
+import datetime
+import io
+import json
+
+from django.conf import settings
+from django.db import models
+
+from .models import PlayerGameStat
+from .names import normalize_name
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: parquet exports are only offered when pyarrow is installed
+    pa = pq = None
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+PARQUET = 'parquet'
+EXPORT_FORMATS = (CSV, NDJSON) + ((PARQUET,) if pa is not None else ())
+CONTENT_TYPES = {
+    CSV: 'text/csv; charset=utf-8',
+    NDJSON: 'application/x-ndjson',
+    PARQUET: 'application/vnd.apache.parquet',
+}
+
+
+def export_columns():
+    """(column name, values_list lookup, model field) for every exported column; the player's name follows player_id."""
+    columns = []
+    for field in PlayerGameStat._meta.concrete_fields:
+        columns.append((field.attname, field.attname, field))
+        if field.name == 'player':
+            columns.append(('player_name', 'player__name', field.related_model._meta.get_field('name')))
+    return columns
+
+
+def export_queryset(start=None, end=None, team=None, player=None):
+    """
+    The games to export. start/end bound game_date (inclusive), team matches either
+    case, and player is a player id or a name (accents and case ignored).
+    """
+    games = PlayerGameStat.objects.all()
+    if start is not None:
+        games = games.filter(game_date__gte=start)
+    if end is not None:
+        games = games.filter(game_date__lte=end)
+    if team:
+        games = games.filter(team__iexact=team)
+    if player is not None:
+        if isinstance(player, int) or str(player).isdigit():
+            games = games.filter(player_id=int(player))
+        else:
+            games = games.filter(player__normalized_name=normalize_name(player))
+    return games
+
+
+def parse_export_filters(params):
+    """export_queryset kwargs from query parameters / command options; ValueError on a bad date."""
+    filters = {}
+    for key in ('start', 'end'):
+        value = params.get(key)
+        if value:
+            try:
+                filters[key] = datetime.date.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f'{key} must be a date (YYYY-MM-DD)')
+    for key in ('team', 'player'):
+        if params.get(key):
+            filters[key] = params[key]
+    return filters
+
+
+def export_chunks(queryset, chunk_size=None):
+    """
+    Lists of value tuples (export_columns order), at most chunk_size rows each, in pk order.
+
+    Each chunk is its own query continuing after the last pk seen (pk > last), so memory
+    holds one chunk at a time on every backend. QuerySet.iterator(chunk_size) doesn't
+    give that on MySQL: the driver reads the whole result set into memory first.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    lookups = [lookup for _, lookup, _ in export_columns()]
+    queryset = queryset.order_by('pk').values_list(*lookups)
+    last = None
+    while True:
+        chunk = queryset if last is None else queryset.filter(pk__gt=last)
+        rows = list(chunk[:chunk_size])
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1][0]
+
+
+def stream_export(fmt, queryset, chunk_size=None, progress=None):
+    """
+    The export as an iterable of str (csv, ndjson) or bytes (parquet) pieces, one per
+    chunk, for a StreamingHttpResponse or a file. progress(rows) is called per chunk.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'format must be one of {list(EXPORT_FORMATS)}')
+    chunks = export_chunks(queryset, chunk_size)
+    if progress is not None:
+        chunks = _counted(chunks, progress)
+    if fmt == CSV:
+        return _csv(chunks)
+    if fmt == NDJSON:
+        return _ndjson(chunks)
+    return _parquet(chunks)
+
+
+def _counted(chunks, progress):
+    for rows in chunks:
+        progress(len(rows))
+        yield rows
+
+
+def _csv(chunks):
+    names = [name for name, _, _ in export_columns()]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    yield buffer.getvalue()
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+def _ndjson(chunks):
+    names = [name for name, _, _ in export_columns()]
+    encode = json.JSONEncoder(separators=(',', ':'), default=str).encode
+    for rows in chunks:
+        yield ''.join(encode(dict(zip(names, row))) + '\n' for row in rows)
+
+
+class _ChunkSink:
+    # the file object ParquetWriter writes to; drained after each row group
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def parquet_type(field):
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.DateField) and not isinstance(field, models.DateTimeField):
+        return pa.date32()
+    if isinstance(field, (models.IntegerField, models.AutoField, models.ForeignKey)):
+        return pa.int64()
+    return pa.string()
+
+
+def _parquet(chunks):
+    # one row group per chunk; the footer comes when the writer closes
+    columns = export_columns()
+    schema = pa.schema([(name, parquet_type(field)) for name, _, field in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in chunks:
+            values = list(zip(*rows))
+            writer.write_batch(pa.record_batch(
+                [pa.array(column, type=schema.field(i).type) for i, column in enumerate(values)], schema=schema,
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
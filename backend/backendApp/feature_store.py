@@ -0,0 +1,51 @@
+# materialized per-player model features (PlayerFeatures), refreshed at ingestion time
+import math
+
+from .models import PlayerFeatures
+from .prediction import STORED_FEATURES, recent_games
+from ml_models.data_preperation import upcoming_game_features
+
+REFRESH_CHUNK = 500
+
+
+def compute_player_features(player_ids):
+    """Unsaved PlayerFeatures rows for the given players, computed from their recent games."""
+    history = recent_games(player_ids)
+    player_ids = sorted(history)
+    if not player_ids:
+        return []
+
+    rows = []
+    for player_id in player_ids:
+        games = history[player_id]
+        # same computation as an upcoming game with no date given
+        _, averages, did_play = upcoming_game_features(games)
+        values = averages.tolist() + [did_play]
+        rows.append(PlayerFeatures(
+            player_id=player_id,
+            last_game_date=games[0][0],
+            **{field: None if math.isnan(value) else value for field, value in zip(STORED_FEATURES, values)},
+        ))
+    return rows
+
+
+def refresh_player_features(player_ids):
+    """Recompute and upsert the stored features of players whose games changed."""
+    player_ids = sorted(set(player_ids))
+    refreshed = 0
+    for start in range(0, len(player_ids), REFRESH_CHUNK):
+        chunk = player_ids[start:start + REFRESH_CHUNK]
+        rows = compute_player_features(chunk)
+        PlayerFeatures.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['player'],
+            update_fields=['last_game_date', 'updated_at'] + STORED_FEATURES,
+        )
+
+        # players left without any games drop out of the store
+        stale = set(chunk) - {row.player_id for row in rows}
+        if stale:
+            PlayerFeatures.objects.filter(player_id__in=stale).delete()
+        refreshed += len(rows)
+    return refreshed
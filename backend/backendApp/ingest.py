@@ -0,0 +1,421 @@
+# reading, cleaning and set-based ingestion of Kaggle box-score rows (daily_update.update_database),
+# and the set-based player / upsert helpers the import commands share
+import math
+
+import numpy as np
+import pandas as pd
+from django.db import connections, transaction
+
+from .models import Player, PlayerGameStat
+from .names import normalize_name
+
+GAME_BATCH_SIZE = 2000
+# a player's team only follows games of these types (not the All-Star game or preseason)
+NON_TEAM_GAME_TYPES = ('All-Star Game', 'Pre Season', 'Preseason', '')
+
+# PlayerGameStat field -> column of the cleaned Kaggle frame
+FLOAT_COLUMNS = {
+    'minutes': 'numMinutes',
+    'points': 'points',
+    'assists': 'assists',
+    'blocks': 'blocks',
+    'steals': 'steals',
+    'fg_percent': 'fieldGoalsPercentage',
+    'threepa': 'threePointersAttempted',
+    'threep': 'threePointersMade',
+    'threep_percent': 'threePointersPercentage',
+    'fta': 'freeThrowsAttempted',
+    'ft': 'freeThrowsMade',
+    'ft_percent': 'freeThrowsPercentage',
+    'total_rebounds': 'reboundsTotal',
+    'personal_fouls': 'foulsPersonal',
+    'turnovers': 'turnovers',
+}
+INT_COLUMNS = {'win': 'win', 'home': 'home'}
+
+# the PlayerStatistics.csv columns the ingest uses, with the dtype each ends up as;
+# the rest of the file (ids, labels, plus/minus, ...) is skipped while reading
+TEXT_COLUMNS = [
+    'firstName', 'lastName', 'gameDateTimeEst', 'gameType',
+    'playerteamCity', 'playerteamName', 'opponentteamCity', 'opponentteamName',
+    'numMinutes',  # MM:SS or decimal, parsed by clean_dataset
+]
+READ_NUMERIC_COLUMNS = list(INT_COLUMNS.values()) + [column for column in FLOAT_COLUMNS.values() if column not in TEXT_COLUMNS]
+READ_DTYPES = dict({column: str for column in TEXT_COLUMNS}, **{column: 'float64' for column in READ_NUMERIC_COLUMNS})
+READ_CHUNK_SIZE = 100000
+
+
+def read_player_statistics(path, since=None, engine='c', chunksize=READ_CHUNK_SIZE):
+    """
+    The raw (not yet cleaned) rows of PlayerStatistics.csv played after `since`, every
+    row when it is None.
+
+    The file is read `chunksize` rows at a time, only the READ_DTYPES columns, and each
+    chunk keeps just the rows newer than `since` (by the date clean_dataset will give
+    them) before the next is read. An incremental run holds one chunk plus the new rows
+    instead of the whole history as objects. Numeric columns aren't given a dtype up
+    front: a chunk where one holds something that isn't a number ('DNP') reads it as
+    text, and the kept rows are converted with that cell as NaN instead of the whole
+    read failing.
+    engine='pyarrow' streams the file through pyarrow's CSV reader instead (pandas'
+    pyarrow engine can't read in chunks).
+    """
+    columns = list(READ_DTYPES)
+    if engine == 'pyarrow':
+        chunks = _arrow_chunks(path, columns, chunksize)
+    else:
+        text = {column: str for column in TEXT_COLUMNS}
+        chunks = pd.read_csv(path, usecols=columns, dtype=text, chunksize=chunksize, engine=engine)
+
+    kept = []
+    for chunk in chunks:
+        if since is not None:
+            dates = pd.to_datetime(chunk['gameDateTimeEst'], errors='coerce').dt.date
+            chunk = chunk[dates > since]
+        if not chunk.empty:
+            kept.append(numeric_columns(chunk))
+    if not kept:
+        return pd.DataFrame({column: pd.Series(dtype=object if dtype is str else dtype) for column, dtype in READ_DTYPES.items()})
+    return pd.concat(kept)[columns]
+
+
+def numeric_columns(chunk):
+    """The chunk with READ_NUMERIC_COLUMNS as float64, NaN where a cell isn't a number."""
+    return chunk.assign(**{
+        column: pd.to_numeric(chunk[column], errors='coerce').astype('float64') for column in READ_NUMERIC_COLUMNS
+    })
+
+
+def _arrow_chunks(path, columns, chunksize):
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    # all text: pyarrow infers a column's type from its first block and fails on a later
+    # one that doesn't fit; _arrow_chunk converts the numeric columns
+    types = {column: pa.string() for column in columns}
+    # the reader parses ahead in blocks of its default size (1 MiB); bigger blocks cost
+    # memory, so the small batches it yields are gathered into chunks here
+    reader = pa_csv.open_csv(
+        path,
+        convert_options=pa_csv.ConvertOptions(include_columns=columns, column_types=types, strings_can_be_null=True),
+    )
+    start, batches, rows = 0, [], 0
+    for batch in reader:
+        batches.append(batch)
+        rows += len(batch)
+        if rows >= chunksize:
+            yield _arrow_chunk(batches, start)
+            start, batches, rows = start + rows, [], 0
+    if batches:
+        yield _arrow_chunk(batches, start)
+
+
+def _arrow_chunk(batches, start):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    table = pa.Table.from_batches(batches)
+    for column in READ_NUMERIC_COLUMNS:
+        # a clean column converts in arrow; one with a 'DNP' is left to numeric_columns
+        try:
+            numbers = pc.cast(table[column], pa.float64())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+        table = table.set_column(table.schema.get_field_index(column), column, numbers)
+    chunk = table.to_pandas()
+    # row labels continue across chunks, as with read_csv(chunksize=...)
+    chunk.index = pd.RangeIndex(start, start + len(chunk))
+    return chunk
+
+
+def parse_float(value):
+    if value is None:
+        return None
+    try:
+        f = float(value)
+        if math.isnan(f):
+            return None
+        return f
+    except (ValueError, TypeError):
+        return None
+
+
+def parse_minutes(value):
+    """Handle MM:SS format (e.g. '23:31'), decimals, ints, and empty strings."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    s = str(value).strip()
+    if s in ('', 'nan'):
+        return None
+    if ':' in s:
+        parts = s.split(':')
+        try:
+            return round(float(parts[0]) + float(parts[1]) / 60, 2)
+        except (ValueError, IndexError):
+            return None
+    return parse_float(s)
+
+
+TEAM_COLUMNS = ['playerteamCity', 'playerteamName', 'opponentteamCity', 'opponentteamName']
+LABEL_COLUMNS = ['gameLabel', 'gameSubLabel', 'gameType']
+NUMERIC_COLUMNS = [
+    'win', 'home', 'points', 'assists', 'blocks', 'steals',
+    'fieldGoalsAttempted', 'fieldGoalsMade', 'fieldGoalsPercentage',
+    'threePointersAttempted', 'threePointersMade', 'threePointersPercentage',
+    'freeThrowsAttempted', 'freeThrowsMade', 'freeThrowsPercentage',
+    'reboundsDefensive', 'reboundsOffensive', 'reboundsTotal',
+    'foulsPersonal', 'turnovers', 'plusMinusPoints',
+]
+# text parse_minutes / parse_float treat as missing without trying float()
+BLANK_TEXT = ('', 'nan')
+# a MM:SS value: the text before the first ':' and between it and the next one
+MINUTES_SECONDS = r'^([^:]*):([^:]*)'
+
+
+def clean_dataset(df):
+    """
+    Parse dates, strip text and parse minutes/numbers of the raw Kaggle frame, column by column.
+
+    Text is stripped once per distinct value and team/opponent columns come back
+    categorical (their strings are the same as before). Values match the old row-wise
+    rules exactly (parse_minutes for numMinutes); CleanDatasetTests checks it.
+    """
+    df['gameDateTimeEst'] = game_dates(df['gameDateTimeEst'])
+
+    for col in TEAM_COLUMNS:
+        df[col] = stripped_text(df[col], categorical=True)
+
+    for col in LABEL_COLUMNS:
+        if col in df.columns:
+            df[col] = stripped_text(df[col])
+
+    df['numMinutes'] = parse_minutes_column(df['numMinutes'])
+
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    return df
+
+
+def game_dates(values):
+    """pd.to_datetime(values, errors='coerce').dt.date, converting each distinct value once."""
+    codes, uniques = pd.factorize(values)
+    # in order of first appearance, so the format is inferred from the same value
+    stamps = pd.to_datetime(pd.Series(uniques, dtype=object), errors='coerce')
+    dates = np.append(np.array(stamps.dt.date, dtype=object), pd.NaT)  # code -1 (missing) -> NaT
+    return pd.Series(dates[codes], index=values.index)
+
+
+def text_codes(values):
+    """pd.factorize(values) with str uniques: missing values get code -1, anything else is str()'d."""
+    codes, uniques = pd.factorize(values)
+    if not all(isinstance(value, str) for value in uniques):
+        # factorize counts 1, 1.0 and True as one value, their str() differ
+        codes, uniques = pd.factorize(values.astype(object).where(values.notna()).map(str, na_action='ignore'))
+    return codes, pd.Index(uniques, dtype=object)
+
+
+def stripped_text(values, categorical=False):
+    """values.fillna('').astype(str).str.strip(), stripping each distinct value once."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # missing values have code -1, they become the '' appended last
+        codes = values.cat.codes.to_numpy()
+        uniques = pd.Index(values.cat.categories.astype(str).tolist() + [''], dtype=object)
+    else:
+        codes, uniques = text_codes(values)
+        uniques = uniques.append(pd.Index([''], dtype=object))
+    # values that only differ by whitespace become one category
+    categories, inverse = np.unique(uniques.str.strip().to_numpy(dtype=str), return_inverse=True)
+    codes = inverse[codes]
+    if categorical:
+        return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=values.index)
+    return pd.Series(categories.astype(object)[codes], index=values.index)
+
+
+def join_text(first, second, sep=' '):
+    """first + sep + second for two text columns with no missing values, joined once per distinct pair."""
+    if len(first) == 0:
+        return pd.Series([], index=first.index, dtype=object)
+    first_codes, first_uniques = pd.factorize(first)
+    second_codes, second_uniques = pd.factorize(second)
+    width = len(second_uniques)
+    pair_codes, pairs = pd.factorize(first_codes.astype(np.int64) * width + second_codes)
+    labels = np.array(
+        [f'{first_uniques[pair // width]}{sep}{second_uniques[pair % width]}' for pair in pairs], dtype=object,
+    )
+    return pd.Series(labels[pair_codes], index=first.index)
+
+
+def exact_floats(text):
+    """float() of each string as a float array, NaN where parse_float gives None."""
+    out = np.full(len(text), np.nan)
+    if not len(text):
+        return out
+    parsed = pd.to_numeric(text, errors='coerce')
+    # to_numeric finds the numbers quickly but can differ from float() in the last digit,
+    # so they are converted again with float()'s rules; the few strings it rejects
+    # that float() takes ('1_000', '1e999') go through parse_float itself
+    numbers = parsed.notna().to_numpy()
+    out[numbers] = text[numbers].astype(float).to_numpy()
+    rest = ~numbers & ~text.isin(BLANK_TEXT).to_numpy()
+    if rest.any():
+        out[rest] = [np.nan if (f := parse_float(value)) is None else f for value in text[rest]]
+    return out
+
+
+def parse_minutes_column(values):
+    """parse_minutes over a whole column (MM:SS, decimals, ints, blanks) as floats, NaN for None."""
+    if pd.api.types.is_bool_dtype(values):
+        return pd.Series(np.nan, index=values.index, name=values.name)
+    if pd.api.types.is_numeric_dtype(values):
+        # str(x) of a number parses back to x
+        return values.astype(float)
+
+    # the history repeats a few thousand distinct strings, each is parsed once;
+    # missing values (code -1) take the 'nan' appended last
+    codes, uniques = text_codes(values)
+    text = pd.Series(uniques.append(pd.Index(['nan'], dtype=object))).str.strip()
+    minutes = np.full(len(text), np.nan)
+    blank = text.isin(BLANK_TEXT).to_numpy()
+    colon = text.str.contains(':', regex=False).to_numpy() & ~blank
+    if colon.any():
+        parts = text[colon].str.extract(MINUTES_SECONDS)
+        minutes[colon] = np.round(exact_floats(parts[0]) + exact_floats(parts[1]) / 60, 2)
+    plain = ~colon & ~blank
+    minutes[plain] = exact_floats(text[plain])
+    return pd.Series(minutes[codes], index=values.index, name=values.name)
+
+
+def normalize_cities(df):
+    """'LA' -> 'Los Angeles' in the team and opponent city columns of a cleaned frame."""
+    for col in ('playerteamCity', 'opponentteamCity'):
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            labels = np.array(['Los Angeles' if c == 'LA' else c for c in values.cat.categories], dtype=object)
+            categories, inverse = np.unique(labels.astype(str), return_inverse=True)
+            df[col] = pd.Categorical.from_codes(inverse[values.cat.codes.to_numpy()], categories=categories)
+        else:
+            df.loc[values == 'LA', col] = 'Los Angeles'
+    return df
+
+
+def float_values(series):
+    """A column as floats, None where it is missing or not a number."""
+    values = pd.to_numeric(series, errors='coerce').astype(float)
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def int_values(series):
+    values = np.trunc(pd.to_numeric(series, errors='coerce').astype(float)).astype('Int64')
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def player_names(df):
+    return join_text(stripped_text(df['firstName']), stripped_text(df['lastName']))
+
+
+def load_player_map():
+    """name -> Player for every player, in one query (the first by pk when a name repeats)."""
+    players = {}
+    for player in Player.objects.order_by('pk').only('player_id', 'name', 'team'):
+        players.setdefault(player.name, player)
+    return players
+
+
+def latest_teams(names, teams, game_types):
+    """
+    name -> the team of the player's last row (in frame order) whose game type moves
+    their team, which is where the old row-by-row loop left each player.
+    """
+    counts = ~game_types.isin(NON_TEAM_GAME_TYPES)
+    return dict(zip(names[counts], teams[counts]))
+
+
+def ensure_players(names, teams, players):
+    """Create the players missing from `players` (with their latest team) and add them to it; returns how many."""
+    missing = sorted(set(names) - set(players))
+    if not missing:
+        return 0
+    # bulk_create skips save(), so normalized_name is filled in here
+    Player.objects.bulk_create([
+        Player(name=name, team=teams.get(name, ''), normalized_name=normalize_name(name)) for name in missing
+    ], batch_size=GAME_BATCH_SIZE)
+    # re-read: not every backend (MySQL) returns the new primary keys from bulk_create
+    for start in range(0, len(missing), GAME_BATCH_SIZE):
+        for player in Player.objects.filter(name__in=missing[start:start + GAME_BATCH_SIZE]).order_by('pk').only(
+            'player_id', 'name', 'team'
+        ):
+            players.setdefault(player.name, player)
+    return len(missing)
+
+
+def apply_trades(teams, players):
+    """Move players whose latest team differs from the stored one; returns (name, old team, new team) per move."""
+    moved, trades = [], []
+    for name, team in teams.items():
+        player = players[name]
+        if player.team != team:
+            trades.append((name, player.team, team))
+            player.team = team
+            moved.append(player)
+    Player.objects.bulk_update(moved, ['team'], batch_size=GAME_BATCH_SIZE)
+    return trades
+
+
+def bulk_upsert(model, objs, unique_fields, update_fields, batch_size=GAME_BATCH_SIZE):
+    """
+    INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE of objs in batches; unique_fields
+    must be a unique constraint of model. Only the last of several objs with the same
+    key is written, as consecutive update_or_create calls would leave it.
+    """
+    latest = {tuple(getattr(obj, model._meta.get_field(field).attname) for field in unique_fields): obj for obj in objs}
+    # MySQL upserts on whichever unique key conflicts and takes no conflict target
+    target = unique_fields if connections[model.objects.db].features.supports_update_conflicts_with_target else None
+    model.objects.bulk_create(
+        list(latest.values()), batch_size=batch_size,
+        update_conflicts=True, unique_fields=target, update_fields=update_fields,
+    )
+    return len(latest)
+
+
+def game_stat_objects(df, names, players):
+    """Unsaved PlayerGameStat rows built from whole columns of the cleaned frame."""
+    ids = [players[name].pk for name in names]
+    game_types = df['gameType'].fillna('').astype(str)
+    columns = {
+        'player_id': ids,
+        'game_date': df['gameDateTimeEst'].tolist(),
+        'game_type': game_types.where(game_types != '', None).tolist(),
+        'team': join_text(df['playerteamCity'], df['playerteamName']).tolist(),
+        'opponent': join_text(df['opponentteamCity'], df['opponentteamName']).tolist(),
+    }
+    columns.update({field: int_values(df[column]) for field, column in INT_COLUMNS.items()})
+    columns.update({field: float_values(df[column]) for field, column in FLOAT_COLUMNS.items()})
+    fields = list(columns)
+    return [PlayerGameStat(**dict(zip(fields, values))) for values in zip(*columns.values())]
+
+
+def ingest_game_rows(df, batch_size=GAME_BATCH_SIZE):
+    """
+    Insert cleaned box-score rows as PlayerGameStat in one transaction.
+
+    Players are matched by name against a map loaded in one query; missing ones are
+    bulk-created and team changes applied with one bulk_update (the team of each player's
+    last row of a regular-season / playoff type). Games go in with bulk_create in batches.
+    Returns (rows inserted, ids of the players whose games changed, trades, players created).
+    """
+    if df.empty:
+        return 0, set(), [], 0
+    names = player_names(df)
+    teams = latest_teams(
+        names, join_text(df['playerteamCity'], df['playerteamName']), df['gameType'].fillna('').astype(str),
+    )
+    with transaction.atomic():
+        players = load_player_map()
+        existing = set(players)
+        created = ensure_players(names, teams, players)
+        trades = apply_trades({name: team for name, team in teams.items() if name in existing}, players)
+        objs = game_stat_objects(df, names, players)
+        PlayerGameStat.objects.bulk_create(objs, batch_size=batch_size)
+    return len(objs), {obj.player_id for obj in objs}, trades, created
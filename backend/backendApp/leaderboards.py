@@ -0,0 +1,155 @@
+# materialized top-N leaderboards (LeaderboardEntry), refreshed at ingestion time
+import datetime
+import heapq
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Max, Window
+from django.db.models.functions import RowNumber
+
+from .models import LeaderboardEntry, PlayerGameStat, SeasonStat
+from .versioning import LEADERBOARDS, bump_version
+
+LEADERBOARD_SIZE = 50
+SEASON = 'season'
+ROLLING = 'rolling'
+ROLLING_KEY = 'last5'
+ROLLING_GAMES = 5
+# players whose last game is older than this many days before the newest one leave rolling boards
+ROLLING_ACTIVE_DAYS = 30
+
+# leaderboard stat -> (SeasonStat field, PlayerGameStat field)
+LEADERBOARD_STATS = {
+    'points': ('points', 'points'),
+    'rebounds': ('rebounds', 'total_rebounds'),
+    'assists': ('assists', 'assists'),
+    'steals': ('steals', 'steals'),
+    'blocks': ('blocks', 'blocks'),
+}
+
+
+def top_n(candidates, size=LEADERBOARD_SIZE):
+    """(player_id, value, games) candidates -> the best `size`, highest value first, ties by player id."""
+    return heapq.nsmallest(size, (c for c in candidates if c[1] is not None), key=lambda c: (-c[1], c[0]))
+
+
+def write_board(board, key, stat, ranked):
+    """Replace one board's rows with `ranked`; returns 1 if it changed, 0 if it was already current."""
+    current = list(
+        LeaderboardEntry.objects.filter(board=board, key=key, stat=stat)
+        .order_by('rank').values_list('rank', 'player_id', 'value', 'games')
+    )
+    # ranks are compared too: a deleted player's rows cascade away and leave a gap
+    if current == [(rank, *row) for rank, row in enumerate(ranked, start=1)]:
+        return 0
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(board=board, key=key, stat=stat).delete()
+        LeaderboardEntry.objects.bulk_create([
+            LeaderboardEntry(board=board, key=key, stat=stat, rank=rank, player_id=player_id, value=value, games=games)
+            for rank, (player_id, value, games) in enumerate(ranked, start=1)
+        ])
+    return 1
+
+
+def refresh_season_leaderboards(seasons=None):
+    """Recompute the season boards of the given seasons (every season when None); returns boards changed."""
+    if seasons is None:
+        # seasons left with no rows at all still have boards to empty
+        seasons = set(SeasonStat.objects.values_list('season', flat=True).distinct())
+        seasons.update(LeaderboardEntry.objects.filter(board=SEASON).values_list('key', flat=True).distinct())
+    fields = [field for field, _ in LEADERBOARD_STATS.values()]
+    changed = 0
+    for season in sorted(set(seasons)):
+        # a traded player has a row per team plus a combined one: keep the row with the most games
+        best = {}
+        for row in SeasonStat.objects.filter(season=season).values('player_id', 'games_played', *fields):
+            current = best.get(row['player_id'])
+            if current is None or (row['games_played'] or 0) > (current['games_played'] or 0):
+                best[row['player_id']] = row
+        for stat, (field, _) in LEADERBOARD_STATS.items():
+            ranked = top_n((player_id, row[field], row['games_played']) for player_id, row in best.items())
+            changed += write_board(SEASON, season, stat, ranked)
+    if changed:
+        bump_version(LEADERBOARDS)
+    return changed
+
+
+def refresh_rolling_leaderboards():
+    """
+    Recompute the last-5-games boards; returns boards changed.
+
+    Each active player's value is the plain average of their last ROLLING_GAMES played
+    games (minutes > 0; a missing stat is left out), read in one windowed query. These
+    aren't the model's avg_*_last5 features, which smooth over a newest game not played.
+    """
+    fields = [field for _, field in LEADERBOARD_STATS.values()]
+    newest = PlayerGameStat.objects.aggregate(newest=Max('game_date'))['newest']
+    games = defaultdict(list)
+    if newest is not None:
+        active_since = newest - datetime.timedelta(days=ROLLING_ACTIVE_DAYS)
+        recent = (
+            PlayerGameStat.objects
+            .filter(
+                minutes__gt=0,
+                player_id__in=PlayerGameStat.objects.filter(game_date__gte=active_since).values('player_id'),
+            )
+            .annotate(recent_rank=Window(
+                RowNumber(),
+                partition_by=[F('player_id')],
+                order_by=[F('game_date').desc(), F('id').desc()],
+            ))
+            .filter(recent_rank__lte=ROLLING_GAMES)
+            .values_list('player_id', *fields)
+        )
+        for player_id, *values in recent:
+            games[player_id].append(values)
+
+    changed = 0
+    for i, stat in enumerate(LEADERBOARD_STATS):
+        ranked = top_n(
+            (player_id, average(game[i] for game in rows), len(rows)) for player_id, rows in games.items()
+        )
+        changed += write_board(ROLLING, ROLLING_KEY, stat, ranked)
+    if changed:
+        bump_version(LEADERBOARDS)
+    return changed
+
+
+def average(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def refresh_all_leaderboards():
+    return refresh_season_leaderboards() + refresh_rolling_leaderboards()
+
+
+def latest_season():
+    return LeaderboardEntry.objects.filter(board=SEASON).aggregate(latest=Max('key'))['latest']
+
+
+def leaderboard(board, key, stat=None, limit=10):
+    """
+    stat -> ranked rows of one board, read in index order (board, key, stat, rank).
+
+    Each row carries the player's current name/team/position, joined at read time.
+    """
+    entries = LeaderboardEntry.objects.filter(board=board, key=key, rank__lte=limit)
+    if stat is not None:
+        entries = entries.filter(stat=stat)
+    rows = entries.order_by('stat', 'rank').values(
+        'stat', 'rank', 'value', 'games', 'player_id', 'player__name', 'player__team', 'player__position',
+    )
+    leaders = {name: [] for name in ([stat] if stat else LEADERBOARD_STATS)}
+    for row in rows:
+        leaders.setdefault(row['stat'], []).append({
+            'rank': row['rank'],
+            'player_id': row['player_id'],
+            'name': row['player__name'],
+            'team': row['player__team'],
+            'position': row['player__position'],
+            'value': row['value'],
+            'games': row['games'],
+        })
+    return leaders
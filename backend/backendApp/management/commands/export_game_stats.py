@@ -0,0 +1,47 @@
+import sys
+import time
+from django.core.management.base import BaseCommand, CommandError
+from backendApp.export import CSV, EXPORT_FORMATS, PARQUET, export_queryset, parse_export_filters, stream_export
+
+class Command(BaseCommand):
+    help = 'Stream PlayerGameStat rows to a CSV, NDJSON or Parquet file in bounded memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="File to write, or - for stdout (csv / ndjson only)")
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default=CSV)
+        parser.add_argument('--start', help='First game date (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last game date (YYYY-MM-DD)')
+        parser.add_argument('--team')
+        parser.add_argument('--player', help='Player id or name')
+        parser.add_argument('--chunk-size', type=int, help='Rows per query (default EXPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **kwargs):
+        fmt, output = kwargs['format'], kwargs['output']
+        try:
+            filters = parse_export_filters(kwargs)
+        except ValueError as e:
+            raise CommandError(str(e))
+        if output == '-' and fmt == PARQUET:
+            raise CommandError(f'{fmt} can only be written to a file')
+
+        rows = 0
+        def progress(n):
+            nonlocal rows
+            rows += n
+
+        start = time.perf_counter()
+        pieces = stream_export(fmt, export_queryset(**filters), kwargs['chunk_size'], progress=progress)
+        if output == '-':
+            for piece in pieces:
+                sys.stdout.write(piece)
+            sys.stdout.flush()
+        else:
+            with open(output, 'wb') as f:
+                for piece in pieces:
+                    f.write(piece.encode() if isinstance(piece, str) else piece)
+        elapsed = time.perf_counter() - start
+
+        # stdout may be the export itself
+        self.stderr.write(self.style.SUCCESS(
+            f'Exported {rows} rows as {fmt} in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)'
+        ))
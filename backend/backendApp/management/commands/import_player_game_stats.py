@@ -1,6 +1,14 @@
 import csv
-from django.core.management.base import BaseCommand
-from backendApp.models import Player, PlayerGameStat
+import os
+import time
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from backendApp.models import ImportCheckpoint, Player, PlayerGameStat
+from backendApp.feature_store import refresh_player_features
+from backendApp.ingest import GAME_BATCH_SIZE, ensure_players, load_player_map
+from backendApp.leaderboards import refresh_rolling_leaderboards
+from backendApp.versioning import bump_version, GAME_STATS, PLAYERS
 
 def parse_float(value):
     if value in ('', 'NA', 'N/A'):
@@ -9,46 +17,121 @@ def parse_float(value):
         return float(value)
     except ValueError:
         return None
-    
+
+def player_name(row):
+    return row['firstName'].strip() + ' ' + row['lastName'].strip()
+
+def game_stat(row, player_id):
+    return PlayerGameStat(
+        player_id = player_id,
+        game_date = row['gameDate'],
+        game_type = row['gameType'],
+        team = row['playerteamCity'] + ' ' + row['playerteamName'],
+        opponent = row['opponentteamCity'] + ' ' + row['opponentteamName'],
+        win = int(row['win']) if row['win'] else None,
+        home = int(row['home']) if row['home'] else None,
+        minutes = parse_float(row['numMinutes']),
+        points = parse_float(row['points']),
+        assists = parse_float(row['assists']),
+        blocks = parse_float(row['blocks']),
+        steals = parse_float(row['steals']),
+        fg_percent = parse_float(row['fieldGoalsPercentage']),
+        threepa = parse_float(row['threePointersAttempted']),
+        threep = parse_float(row['threePointersMade']),
+        threep_percent = parse_float(row['threePointersPercentage']),
+        fta = parse_float(row['freeThrowsAttempted']),
+        ft = parse_float(row['freeThrowsMade']),
+        ft_percent = parse_float(row['freeThrowsPercentage']),
+        total_rebounds = parse_float(row['reboundsTotal']),
+        personal_fouls = parse_float(row['foulsPersonal']),
+        turnovers = parse_float(row['turnovers']),
+    )
+
 class Command(BaseCommand):
     help = "Import player game stats from CSV file"
 
     def add_arguments(self, parser):
         parser.add_argument('csv_file', type=str, help='The path to the CSV file to import')
-    
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Bulk mode: insert this many rows per transaction and checkpoint after each, so an interrupted load resumes',
+        )
+        parser.add_argument('--restart', action='store_true', help='Bulk mode: ignore the checkpoint and start from the first row')
+
     def handle(self, *args, **kwargs):
         csv_file = kwargs['csv_file']
+        if kwargs['batch_size'] is not None:
+            if kwargs['batch_size'] < 1:
+                raise CommandError('--batch-size must be at least 1')
+            changed_players, new_players = self.bulk_import(csv_file, kwargs['batch_size'], kwargs['restart'])
+        else:
+            changed_players, new_players = self.import_rows(csv_file)
+
+        refreshed = refresh_player_features(changed_players)
+        refresh_rolling_leaderboards()
+        # the player scope only changes when the file brought new players
+        bump_version(GAME_STATS, *([PLAYERS] if new_players else []))
+        self.stdout.write(self.style.SUCCESS(f'Successfully imported player game stats (refreshed features for {refreshed} players)'))
+
+    def import_rows(self, csv_file):
+        changed_players, new_players = set(), False
         with open(csv_file, newline='', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
-                player_name = row['firstName'].strip() + ' ' + row['lastName'].strip()
-
-                player, _ = Player.objects.get_or_create(name=player_name)
-
-                PlayerGameStat.objects.create(
-                    player = player,
-                    game_date = row['gameDate'],
-                    game_type = row['gameType'],
-                    team = row['playerteamCity'] + ' ' + row['playerteamName'],
-                    opponent = row['opponentteamCity'] + ' ' + row['opponentteamName'],
-                    win = int(row['win']) if row['win'] else None,
-                    home = int(row['home']) if row['home'] else None,
-                    minutes = parse_float(row['numMinutes']),
-                    points = parse_float(row['points']),
-                    assists = parse_float(row['assists']),
-                    blocks = parse_float(row['blocks']),
-                    steals = parse_float(row['steals']),
-                    fg_percent = parse_float(row['fieldGoalsPercentage']),
-                    threepa = parse_float(row['threePointersAttempted']),
-                    threep = parse_float(row['threePointersMade']),
-                    threep_percent = parse_float(row['threePointersPercentage']),
-                    fta = parse_float(row['freeThrowsAttempted']),
-                    ft = parse_float(row['freeThrowsMade']),
-                    ft_percent = parse_float(row['freeThrowsPercentage']),
-                    total_rebounds = parse_float(row['reboundsTotal']),
-                    personal_fouls = parse_float(row['foulsPersonal']),
-                    turnovers = parse_float(row['turnovers']),
-                )
-
-        self.stdout.write(self.style.SUCCESS('Successfully imported player game stats'))
-        
+                player, created = Player.objects.get_or_create(name=player_name(row))
+                new_players |= created
+                changed_players.add(player.pk)
+                game_stat(row, player.pk).save()
+        return changed_players, new_players
+
+    def bulk_import(self, csv_file, batch_size, restart):
+        # the checkpoint is keyed by the file's path and remembers its size, so a
+        # different file at the same path isn't resumed part way through
+        path = os.path.abspath(csv_file)
+        source = f'import_player_game_stats:{path}'
+        file_size = os.path.getsize(path)
+        if restart:
+            ImportCheckpoint.objects.filter(source=source).delete()
+        checkpoint = ImportCheckpoint.objects.filter(source=source).first()
+        if checkpoint and checkpoint.file_size != file_size:
+            raise CommandError(
+                f'{csv_file} changed since {checkpoint.rows} rows of it were imported; rerun with --restart to import it from the start'
+            )
+        done = checkpoint.rows if checkpoint else 0
+
+        players = load_player_map()
+        # an interrupted run may have created players without bumping the player scope
+        changed_players, new_players = set(), bool(done)
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            if done:
+                # rows committed by an earlier run: their players still get their features refreshed
+                for row in islice(reader, done):
+                    player = players.get(player_name(row))
+                    if player is not None:
+                        changed_players.add(player.pk)
+                self.stdout.write(f'Resuming after row {done}')
+
+            start, imported = time.perf_counter(), 0
+            progress_end = '\r' if self.stdout.isatty() else '\n'
+            while batch := list(islice(reader, batch_size)):
+                names = [player_name(row) for row in batch]
+                with transaction.atomic():
+                    new_players |= ensure_players(names, {}, players) > 0
+                    PlayerGameStat.objects.bulk_create(
+                        [game_stat(row, players[name].pk) for row, name in zip(batch, names)], batch_size=GAME_BATCH_SIZE,
+                    )
+                    ImportCheckpoint.objects.update_or_create(
+                        source=source, defaults={'file_size': file_size, 'rows': done + len(batch)},
+                    )
+                done += len(batch)
+                imported += len(batch)
+                changed_players.update(players[name].pk for name in names)
+
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f'{done} rows committed ({imported / elapsed:.0f} rows/s)', ending=progress_end)
+
+        if progress_end == '\r':
+            self.stdout.write('')
+        self.stdout.write(f'Imported {imported} rows in {time.perf_counter() - start:.1f}s')
+        return changed_players, new_players
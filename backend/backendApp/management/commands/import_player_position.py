@@ -1,6 +1,7 @@
 import csv
 from django.core.management.base import BaseCommand
 from backendApp.models import Player
+from backendApp.versioning import bump_version, PLAYERS
 
 class Command(BaseCommand):
     help = 'Import player positions from a CSV file'
@@ -22,4 +23,5 @@ class Command(BaseCommand):
 
                 Player.objects.filter(name=player_name).update(position=position)
 
+        bump_version(PLAYERS)
         self.stdout.write(self.style.SUCCESS('Successfully imported player positions'))
\ No newline at end of file
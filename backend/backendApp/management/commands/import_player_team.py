@@ -1,7 +1,9 @@
 import csv
 from datetime import datetime
 from django.core.management.base import BaseCommand
-from backendApp.models import Player
+from django.db import transaction
+from backendApp.ingest import apply_trades, ensure_players, load_player_map
+from backendApp.versioning import bump_version, PLAYERS
 
 class Command(BaseCommand):
     help = 'Import player team from CSV files'
@@ -28,12 +30,14 @@ class Command(BaseCommand):
                 if player_name not in latest_entries or date > latest_entries[player_name]['date']:
                     latest_entries[player_name] = {'team': team, 'date': date}
 
-        for player_name, data in latest_entries.items():
-            Player.objects.update_or_create(
-                    name = player_name,
-                    defaults = {
-                        'team' : data['team'],
-                    }
-                )
+        # Player.name has no unique key to upsert on: the missing players are bulk-created
+        # and only the changed teams written back
+        teams = {player_name: data['team'] for player_name, data in latest_entries.items()}
+        with transaction.atomic():
+            players = load_player_map()
+            created = ensure_players(list(teams), teams, players)
+            moved = apply_trades(teams, players)
 
-        self.stdout.write(self.style.SUCCESS('Successfully imported current player teams'))
\ No newline at end of file
+        if created or moved:
+            bump_version(PLAYERS)
+        self.stdout.write(self.style.SUCCESS(f'Successfully imported current player teams ({created} new players, {len(moved)} team changes)'))
\ No newline at end of file
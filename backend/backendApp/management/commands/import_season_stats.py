@@ -1,6 +1,10 @@
 import csv
 from django.core.management.base import BaseCommand
-from backendApp.models import Player, SeasonStat
+from django.db import transaction
+from backendApp.models import SeasonStat
+from backendApp.ingest import bulk_upsert, ensure_players, load_player_map
+from backendApp.leaderboards import refresh_season_leaderboards
+from backendApp.versioning import bump_version, PLAYERS, SEASON_STATS
 
 def parse_float(value):
         if value in ('', 'NA', 'N/A'):
@@ -10,6 +14,47 @@ def parse_float(value):
         except ValueError:
             return None
 
+SEASON_STAT_FIELDS = [
+    'games_played', 'minutes', 'fg_percent', 'threep_percent', 'ft_percent', 'rebounds',
+    'assists', 'steals', 'blocks', 'turnovers', 'personal_fouls', 'points',
+]
+
+def import_season_rows(csv_file):
+    """
+    Upsert every row of the file on SeasonStat's (player, season, team); returns
+    (seasons, rows written, players created).
+    """
+    with open(csv_file, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    names = [row['player'].strip() for row in rows]
+
+    with transaction.atomic():
+        #Create the missing players first, then the season stats
+        players = load_player_map()
+        created = ensure_players(names, {}, players)
+        stats = [
+            SeasonStat(
+                player_id = players[name].pk,
+                season = row['season'].strip(),
+                team = row['team'],
+                games_played = int(row['g']),
+                minutes = parse_float(row['mp_per_game']),
+                fg_percent = parse_float(row['fg_percent']),
+                threep_percent = parse_float(row['x3p_percent']),
+                ft_percent = parse_float(row['ft_percent']),
+                rebounds = parse_float(row['trb_per_game']),
+                assists = parse_float(row['ast_per_game']),
+                steals = parse_float(row['stl_per_game']),
+                blocks = parse_float(row['blk_per_game']),
+                turnovers = parse_float(row['tov_per_game']),
+                personal_fouls = parse_float(row['pf_per_game']),
+                points = parse_float(row['pts_per_game']),
+            )
+            for row, name in zip(rows, names)
+        ]
+        written = bulk_upsert(SeasonStat, stats, ['player', 'season', 'team'], SEASON_STAT_FIELDS)
+    return {stat.season for stat in stats}, written, created
+
 class Command(BaseCommand):
     help = 'Import season stats from CSV file'
 
@@ -17,39 +62,10 @@ class Command(BaseCommand):
         parser.add_argument('csv_file', type=str, help='The path to the CSV file to import')
     
     def handle(self, *args, **kwargs):
-        csv_file = kwargs['csv_file']
-
-        with open(csv_file, newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                player_name = row['player'].strip()
-                season = row['season'].strip()
-
-                #Create or get the player first
-                player, _ = Player.objects.get_or_create(name=player_name)
-
-                #Then create the season stat
-                SeasonStat.objects.update_or_create(
-                    player = player,
-                    season = season,
-                    team = row['team'],
-
-                    defaults = {
-                        'games_played' : int(row['g']),
-                        'minutes' : parse_float(row['mp_per_game']),
-                        'fg_percent' : parse_float(row['fg_percent']),
-                        'threep_percent' : parse_float(row['x3p_percent']),
-                        'ft_percent' : parse_float(row['ft_percent']),
-                        'rebounds' : parse_float(row['trb_per_game']),
-                        'assists' : parse_float(row['ast_per_game']),
-                        'steals' : parse_float(row['stl_per_game']),
-                        'blocks' : parse_float(row['blk_per_game']),
-                        'turnovers' : parse_float(row['tov_per_game']),
-                        'personal_fouls' : parse_float(row['pf_per_game']),
-                        'points' : parse_float(row['pts_per_game']),
-                    }
-                )
-            
-        self.stdout.write(self.style.SUCCESS('Successfully imported season stats'))
-
+        seasons, written, created = import_season_rows(kwargs['csv_file'])
 
+        # only the imported seasons' boards are recomputed; the player scope only
+        # changes when the file brought new players
+        refresh_season_leaderboards(seasons)
+        bump_version(SEASON_STATS, *([PLAYERS] if created else []))
+        self.stdout.write(self.style.SUCCESS(f'Successfully imported season stats ({written} rows)'))
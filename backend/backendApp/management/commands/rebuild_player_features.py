@@ -0,0 +1,54 @@
+import math
+from django.core.management.base import BaseCommand, CommandError
+from backendApp.models import PlayerFeatures, PlayerGameStat
+from backendApp.feature_store import REFRESH_CHUNK, compute_player_features, refresh_player_features
+from backendApp.leaderboards import refresh_rolling_leaderboards
+from backendApp.prediction import STORED_FEATURES
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored per-player features from PlayerGameStat, or check them against a full recompute'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only compare the stored table with a full recompute')
+
+    def handle(self, *args, **kwargs):
+        player_ids = sorted(set(PlayerGameStat.objects.values_list('player_id', flat=True)))
+
+        if not kwargs['check']:
+            refreshed = refresh_player_features(player_ids)
+            removed, _ = PlayerFeatures.objects.exclude(player_id__in=player_ids).delete()
+            refresh_rolling_leaderboards()
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt features for {refreshed} players ({removed} stale rows removed)'
+            ))
+            return
+
+        mismatched = []
+        missing = []
+        for start in range(0, len(player_ids), REFRESH_CHUNK):
+            expected = compute_player_features(player_ids[start:start + REFRESH_CHUNK])
+            stored = PlayerFeatures.objects.in_bulk([row.player_id for row in expected])
+            for row in expected:
+                current = stored.get(row.player_id)
+                if current is None:
+                    missing.append(row.player_id)
+                elif not self.matches(current, row):
+                    mismatched.append(row.player_id)
+        extra = PlayerFeatures.objects.exclude(player_id__in=player_ids).count()
+
+        if missing or mismatched or extra:
+            raise CommandError(
+                f'Stored features are out of date: {len(missing)} missing, {len(mismatched)} stale, '
+                f'{extra} without games (stale player ids: {mismatched[:20]})'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Stored features match a full recompute for {len(player_ids)} players'))
+
+    @staticmethod
+    def matches(stored, expected):
+        if stored.last_game_date != expected.last_game_date:
+            return False
+        for field in STORED_FEATURES:
+            a, b = getattr(stored, field), getattr(expected, field)
+            if (a is None) != (b is None) or (a is not None and not math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)):
+                return False
+        return True
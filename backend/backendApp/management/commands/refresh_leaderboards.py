@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from backendApp.leaderboards import refresh_rolling_leaderboards, refresh_season_leaderboards
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed leaderboards (ingestion keeps them current; use after a bulk load or restore)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', action='append', help='Only this season (repeatable); default every season')
+
+    def handle(self, *args, **kwargs):
+        seasons = kwargs['season']
+        season_boards = refresh_season_leaderboards(seasons)
+        rolling_boards = refresh_rolling_leaderboards() if not seasons else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Rewrote {season_boards} season and {rolling_boards} rolling leaderboards'
+        ))
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backendApp", "0006_alter_player_position"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerFeatures",
+            fields=[
+                (
+                    "player",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="features",
+                        serialize=False,
+                        to="backendApp.player",
+                    ),
+                ),
+                ("last_game_date", models.DateField()),
+                ("avg_minutes_last5", models.FloatField(blank=True, null=True)),
+                ("avg_points_last5", models.FloatField(blank=True, null=True)),
+                ("avg_assists_last5", models.FloatField(blank=True, null=True)),
+                ("avg_blocks_last5", models.FloatField(blank=True, null=True)),
+                ("avg_steals_last5", models.FloatField(blank=True, null=True)),
+                ("avg_fg_percent_last5", models.FloatField(blank=True, null=True)),
+                ("avg_threepa_last5", models.FloatField(blank=True, null=True)),
+                ("avg_threep_last5", models.FloatField(blank=True, null=True)),
+                ("avg_threep_percent_last5", models.FloatField(blank=True, null=True)),
+                ("avg_fta_last5", models.FloatField(blank=True, null=True)),
+                ("avg_ft_last5", models.FloatField(blank=True, null=True)),
+                ("avg_ft_percent_last5", models.FloatField(blank=True, null=True)),
+                ("avg_total_rebounds_last5", models.FloatField(blank=True, null=True)),
+                ("avg_personal_fouls_last5", models.FloatField(blank=True, null=True)),
+                ("avg_turnovers_last5", models.FloatField(blank=True, null=True)),
+                ("avg_did_play_last10", models.FloatField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
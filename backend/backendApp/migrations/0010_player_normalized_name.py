@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+from backendApp.names import normalize_name
+
+
+def backfill_normalized_names(apps, schema_editor):
+    Player = apps.get_model("backendApp", "Player")
+    players = list(Player.objects.only("pk", "name"))
+    for player in players:
+        player.normalized_name = normalize_name(player.name)
+    Player.objects.bulk_update(players, ["normalized_name"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backendApp", "0008_dataversion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="player",
+            name="normalized_name",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=100
+            ),
+        ),
+        migrations.RunPython(backfill_normalized_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backendApp", "0010_player_normalized_name"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="playergamestat",
+            index=models.Index(fields=["game_date", "id"], name="gamestat_date_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="seasonstat",
+            index=models.Index(
+                fields=["season", "id"], name="seasonstat_season_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backendApp", "0011_stats_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="playergamestat",
+            index=models.Index(
+                fields=["player", "-game_date"], name="gamestat_player_recent_idx"
+            ),
+        ),
+    ]
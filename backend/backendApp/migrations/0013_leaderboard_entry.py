@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backendApp", "0012_player_recent_games_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("board", models.CharField(max_length=20)),
+                ("key", models.CharField(max_length=20)),
+                ("stat", models.CharField(max_length=30)),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("value", models.FloatField()),
+                ("games", models.IntegerField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="backendApp.player",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("board", "key", "stat", "rank"),
+                        name="leaderboard_position",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backendApp", "0014_import_checkpoint"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="playergamestat",
+            index=models.Index(fields=["points", "id"], name="gamestat_points_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="playergamestat",
+            index=models.Index(
+                fields=["total_rebounds", "id"], name="gamestat_rebounds_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="playergamestat",
+            index=models.Index(
+                fields=["assists", "id"], name="gamestat_assists_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="playergamestat",
+            index=models.Index(fields=["steals", "id"], name="gamestat_steals_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="playergamestat",
+            index=models.Index(fields=["blocks", "id"], name="gamestat_blocks_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="seasonstat",
+            index=models.Index(
+                fields=["points", "id"], name="seasonstat_points_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seasonstat",
+            index=models.Index(
+                fields=["rebounds", "id"], name="seasonstat_rebounds_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seasonstat",
+            index=models.Index(
+                fields=["assists", "id"], name="seasonstat_assists_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seasonstat",
+            index=models.Index(
+                fields=["steals", "id"], name="seasonstat_steals_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seasonstat",
+            index=models.Index(
+                fields=["blocks", "id"], name="seasonstat_blocks_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,151 @@
+# reloads the prediction model when its file changes, without restarting the server
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from django.db import connections
+
+from ml_models.model_io import file_version
+
+
+class ModelWatcher:
+    """
+    Holds the served model bundle and swaps in a new one when the model file changes.
+
+    A daemon thread polls the file every `interval` seconds. A change in mtime/size/inode
+    that also changes the content hash is loaded in that thread, warmed up with one test
+    prediction and only then assigned to `bundle`. Requests read `bundle` once, so the ones
+    already running finish on the old model. A file that fails to load is logged and
+    skipped until it changes again; the current model keeps serving.
+
+    A model downloaded from a hub never changes in place: `resolve` is then called on
+    every check to find the file of the newest published version (a new path when there
+    is one), and `source` names where it comes from in status().
+
+    Threads don't survive fork, so the thread is started lazily by `start()` in the
+    process that serves requests (each gunicorn worker), not when the model is preloaded.
+    """
+
+    def __init__(self, path, load, interval=60, resolve=None, source=None):
+        self.path = path
+        self.load = load
+        self.interval = interval
+        self.resolve = resolve
+        self.source = source
+        self.bundle = None
+        self.file_hash = None
+        self.loaded_at = None
+        self.reload_count = 0
+        self.last_checked = None
+        self.last_error = None
+        self._signature = None
+        self._failed_signature = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+
+    def load_initial(self):
+        self._signature = self.signature()
+        self.file_hash = file_version(self.path)
+        self.bundle = self.load(self.path)
+        self.loaded_at = now()
+        return self.bundle
+
+    def start(self):
+        """Start polling in this process, once; a no-op when reloading is disabled."""
+        if not self.interval or self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def signature(self, path=None):
+        stat = os.stat(path or self.path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def check(self):
+        """Reload the model if its file changed. Returns True when a new model was swapped in."""
+        self.last_checked = now()
+        path = self.path
+        if self.resolve is not None:
+            try:
+                path = self.resolve()
+            except Exception as e:
+                # hub unreachable; keep serving what we have and try again next time
+                self.last_error = f'{type(e).__name__}: {e}'
+                print(f"Model check against {self.source} failed, still serving {self.version}: {self.last_error}")
+                return False
+        try:
+            signature = self.signature(path)
+        except OSError:
+            # mid-replace or removed; keep serving what we have
+            return False
+        if signature in (self._signature, self._failed_signature):
+            return False
+
+        try:
+            file_hash = file_version(path)
+            if file_hash == self.file_hash:
+                self.path = path
+                self._signature = signature
+                return False
+
+            bundle = self.load(path)
+            bundle.predict(np.zeros((1, len(bundle.feature_cols))))
+        except Exception as e:
+            self._failed_signature = signature
+            self.last_error = f'{type(e).__name__}: {e}'
+            print(f"Model reload from {path} failed, still serving {self.version}: {self.last_error}")
+            return False
+        finally:
+            # legacy models read the opponent list; don't leave this thread's connection open
+            connections.close_all()
+
+        previous = self.version
+        self.path = path
+        self.bundle = bundle
+        self.file_hash = file_hash
+        self._signature = signature
+        self.loaded_at = now()
+        self.reload_count += 1
+        self.last_error = None
+        print(f"Reloaded model from {self.path}: {previous} -> {bundle.version}")
+        return True
+
+    @property
+    def version(self):
+        return self.bundle.version if self.bundle is not None else None
+
+    def status(self):
+        bundle = self.bundle
+        return {
+            'version': self.version,
+            'path': self.path,
+            'source': self.source or self.path,
+            'loaded_at': self.loaded_at,
+            'reload_count': self.reload_count,
+            'reload_interval': self.interval,
+            'watching': self._thread_pid == os.getpid() and self._thread.is_alive(),
+            'last_checked': self.last_checked,
+            'last_error': self.last_error,
+            'watermark': bundle.watermark if bundle is not None else None,
+            'metrics': bundle.metrics if bundle is not None else None,
+            'pid': os.getpid(),
+        }
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Model watcher error: {e}")
+
+
+def now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
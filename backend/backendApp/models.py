@@ -1,11 +1,21 @@
 from os import name
 from django.db import models
+from .names import normalize_name
 
 class Player(models.Model):
     player_id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=100)
     position = models.CharField(max_length=100)
     team = models.CharField(max_length=50)
+    # indexed lookup form of name (see names.normalize_name), kept in sync by save()
+    normalized_name = models.CharField(max_length=100, db_index=True, editable=False, default='')
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'normalized_name'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
@@ -31,6 +41,15 @@ class SeasonStat(models.Model):
     class Meta:
         unique_together = ('player', 'season', 'team')
         ordering = ['player', 'season']
+        # keyset pages of the stats list (KeysetPagination on (field, id)), one per ordering field
+        indexes = [
+            models.Index(fields=['season', 'id'], name='seasonstat_season_id_idx'),
+            models.Index(fields=['points', 'id'], name='seasonstat_points_id_idx'),
+            models.Index(fields=['rebounds', 'id'], name='seasonstat_rebounds_id_idx'),
+            models.Index(fields=['assists', 'id'], name='seasonstat_assists_id_idx'),
+            models.Index(fields=['steals', 'id'], name='seasonstat_steals_id_idx'),
+            models.Index(fields=['blocks', 'id'], name='seasonstat_blocks_id_idx'),
+        ]
 
 class PlayerGameStat(models.Model):
     player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='player_game_stats')
@@ -58,3 +77,74 @@ class PlayerGameStat(models.Model):
 
     class Meta:
         ordering = ['game_date']
+        indexes = [
+            # keyset pages of the game-stats list (KeysetPagination on (field, id)), one per ordering field
+            models.Index(fields=['game_date', 'id'], name='gamestat_date_id_idx'),
+            models.Index(fields=['points', 'id'], name='gamestat_points_id_idx'),
+            models.Index(fields=['total_rebounds', 'id'], name='gamestat_rebounds_id_idx'),
+            models.Index(fields=['assists', 'id'], name='gamestat_assists_id_idx'),
+            models.Index(fields=['steals', 'id'], name='gamestat_steals_id_idx'),
+            models.Index(fields=['blocks', 'id'], name='gamestat_blocks_id_idx'),
+            # a player's games newest first (recent-games, prediction features)
+            models.Index(fields=['player', '-game_date'], name='gamestat_player_recent_idx'),
+        ]
+
+class PlayerFeatures(models.Model):
+    # model inputs for a player's next game, refreshed whenever their games change
+    player = models.OneToOneField(Player, on_delete=models.CASCADE, primary_key=True, related_name='features')
+    last_game_date = models.DateField()
+
+    avg_minutes_last5 = models.FloatField(null=True, blank=True)
+    avg_points_last5 = models.FloatField(null=True, blank=True)
+    avg_assists_last5 = models.FloatField(null=True, blank=True)
+    avg_blocks_last5 = models.FloatField(null=True, blank=True)
+    avg_steals_last5 = models.FloatField(null=True, blank=True)
+    avg_fg_percent_last5 = models.FloatField(null=True, blank=True)
+    avg_threepa_last5 = models.FloatField(null=True, blank=True)
+    avg_threep_last5 = models.FloatField(null=True, blank=True)
+    avg_threep_percent_last5 = models.FloatField(null=True, blank=True)
+    avg_fta_last5 = models.FloatField(null=True, blank=True)
+    avg_ft_last5 = models.FloatField(null=True, blank=True)
+    avg_ft_percent_last5 = models.FloatField(null=True, blank=True)
+    avg_total_rebounds_last5 = models.FloatField(null=True, blank=True)
+    avg_personal_fouls_last5 = models.FloatField(null=True, blank=True)
+    avg_turnovers_last5 = models.FloatField(null=True, blank=True)
+    avg_did_play_last10 = models.FloatField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+class LeaderboardEntry(models.Model):
+    # one precomputed leaderboard position, rewritten at ingestion time (see leaderboards.py)
+    board = models.CharField(max_length=20)  # 'season' or 'rolling'
+    key = models.CharField(max_length=20)  # the season for season boards, the window for rolling ones
+    stat = models.CharField(max_length=30)
+    rank = models.PositiveSmallIntegerField()
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='+')
+    value = models.FloatField()
+    games = models.IntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # also the index a board is served from, already in rank order
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'key', 'stat', 'rank'], name='leaderboard_position'),
+        ]
+
+class DataVersion(models.Model):
+    # one counter per kind of data, bumped whenever it changes so caches can key on it
+    scope = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.scope}@{self.version}'
+
+class ImportCheckpoint(models.Model):
+    # rows of an import file already committed, written in the same transaction as each batch
+    source = models.CharField(max_length=255, primary_key=True)
+    file_size = models.PositiveBigIntegerField()
+    rows = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.source}@{self.rows}'
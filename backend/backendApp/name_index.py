@@ -0,0 +1,96 @@
+# in-process prefix index over player names for typeahead
+import bisect
+import threading
+import time
+
+from .models import Player
+from .names import normalize_name
+from .versioning import PLAYERS, get_versions
+
+# how often (seconds) a lookup may check the players data version for changes
+VERSION_CHECK_INTERVAL = 1.0
+
+
+class NameIndex:
+    """
+    Sorted normalized-name keys searched with bisect.
+
+    Two key lists are kept: the full normalized name, and every later word of the name
+    (so "jam" finds "LeBron James"). A query is normalized the same way, matches on the
+    full name rank first, then word matches, alphabetical within each group.
+    """
+
+    def __init__(self, players):
+        # players: (pk, name, team, position) tuples
+        self.players = {pk: (pk, name, team, position) for pk, name, team, position in players}
+        full, words = [], []
+        for pk, name, _, _ in self.players.values():
+            normalized = normalize_name(name)
+            full.append((normalized, pk))
+            parts = normalized.split(' ')
+            for i in range(1, len(parts)):
+                words.append((' '.join(parts[i:]), normalized, pk))
+        full.sort()
+        words.sort()
+        self._full = full
+        self._full_keys = [key for key, _ in full]
+        self._words = words
+        self._word_keys = [key for key, _, _ in words]
+
+    def __len__(self):
+        return len(self.players)
+
+    def search(self, query, limit=10):
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+        seen = set()
+        found = []
+        for pk in self._prefix_matches(self._full_keys, self._full, prefix):
+            seen.add(pk)
+            found.append(pk)
+            if len(found) >= limit:
+                return [self.players[pk] for pk in found]
+
+        # word matches sort by the word, rank them by the full name like the first group
+        word_matches = sorted({
+            (normalized, pk)
+            for _, normalized, pk in self._prefix_rows(self._word_keys, self._words, prefix)
+            if pk not in seen
+        })
+        found.extend(pk for _, pk in word_matches[:limit - len(found)])
+        return [self.players[pk] for pk in found]
+
+    def _prefix_matches(self, keys, rows, prefix):
+        return (row[-1] for row in self._prefix_rows(keys, rows, prefix))
+
+    @staticmethod
+    def _prefix_rows(keys, rows, prefix):
+        start = bisect.bisect_left(keys, prefix)
+        for i in range(start, len(keys)):
+            if not keys[i].startswith(prefix):
+                break
+            yield rows[i]
+
+
+_index = None
+_index_version = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_name_index():
+    """The process-wide NameIndex, rebuilt when the players data version changes."""
+    global _index, _index_version, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+        return _index
+    with _lock:
+        if _index is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+            return _index
+        version = get_versions(PLAYERS)[PLAYERS]
+        if _index is None or version != _index_version:
+            _index = NameIndex(Player.objects.values_list('pk', 'name', 'team', 'position'))
+            _index_version = version
+        _checked_at = time.monotonic()
+        return _index
@@ -0,0 +1,13 @@
+# accent and case folding for player name lookups
+import unicodedata
+
+
+def normalize_name(name):
+    """
+    Lookup form of a player name: accents stripped, case folded, whitespace collapsed.
+
+    "Nikola Jokić", "NIKOLA  JOKIC" and "nikola jokic" all normalize to "nikola jokic".
+    """
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
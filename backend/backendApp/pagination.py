@@ -0,0 +1,181 @@
+# keyset (cursor) pagination for the large stats lists
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pages ordered on (field, pk) that continue from the last row seen instead of an offset.
+
+    The cursor holds the boundary row's field value and pk, so every page is one range
+    scan on a (field, pk) index no matter how deep it is. The field comes from the view's
+    OrderingFilter (`?ordering=-game_date`), restricted to one of the view's
+    `ordering_fields`, or the view's `ordering` by default; the pk breaks ties in the
+    same direction. NULLs order as the smallest value in both directions.
+
+    Responses look like {"next": url, "previous": url, "results": [...]}.
+    """
+
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.field, self.descending = self.get_ordering(request, queryset, view)
+        self.pk = queryset.model._meta.pk.attname
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor.get('r'))
+        # walking backwards for a previous page flips the direction and the results
+        descending = self.descending != reverse
+
+        queryset = queryset.order_by(*self.order_by(queryset, descending))
+        if cursor is None:
+            rows = list(queryset[:self.page_size + 1])
+        else:
+            rows = []
+            try:
+                segments = self.segments(cursor['v'], cursor['pk'], descending)
+                # each segment is an index range; the NULL one only when the page reaches it
+                for segment in segments:
+                    rows += queryset.filter(segment)[:self.page_size + 1 - len(rows)]
+                    if len(rows) > self.page_size:
+                        break
+            except (ValueError, ValidationError):
+                # a hand-edited cursor whose value doesn't fit the ordering field
+                raise NotFound(self.invalid_cursor_message)
+
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_row = self.previous_row = None
+        if rows:
+            if has_more or reverse:
+                self.next_row = rows[-1]
+            if cursor is not None and (has_more or not reverse):
+                self.previous_row = rows[0]
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """(field, descending) from the view's OrderingFilter, else the view's default."""
+        ordering = None
+        for backend in getattr(view, 'filter_backends', ()):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, 'ordering', None) or 'pk'
+        if not isinstance(ordering, str):
+            # only the first term is used: the page boundary is (field, pk)
+            ordering = ordering[0]
+        return ordering.lstrip('-'), ordering.startswith('-')
+
+    def order_by(self, queryset, descending):
+        field, pk = F(self.field), F(self.pk)
+        if not connections[queryset.db].features.nulls_order_largest:
+            # the backend already orders NULL first ascending and last descending
+            return (field.desc(), pk.desc()) if descending else (field.asc(), pk.asc())
+        if descending:
+            return field.desc(nulls_last=True), pk.desc()
+        return field.asc(nulls_first=True), pk.asc()
+
+    def segments(self, value, pk, descending):
+        """
+        Filters for the rows after (value, pk) in page order, one per stretch of the order.
+
+        NULLs sort before every value, so the order is the NULL rows by pk and then the
+        rest by (field, pk), reversed when descending. Each filter is a range on the
+        (field, pk) index; one OR across the NULL boundary would scan the index from the
+        start instead.
+        """
+        field, pk_field = self.field, self.pk
+        nulls = Q(**{f'{field}__isnull': True})
+        if descending:
+            if value is None:
+                return [nulls & Q(**{f'{pk_field}__lt': pk})]
+            after = Q(**{f'{field}__lte': value}) & (Q(**{f'{field}__lt': value}) | Q(**{f'{pk_field}__lt': pk}))
+            return [after, nulls]
+        if value is None:
+            return [nulls & Q(**{f'{pk_field}__gt': pk}), Q(**{f'{field}__isnull': False})]
+        return [Q(**{f'{field}__gte': value}) & (Q(**{f'{field}__gt': value}) | Q(**{f'{pk_field}__gt': pk}))]
+
+    def get_next_link(self):
+        if self.next_row is None:
+            return None
+        return self.encode_cursor(self.next_row, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_row is None:
+            return None
+        return self.encode_cursor(self.previous_row, reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        return replace_query_param(self.base_url, self.cursor_query_param, self.cursor_token(row, reverse))
+
+    def cursor_token(self, row, reverse=False):
+        # rows are model instances, or dicts when the view pages a .values() queryset
+        if isinstance(row, dict):
+            value, pk = row[self.field], row[self.pk]
+        else:
+            value, pk = getattr(row, self.field), getattr(row, self.pk)
+        position = {'v': value if value is None else str(value), 'pk': pk}
+        if reverse:
+            position['r'] = 1
+        return base64.urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode()).decode()
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            position['pk'] = int(position['pk'])
+            if position['v'] is not None and not isinstance(position['v'], str):
+                raise ValueError(position['v'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def to_html(self):
+        return ''
@@ -0,0 +1,348 @@
+# helpers shared by the single and batch prediction endpoints
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import F, Window
+from django.db.models.functions import Lower, RowNumber
+
+from .models import Player, PlayerGameStat
+from .names import normalize_name
+from ml_models.data_preperation import FEATURE_COLS, REST_DAYS_CAP, STAT_FIELDS, upcoming_game_features
+from ml_models.model_bundle import INTERVAL_STATS
+
+RECENT_GAMES = 50
+MAX_BATCH_SIZE = 1000
+
+STAT_NAMES = STAT_FIELDS
+
+# the layout upcoming_game_features expects
+HISTORY_FIELDS = ['game_date'] + STAT_NAMES
+
+# the history-only part of FEATURE_COLS, materialized per player in PlayerFeatures
+STORED_FEATURES = FEATURE_COLS[4:]
+
+
+class ItemError(Exception):
+    """A single prediction item that can't be scored (bad input, unknown player, ...)."""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def resolve_players(names):
+    """Accent- and case-insensitive name -> Player lookup for many names in one indexed query."""
+    normalized = {normalize_name(name) for name in names}
+    players = {}
+    qs = (
+        Player.objects
+        .select_related('features')
+        .filter(normalized_name__in=normalized)
+        .order_by('pk')
+    )
+    for player in qs:
+        # keep the lowest pk on duplicate names, same as .filter(...).first()
+        players.setdefault(player.normalized_name, player)
+    return players
+
+
+def resolve_roster(teams):
+    """Players of the given teams (case-insensitive) in one query, with their stored features."""
+    lowered = {team.lower() for team in teams}
+    return list(
+        Player.objects
+        .select_related('features')
+        .annotate(lower_team=Lower('team'))
+        .filter(lower_team__in=lowered)
+        .order_by('pk')
+    )
+
+
+def recent_games(player_ids, n=RECENT_GAMES, before=None):
+    """
+    Last `n` games for every player in one query, newest first, grouped by player_id;
+    only games played before the date `before` when it is given.
+
+    Games are plain HISTORY_FIELDS tuples, which is what the feature code works on.
+    """
+    qs = PlayerGameStat.objects.filter(player_id__in=player_ids)
+    if before is not None:
+        qs = qs.filter(game_date__lt=before)
+    qs = (
+        qs
+        .annotate(recent_rank=Window(
+            RowNumber(),
+            partition_by=[F('player_id')],
+            order_by=[F('game_date').desc(), F('id').desc()],
+        ))
+        .filter(recent_rank__lte=n)
+        .order_by('player_id', '-game_date', '-id')
+        .values_list('player_id', *HISTORY_FIELDS)
+    )
+    history = defaultdict(list)
+    for player_id, *game in qs:
+        history[player_id].append(game)
+    return history
+
+
+def parse_item(raw):
+    """Validate one request item and return (player_name, opponent, home, game_date)."""
+    if not isinstance(raw, dict):
+        raise ItemError('Each item must be an object.', 400)
+
+    player_name = raw.get('player')
+    opponent = raw.get('opponent')
+    if not player_name or not opponent:
+        raise ItemError('Missing player or opponent field', 400)
+
+    try:
+        home = int(raw.get('home', 1))
+    except (TypeError, ValueError):
+        raise ItemError('home must be 0 or 1', 400)
+
+    return str(player_name), opponent, home, parse_game_date(raw.get('game_date', None))
+
+
+def parse_game_date(value):
+    """Optional game date from a request as a Timestamp, or None."""
+    if not value:
+        return None
+    try:
+        return pd.to_datetime(value)
+    except (TypeError, ValueError):
+        raise ItemError(f'Invalid game_date "{value}".', 400)
+
+
+def known_opponents():
+    """Every opponent in PlayerGameStat, for models saved before bundles carried their own map."""
+    return PlayerGameStat.objects.values_list('opponent', flat=True).distinct()
+
+
+def history_feature_row(player_id, games, opponent_code, home, game_date):
+    """FEATURE_COLS row for an upcoming game computed from the player's recent games."""
+    rest_days, averages, did_play = upcoming_game_features(games, game_date)
+    row = [player_id, rest_days, opponent_code, home]
+    row += averages.tolist() + [did_play]
+    return row
+
+
+def stored_feature_row(features, opponent_code, home, game_date):
+    """
+    FEATURE_COLS row for an upcoming game from a PlayerFeatures row.
+
+    Only valid for games after features.last_game_date, which is always the case when
+    game_date is omitted.
+    """
+    if game_date is None:
+        rest_days = 1
+    else:
+        rest_days = min((game_date.date() - features.last_game_date).days, REST_DAYS_CAP)
+
+    row = [features.player_id, rest_days, opponent_code, home]
+    row += [_nan_if_none(getattr(features, field)) for field in STORED_FEATURES]
+    return row
+
+
+def stored_features(player):
+    """The player's PlayerFeatures row if it was select_related and exists, else None."""
+    try:
+        return player.features
+    except ObjectDoesNotExist:
+        return None
+
+
+def predict_items(bundle, raw_items, predict=None, intervals=False):
+    """
+    Score raw request items with a single predict call on the model bundle.
+
+    Returns one dict per item, in order. Items that fail validation or lookup carry an
+    'error' and 'status' instead of 'predictions' so one bad item doesn't fail the batch.
+    Players with an up to date PlayerFeatures row skip the recent games query entirely.
+    `predict` replaces bundle.predict for the model call (e.g. the request coalescer);
+    `intervals` adds the per-stat spread of the trees' predictions.
+    """
+    results, order, features = prepare_items(bundle, raw_items)
+    if features is None:
+        return results
+    predictions, spread = score(bundle, features, predict, intervals)
+    return complete_items(raw_items, results, order, predictions, spread)
+
+
+def score(bundle, features, predict=None, intervals=False):
+    """The model call: (predictions, spread), spread only when intervals are asked for."""
+    if intervals:
+        return bundle.predict_intervals(features)
+    return (predict or bundle.predict)(features), None
+
+
+def prepare_items(bundle, raw_items):
+    """
+    The database half of predict_items: validate the items and build their feature rows.
+
+    Returns (results, order, features): results with the failed items filled in, the
+    indices of the items to score and their FEATURE_COLS rows (None if there are none).
+    """
+    results = [None] * len(raw_items)
+    parsed = {}
+    for i, raw in enumerate(raw_items):
+        try:
+            parsed[i] = parse_item(raw)
+        except ItemError as e:
+            results[i] = _error_result(raw, e)
+
+    players = resolve_players(name for name, _, _, _ in parsed.values())
+
+    targets = []
+    for i, (player_name, opponent, home, game_date) in parsed.items():
+        player = players.get(normalize_name(player_name))
+        if player:
+            targets.append((i, player, opponent, home, game_date))
+        else:
+            results[i] = _error_result(raw_items[i], ItemError(f'Player "{player_name}" not found.', 404))
+
+    rows, without_games = feature_rows(bundle, targets)
+    for i in without_games:
+        results[i] = _error_result(
+            raw_items[i], ItemError(f'No game stats found for player "{parsed[i][0]}".', 400)
+        )
+
+    if not rows:
+        return results, [], None
+    order = sorted(rows)
+    return results, order, np.array([rows[i] for i in order], dtype=float)
+
+
+def feature_rows(bundle, targets):
+    """
+    FEATURE_COLS rows for (key, player, opponent, home, game_date) targets.
+
+    Players with an up to date PlayerFeatures row use it; the rest share one recent games
+    query per game date. Returns (rows by key, keys of players without any games before
+    their game).
+    """
+    rows = {}
+    pending = []
+    for key, player, opponent, home, game_date in targets:
+        opponent_code = bundle.encode_opponent(opponent)
+        features = stored_features(player)
+        if features and (game_date is None or game_date.date() > features.last_game_date):
+            rows[key] = stored_feature_row(features, opponent_code, home, game_date)
+        else:
+            pending.append((key, (player.pk, opponent_code, home, game_date)))
+
+    # games on or before the stored last game (or players missing from the store) fall
+    # back to computing features from the games before them: one query per game date
+    without_games = []
+    players_by_date = defaultdict(set)
+    for _, (player_id, _, _, game_date) in pending:
+        players_by_date[game_date].add(player_id)
+    history = {
+        game_date: recent_games(player_ids, before=None if game_date is None else game_date.date())
+        for game_date, player_ids in players_by_date.items()
+    }
+    for key, (player_id, opponent_code, home, game_date) in pending:
+        games = history[game_date].get(player_id)
+        if games:
+            rows[key] = history_feature_row(player_id, games, opponent_code, home, game_date)
+        else:
+            without_games.append(key)
+    return rows, without_games
+
+
+def complete_items(raw_items, results, order, predictions, spread=None):
+    """Fill in the results of the items prepare_items returned rows for."""
+    for row, (i, prediction) in enumerate(zip(order, predictions)):
+        results[i] = {
+            'player': raw_items[i]['player'],
+            'opponent': raw_items[i]['opponent'],
+            'predictions': dict(zip(STAT_NAMES, prediction.tolist())),
+        }
+        if spread is not None:
+            results[i]['intervals'] = interval_dict(spread, row)
+    return results
+
+
+def interval_dict(spread, row):
+    """{stat: {'p10', 'p50', 'p90', 'std'}} for one row of ModelBundle.predict_intervals output."""
+    values = {name: spread[name][row].tolist() for name in INTERVAL_STATS}
+    return {
+        stat: {name: values[name][k] for name in INTERVAL_STATS}
+        for k, stat in enumerate(STAT_NAMES)
+    }
+
+
+
+def predict_slate(bundle, home_team, away_team, game_date=None, predict=None, intervals=False):
+    """
+    Projections for everyone on both rosters of one game, scored as a single batch.
+
+    Rosters come from Player.team in one query, stale or missing stored features from
+    one recent games query. Returns the per-player predictions plus, for every stat, the
+    players ranked from highest to lowest projection. Players without any games are
+    listed under 'skipped'.
+    """
+    roster = resolve_roster([home_team, away_team])
+    # use the stored spelling of each team, which is what the opponent codes are keyed on
+    team_names = {player.lower_team: player.team for player in roster}
+    home_name = team_names.get(home_team.lower(), home_team)
+    away_name = team_names.get(away_team.lower(), away_team)
+
+    targets = []
+    for player in roster:
+        is_home = player.lower_team == home_team.lower()
+        targets.append((player.pk, player, away_name if is_home else home_name, int(is_home), game_date))
+    rows, without_games = feature_rows(bundle, targets)
+
+    players = []
+    if rows:
+        order = sorted(rows)
+        predictions, spread = score(bundle, np.array([rows[pk] for pk in order], dtype=float), predict, intervals)
+        by_pk = {player.pk: player for player in roster}
+        for row, (pk, prediction) in enumerate(zip(order, predictions)):
+            player = by_pk[pk]
+            is_home = player.lower_team == home_team.lower()
+            players.append({
+                'player_id': pk,
+                'player': player.name,
+                'team': player.team,
+                'opponent': away_name if is_home else home_name,
+                'home': int(is_home),
+                'predictions': dict(zip(STAT_NAMES, prediction.tolist())),
+            })
+            if spread is not None:
+                players[-1]['intervals'] = interval_dict(spread, row)
+    players.sort(key=lambda row: (-row['home'], row['player']))
+
+    rankings = {
+        stat: [
+            {'player': row['player'], 'team': row['team'], 'value': row['predictions'][stat]}
+            for row in sorted(players, key=lambda row: row['predictions'][stat], reverse=True)
+        ]
+        for stat in STAT_NAMES
+    }
+    without_games = set(without_games)
+    skipped = sorted(player.name for player in roster if player.pk in without_games)
+    return {
+        'home_team': home_name,
+        'away_team': away_name,
+        'game_date': game_date.date().isoformat() if game_date is not None else None,
+        'players': players,
+        'rankings': rankings,
+        'skipped': skipped,
+    }
+
+def _nan_if_none(value):
+    return np.nan if value is None else value
+
+
+def _error_result(raw, error):
+    raw = raw if isinstance(raw, dict) else {}
+    return {
+        'player': raw.get('player'),
+        'opponent': raw.get('opponent'),
+        'error': error.message,
+        'status': error.status_code,
+    }
@@ -0,0 +1,128 @@
+# result cache in front of predict_items, keyed on the request plus model and data versions
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .names import normalize_name
+from .prediction import ItemError, complete_items, parse_item, prepare_items, score
+from .versioning import GAME_STATS, PLAYERS, get_versions
+
+CACHE_ALIAS = 'predictions'
+HITS_KEY = 'prediction-cache:hits'
+MISSES_KEY = 'prediction-cache:misses'
+
+
+def data_version():
+    # predictions depend on the games (features) and on the players (name lookup)
+    versions = get_versions(GAME_STATS, PLAYERS)
+    return f'{versions[GAME_STATS]}.{versions[PLAYERS]}'
+
+
+def item_key(raw, model_version, data_version, intervals=False):
+    """Cache key for one raw request item, or None when it doesn't parse (errors aren't cached)."""
+    try:
+        player_name, opponent, home, game_date = parse_item(raw)
+    except ItemError:
+        return None
+    request = [normalize_name(player_name), opponent, home, game_date.isoformat() if game_date is not None else None]
+    digest = hashlib.sha1(json.dumps(request, default=str).encode()).hexdigest()
+    # results with intervals are cached separately, as {'predictions', 'intervals'}
+    prefix = 'prediction-intervals' if intervals else 'prediction'
+    return f'{prefix}:{model_version}:{data_version}:{digest}'
+
+
+def cached_predict_items(bundle, raw_items, predict=None, intervals=False):
+    """
+    predict_items with a result cache in front of it, keyed on the bundle's version.
+
+    Only the items missing from the cache go to the model, still as one batch. A new
+    model or any ingest changes the versions in the key, so old entries are never read
+    again and simply age out through the backend's TTL / MAX_ENTRIES culling.
+    """
+    pending = CachedPrediction(bundle, raw_items, intervals)
+    if pending.features is None:
+        return pending.finish(None)
+    return pending.finish(*score(bundle, pending.features, predict, intervals))
+
+
+class CachedPrediction:
+    """
+    cached_predict_items split around the model call, for callers that run it themselves
+    (the async endpoint awaits the coalescer between the two database-bound halves).
+
+    The constructor does the cache lookup and builds `features` for the misses (None
+    when nothing needs the model); finish(predictions, spread) fills in and caches the
+    results.
+    """
+
+    def __init__(self, bundle, raw_items, intervals=False):
+        self.raw_items = raw_items
+        self.intervals = intervals
+        self.cache = caches[CACHE_ALIAS]
+        version = data_version()
+        self.keys = [item_key(raw, bundle.version, version, intervals) for raw in raw_items]
+        cached = self.cache.get_many([key for key in self.keys if key])
+        self.hits = len(cached)
+
+        self.results = [None] * len(raw_items)
+        self.missing = []
+        for i, key in enumerate(self.keys):
+            if key in cached:
+                self.results[i] = {'player': raw_items[i]['player'], 'opponent': raw_items[i]['opponent']}
+                if intervals:
+                    self.results[i].update(cached[key])
+                else:
+                    self.results[i]['predictions'] = cached[key]
+            else:
+                self.missing.append(i)
+
+        self.missing_items = [raw_items[i] for i in self.missing]
+        self.missing_results, self.order, self.features = prepare_items(bundle, self.missing_items)
+
+    def finish(self, predictions, spread=None):
+        if self.features is not None:
+            complete_items(self.missing_items, self.missing_results, self.order, predictions, spread)
+
+        fresh = {}
+        for i, result in zip(self.missing, self.missing_results):
+            self.results[i] = result
+            if self.keys[i] and 'predictions' in result:
+                if self.intervals:
+                    fresh[self.keys[i]] = {'predictions': result['predictions'], 'intervals': result['intervals']}
+                else:
+                    fresh[self.keys[i]] = result['predictions']
+        if fresh:
+            self.cache.set_many(fresh)
+
+        _count(self.cache, HITS_KEY, self.hits)
+        _count(self.cache, MISSES_KEY, sum(1 for i in self.missing if self.keys[i]))
+        return self.results
+
+
+def cache_stats():
+    cache = caches[CACHE_ALIAS]
+    config = settings.CACHES[CACHE_ALIAS]
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / (hits + misses) if hits + misses else None,
+        'backend': config['BACKEND'],
+        'timeout': config.get('TIMEOUT'),
+        'max_entries': config.get('OPTIONS', {}).get('MAX_ENTRIES'),
+        'data_version': data_version(),
+    }
+
+
+def _count(cache, key, delta):
+    if not delta:
+        return
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # culled between add() and incr()
+        cache.set(key, delta, timeout=None)
@@ -0,0 +1,148 @@
+# column-per-field renderings of the stats lists (?format=columnar, ?format=arrow)
+from rest_framework import serializers
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: ?format=arrow is only offered when pyarrow is installed
+    pa = None
+
+
+def list_rows(data):
+    """(rows, paging) for a list response (paginated or not), or (None, None) for anything else."""
+    if isinstance(data, list):
+        return data, {}
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return data['results'], {key: value for key, value in data.items() if key != 'results'}
+    return None, None
+
+
+def nested_fields(view):
+    """Serializer key -> nested ModelSerializer for the view's nested objects (e.g. 'player')."""
+    if view is None or not hasattr(view, 'get_serializer_class'):
+        return {}
+    fields = view.get_serializer_class()().fields
+    return {key: field for key, field in fields.items() if isinstance(field, serializers.ModelSerializer)}
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    ?format=columnar: one array per field instead of one object per row.
+
+    Nested objects (the player) are pulled out into a dictionary keyed by their pk,
+    each listed once, and their column holds just the pk:
+
+        {"next": ..., "previous": ...,
+         "players": {"12": {"player_id": 12, "name": ...}},
+         "columns": {"id": [...], "player": [12, 12, ...], "game_date": [...], ...}}
+
+    Responses that aren't lists (a single object, errors) render as plain JSON.
+    """
+
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows, paging = list_rows(data)
+        if rows is not None:
+            data = dict(paging, **self.columns(rows, (renderer_context or {}).get('view')))
+        return super().render(data, accepted_media_type, renderer_context)
+
+    def columns(self, rows, view):
+        nested = nested_fields(view)
+        if rows:
+            keys = list(rows[0])
+        elif view is not None:
+            # an empty page still lists every column
+            keys = [key for key, field in view.get_serializer_class()().fields.items() if not field.write_only]
+        else:
+            keys = []
+        objects = {f'{key}s': {} for key in nested}
+        columns = {}
+        for key in keys:
+            values = [row[key] for row in rows]
+            if key in nested:
+                pk = nested[key].Meta.model._meta.pk.attname
+                found = objects[f'{key}s']
+                ids = []
+                for value in values:
+                    if value is None:
+                        ids.append(None)
+                        continue
+                    found.setdefault(str(value[pk]), value)
+                    ids.append(value[pk])
+                values = ids
+            columns[key] = values
+        return dict(objects, columns=columns)
+
+
+class ArrowRenderer(BaseRenderer):
+    """
+    ?format=arrow: the list as an Arrow IPC stream, one typed column per field.
+
+    Nested objects are flattened into dotted columns (`player.name`); strings are
+    dictionary-encoded, so a repeated player or team name is stored once. next/previous
+    page links travel in the schema metadata. Only list responses are rendered as Arrow;
+    anything else (errors, a single object) is returned as JSON bytes.
+    """
+
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows, paging = list_rows(data)
+        if rows is None:
+            return JSONRenderer().render(data)
+        view = (renderer_context or {}).get('view')
+        fields = view.get_serializer_class()().fields if view is not None else {}
+
+        arrays, names = [], []
+        for name, field in self.flat_fields(fields):
+            path = name.split('.')
+            values = [self.lookup(row, path) for row in rows]
+            arrays.append(self.array(values, field))
+            names.append(name)
+        metadata = {key: '' if value is None else str(value) for key, value in paging.items()}
+        table = pa.Table.from_arrays(arrays, names=names, metadata=metadata or None)
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def flat_fields(self, fields, prefix=''):
+        for key, field in fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ModelSerializer):
+                yield from self.flat_fields(field.fields, f'{prefix}{key}.')
+            else:
+                yield prefix + key, field
+
+    @staticmethod
+    def lookup(row, path):
+        for key in path:
+            if row is None:
+                return None
+            row = row[key]
+        return row
+
+    @staticmethod
+    def array(values, field):
+        if isinstance(field, serializers.BooleanField):
+            return pa.array(values, type=pa.bool_())
+        if isinstance(field, serializers.IntegerField):
+            return pa.array(values, type=pa.int64())
+        if isinstance(field, serializers.FloatField):
+            return pa.array(values, type=pa.float64())
+        if isinstance(field, serializers.DateField) and not isinstance(field, serializers.DateTimeField):
+            # the serialized ISO strings, typed back into dates
+            return pa.array(values, type=pa.string()).cast(pa.date32())
+        if isinstance(field, serializers.CharField):
+            return pa.array(values, type=pa.string()).dictionary_encode()
+        return pa.array(values)
+
+
+# renderers the stats list viewsets offer on top of the defaults
+COLUMNAR_RENDERERS = [ColumnarJSONRenderer] + ([ArrowRenderer] if pa is not None else [])
@@ -4,7 +4,7 @@ from .models import Player, SeasonStat, PlayerGameStat
 class PlayerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Player
-        fields = '__all__'
+        exclude = ['normalized_name']
 
 class SeasonStatSerializer(serializers.ModelSerializer):
     player = PlayerSerializer(read_only=True)
@@ -19,3 +19,9 @@ class PlayerGameStatSerializer(serializers.ModelSerializer):
     class Meta:
         model = PlayerGameStat
         fields = '__all__'
+
+class PlayerGameSerializer(serializers.ModelSerializer):
+    # a game row without its player, for responses about one player
+    class Meta:
+        model = PlayerGameStat
+        exclude = ['player']
@@ -0,0 +1,117 @@
+# per-player split aggregates (home/away, opponent, rest days), grouped in the database
+import datetime
+
+from django.core.cache import caches
+from django.db.models import Avg, Case, Count, DurationField, Exists, ExpressionWrapper, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import PlayerFeatures, PlayerGameStat
+from ml_models.data_preperation import REST_DAYS_CAP
+
+CACHE_ALIAS = 'splits'
+HOME_AWAY = 'home_away'
+OPPONENT = 'opponent'
+REST_DAYS = 'rest_days'
+SPLIT_FAMILIES = (HOME_AWAY, OPPONENT, REST_DAYS)
+
+SPLIT_STATS = ['minutes', 'points', 'total_rebounds', 'assists', 'steals', 'blocks', 'fg_percent', 'threep', 'turnovers']
+# lowest rest_days of each bucket; the last one is the cap, so it holds every longer gap too
+REST_BUCKETS = (0, 1, 2, 3, 4, REST_DAYS_CAP)
+
+
+def rest_bucket_label(index):
+    low = REST_BUCKETS[index]
+    if index == len(REST_BUCKETS) - 1:
+        return f'{low}+'
+    high = REST_BUCKETS[index + 1] - 1
+    return str(low) if high == low else f'{low}-{high}'
+
+
+def rest_bucket():
+    """
+    Index into REST_BUCKETS of each game's rest_days, as add_recent_average_features has it:
+    days since the player's previous game, 0 for their first (or undated) game and for a
+    second game on the same day, capped at REST_DAYS_CAP.
+
+    A correlated subquery on the (player, -game_date) index finds the previous date; window
+    functions (LAG) can't be grouped on in the same query.
+    """
+    games = PlayerGameStat.objects.filter(player=OuterRef('player'))
+    previous = Subquery(games.filter(game_date__lt=OuterRef('game_date')).order_by('-game_date').values('game_date')[:1])
+    same_day_before = Exists(games.filter(game_date=OuterRef('game_date'), id__lt=OuterRef('id')))
+    gap = ExpressionWrapper(F('game_date') - previous, output_field=DurationField())
+    whens = [When(same_day_before, then=Value(0))]
+    for index in range(len(REST_BUCKETS) - 1, 0, -1):
+        whens.append(When(Q(rest_gap__gte=datetime.timedelta(days=REST_BUCKETS[index])), then=Value(index)))
+    # no previous game (rest_gap is NULL) and gaps under a day fall through to bucket 0
+    return gap, Case(*whens, default=Value(0))
+
+
+def stat_aggregates():
+    # averaged like the model's features: over played games, with missing stats as 0
+    played = Q(minutes__gt=0)
+    aggregates = {'games': Count('id'), 'played': Count('id', filter=played)}
+    for field in SPLIT_STATS:
+        aggregates[f'avg_{field}'] = Avg(Coalesce(field, 0.0), filter=played)
+    return aggregates
+
+
+def family_rows(player_id, family):
+    """One GROUP BY query: the player's games grouped on one split family."""
+    games = PlayerGameStat.objects.filter(player_id=player_id).order_by()
+    if family == HOME_AWAY:
+        rows = games.filter(home__isnull=False).values('home')
+        key = 'home'
+    elif family == OPPONENT:
+        rows = games.filter(opponent__isnull=False).exclude(opponent='').values('opponent')
+        key = 'opponent'
+    else:
+        gap, bucket = rest_bucket()
+        rows = games.annotate(rest_gap=gap).annotate(bucket=bucket).values('bucket')
+        key = 'bucket'
+    rows = rows.annotate(**stat_aggregates()).order_by(key)
+
+    splits = []
+    for row in rows:
+        value = row.pop(key)
+        if family == HOME_AWAY:
+            row = {'split': 'home' if value else 'away', **row}
+        elif family == OPPONENT:
+            row = {'split': value, **row}
+        else:
+            row = {'split': rest_bucket_label(value), **row}
+        splits.append(row)
+    if family == HOME_AWAY:
+        splits.sort(key=lambda row: row['split'] != 'home')
+    return splits
+
+
+def split_stamp(player_id):
+    # PlayerFeatures.updated_at moves whenever the player's games change: every ingest and
+    # API write refreshes the player's stored features (feature_store.refresh_player_features)
+    stamp = PlayerFeatures.objects.filter(player_id=player_id).values_list('updated_at', flat=True).first()
+    return stamp.isoformat() if stamp is not None else 'none'
+
+
+def player_splits(player_id, families=SPLIT_FAMILIES):
+    """
+    family -> split rows of one player, from the per-player split cache.
+
+    Entries are keyed on the player's feature-store timestamp, so a change to that player's
+    games reads new entries while everyone else's stay valid; an ingest touching other
+    players doesn't recompute them. Missing families are computed with one query each.
+    """
+    cache = caches[CACHE_ALIAS]
+    stamp = split_stamp(player_id)
+    keys = {family: f'splits:{player_id}:{family}:{stamp}' for family in families}
+    cached = cache.get_many(list(keys.values()))
+
+    splits, missing = {}, {}
+    for family, key in keys.items():
+        if key in cached:
+            splits[family] = cached[key]
+        else:
+            splits[family] = missing[key] = family_rows(player_id, family)
+    if missing:
+        cache.set_many(missing)
+    return splits
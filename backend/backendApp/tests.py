@@ -1,3 +1,975 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+import joblib
+import numpy as np
+import pandas as pd
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ml_models.data_preperation import FEATURE_COLS, STAT_FIELDS, add_recent_average_features, upcoming_game_features
+from ml_models.forest_engine import CompactForest, load_compact_forest
+from ml_models.model_bundle import ModelBundle, ModelSchemaError, load_bundle, save_bundle
+
+from .coalescer import PredictionCoalescer
+from .feature_store import refresh_player_features
+from .ingest import (
+    LABEL_COLUMNS, NUMERIC_COLUMNS, READ_DTYPES, TEAM_COLUMNS, clean_dataset, ingest_game_rows, parse_minutes_column,
+    read_player_statistics,
+)
+from .management.commands.import_player_game_stats import Command as ImportGameStatsCommand
+from .management.commands.import_season_stats import parse_float as parse_season_float
+from .leaderboards import ROLLING, ROLLING_KEY, leaderboard, refresh_rolling_leaderboards
+from .model_watcher import ModelWatcher
+from .models import Player, PlayerFeatures, PlayerGameStat, SeasonStat
+from .response_cache import CACHE_ALIAS
+from .splits import REST_BUCKETS, SPLIT_FAMILIES, SPLIT_STATS, family_rows, rest_bucket_label
+from .versioning import PLAYERS, SEASON_STATS, get_versions
+from .views import PlayerGameStatViewSet, PlayerPredictionViewSet, SeasonStatViewSet, recent_games_queryset
+
+
+class CachedReadAuthTests(TestCase):
+    # cached 200s and 304s are only served once DRF has authenticated the request
+    def setUp(self):
+        caches[CACHE_ALIAS].clear()
+        Player.objects.create(name='Test Player', team='Test Team', position='G')
+
+    def test_bad_token_rejected_with_a_warm_cache(self):
+        first = self.client.get('/api/players/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.client.get('/api/players/')['X-Cache'], 'hit')
+        response = self.client.get('/api/players/', HTTP_AUTHORIZATION='Bearer garbage')
+        self.assertEqual(response.status_code, 401)
+
+    def test_bad_token_gets_no_304(self):
+        etag = self.client.get('/api/players/')['ETag']
+        self.assertEqual(self.client.get('/api/players/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response = self.client.get('/api/players/', HTTP_IF_NONE_MATCH=etag, HTTP_AUTHORIZATION='Bearer garbage')
+        self.assertEqual(response.status_code, 401)
+
+
+class GameStatsExportTests(TestCase):
+    # the export streams the whole table, so it needs a signed-in user
+    def setUp(self):
+        caches['default'].clear()  # throttle history
+        player = Player.objects.create(name='Test Player', team='Test Team', position='G')
+        PlayerGameStat.objects.create(player=player, game_date=datetime.date(2025, 1, 2), team='Test Team', opponent='Other Team', points=20.0)
+        user = User.objects.create_user('exporter', password='unused')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    def test_anonymous_request_rejected(self):
+        self.assertEqual(self.client.get('/api/game-stats/export/').status_code, 401)
+
+    def test_streams_for_a_signed_in_user(self):
+        response = self.client.get('/api/game-stats/export/?format=ndjson', **self.auth)
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([(row['player_name'], row['points']) for row in rows], [('Test Player', 20.0)])
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get('/api/game-stats/export/?format=xml', **self.auth).status_code, 400)
+
+
+class FakeBundle:
+    feature_cols = ['x']
+    watermark = metrics = None
+
+    def __init__(self, version):
+        self.version = version
+
+    def predict(self, features):
+        return features
+
+
+class HubModelWatcherTests(TestCase):
+    # a hub download never changes in place, so the watcher re-resolves it on every check
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.published = self.write('v1')
+
+    def write(self, version):
+        path = os.path.join(self.tmp.name, version, 'model.pkl')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(version)
+        return path
+
+    def resolve(self):
+        if self.published is None:
+            raise ConnectionError('hub down')
+        return self.published
+
+    def watcher(self):
+        load = lambda path: FakeBundle(open(path).read())
+        watcher = ModelWatcher(self.published, load, interval=0, resolve=self.resolve, source='hf://repo/model.pkl')
+        watcher.load_initial()
+        return watcher
+
+    def test_new_revision_is_swapped_in(self):
+        watcher = self.watcher()
+        self.assertFalse(watcher.check())
+        self.published = self.write('v2')
+        self.assertTrue(watcher.check())
+        self.assertEqual((watcher.version, watcher.path), ('v2', self.published))
+        self.assertEqual(watcher.status()['source'], 'hf://repo/model.pkl')
+
+    def test_unreachable_hub_keeps_serving(self):
+        watcher = self.watcher()
+        self.published = None
+        self.assertFalse(watcher.check())
+        self.assertEqual(watcher.version, 'v1')
+        self.assertIn('hub down', watcher.status()['last_error'])
+
+
+class ReadPlayerStatisticsTests(SimpleTestCase):
+    # a cell that isn't a number is missing, not a failed read
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'PlayerStatistics.csv')
+        with open(self.path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(list(READ_DTYPES))
+            for day, points in ((1, '10'), (2, '12'), (3, 'DNP'), (4, '')):
+                row = dict.fromkeys(READ_DTYPES, '1')
+                row.update({'gameDateTimeEst': f'2025-01-0{day} 19:00:00', 'points': points})
+                writer.writerow(row.values())
+
+    def check(self, engine):
+        # chunks of two rows: the 'DNP' is in a later chunk than the first one read
+        df = read_player_statistics(self.path, since=datetime.date(2025, 1, 1), engine=engine, chunksize=2)
+        self.assertEqual(df['points'].dtype, 'float64')
+        self.assertEqual(df['points'].tolist()[0], 12.0)
+        self.assertTrue(df['points'].iloc[1:].isna().all())
+
+    def test_c_engine(self):
+        self.check('c')
+
+    def test_pyarrow_engine(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest('pyarrow is not installed')
+        self.check('pyarrow')
+
+
+class ReadPlayerStatisticsParityTests(SimpleTestCase):
+    # the chunked, pruned read cleans to the same rows as read_csv + clean_dataset + filter
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'PlayerStatistics.csv')
+        rng = np.random.default_rng(0)
+        # every column the reader uses plus ones it skips, newest games first
+        header = list(READ_DTYPES) + ['personId', 'gameId', 'plusMinusPoints']
+        minutes = ['', '12', '34.56', '23:31', '0:00', 'DNP']
+        with open(self.path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for i in range(120):
+                row = {column: str(round(rng.random() * 20, 3)) for column in header}
+                row.update({
+                    'firstName': f'First{i % 7}', 'lastName': f' Last{i % 5}', 'gameDateTimeEst':
+                    (datetime.datetime(2025, 3, 1, 19, 30) - datetime.timedelta(days=i // 10)).isoformat(' '),
+                    'playerteamCity': ['Los Angeles', ' Boston', 'Miami '][i % 3], 'playerteamName': 'Team',
+                    'opponentteamCity': 'Denver', 'opponentteamName': 'Nuggets',
+                    'gameType': ['Regular Season', 'Playoffs', ''][i % 3], 'numMinutes': minutes[i % len(minutes)],
+                })
+                writer.writerow(row.values())
+
+    def check(self, engine):
+        for since in (datetime.date(2025, 2, 25), datetime.date(1900, 1, 1)):
+            with self.subTest(engine=engine, since=since):
+                old = clean_dataset(pd.read_csv(self.path, low_memory=False))
+                expected = old[old['gameDateTimeEst'] > since].reset_index(drop=True)
+                rows = clean_dataset(read_player_statistics(self.path, since=since, engine=engine, chunksize=25))
+                rows = rows.reset_index(drop=True)
+                self.assertEqual(len(rows), len(expected))
+                pd.testing.assert_frame_equal(rows, expected[rows.columns], check_dtype=False)
+
+    def test_c_engine(self):
+        self.check('c')
+
+    def test_pyarrow_engine(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest('pyarrow is not installed')
+        self.check('pyarrow')
+
+
+class KeysetOrderingIndexTests(SimpleTestCase):
+    # every ordering a keyset-paginated list allows pages on a (field, id) index
+    def test_every_ordering_field_is_indexed(self):
+        for view in (SeasonStatViewSet, PlayerGameStatViewSet):
+            indexed = {tuple(index.fields) for index in view.queryset.model._meta.indexes}
+            for field in view.ordering_fields:
+                with self.subTest(view=view.__name__, field=field):
+                    self.assertIn((field, 'id'), indexed)
+
+
+class KeysetPaginationTests(TestCase):
+    # walking the cursors must give every row once, in the order an OFFSET read would
+    @classmethod
+    def setUpTestData(cls):
+        player = Player.objects.create(name='Test Player', team='Test Team', position='G')
+        points = [10.0, None, 25.0, 10.0, None, 3.0, 25.0, 10.0, 0.0, None, 18.0, 10.0]
+        for day, value in enumerate(points, 1):
+            PlayerGameStat.objects.create(
+                player=player, game_date=datetime.date(2025, 1, 1 + day % 4), team='Test Team', points=value,
+            )
+
+    def expected(self, field, descending):
+        # NULLs order as the smallest value and the id breaks ties in the same direction
+        rows = PlayerGameStat.objects.values_list(field, 'id')
+        rows = sorted(rows, key=lambda row: (row[0] is not None, row[0] or 0, row[1]), reverse=descending)
+        return [pk for _, pk in rows]
+
+    def walk(self, url, link):
+        pks = []
+        while url:
+            page = self.client.get(url).json()
+            pks.append([row['id'] for row in page['results']])
+            url = page[link]
+        return pks
+
+    def test_pages_match_offset_order(self):
+        for ordering in ('points', '-points', 'game_date', '-game_date'):
+            with self.subTest(ordering=ordering):
+                expected = self.expected(ordering.lstrip('-'), ordering.startswith('-'))
+                pages = self.walk(f'/api/game-stats/?ordering={ordering}&page_size=5', 'next')
+                self.assertEqual(pages, [expected[i:i + 5] for i in range(0, len(expected), 5)])
+
+                # and back again from the last page through the previous links
+                last = self.client.get(f'/api/game-stats/?ordering={ordering}&page_size=5').json()
+                while last['next']:
+                    last = self.client.get(last['next']).json()
+                back = self.walk(last['previous'], 'previous')
+                self.assertEqual([pk for page in reversed(back) for pk in page], expected[:-len(last['results'])])
+
+
+def pandas_features(games, game_date=None):
+    """
+    The prediction view's feature computation before upcoming_game_features, step for
+    step, on recent_games() tuples (newest first): the placeholder row is appended with
+    a repeated index label and the features are read off the last row by date.
+    """
+    columns = ['player_id', 'game_date'] + STAT_FIELDS
+    df = pd.DataFrame([dict(zip(columns, (0, *game[:1 + len(STAT_FIELDS)]))) for game in games])
+    df['game_date'] = pd.to_datetime(df['game_date'])
+    if game_date is None:
+        game_date = df['game_date'].max() + pd.Timedelta(days=1)
+    df = pd.concat([df, pd.DataFrame([dict({'player_id': 0, 'game_date': game_date}, **dict.fromkeys(STAT_FIELDS))])])
+
+    df = add_recent_average_features(df)
+    latest = df.sort_values('game_date').iloc[-1]
+    averages = np.array([latest[f'avg_{field}_last5'] for field in STAT_FIELDS], dtype=float)
+    return latest['rest_days'], averages, latest['avg_did_play_last10']
+
+
+class UpcomingGameFeaturesTests(SimpleTestCase):
+    # the NumPy features match the pandas ones they replaced on randomized histories
+    # (1-50 games, unplayed and NaN-minute games, duplicate dates, dates before the newest game)
+    cases = 100
+
+    def random_history(self, rng, n_games):
+        start = datetime.date(2024, 10, 1)
+        offsets = np.sort(rng.integers(0, 3 * n_games + 1, size=n_games))[::-1]
+        games = []
+        for offset in offsets:
+            stats = rng.random(len(STAT_FIELDS)) * 30
+            roll = rng.random()
+            if roll < 0.15:
+                stats[0] = 0
+            elif roll < 0.25:
+                stats[0] = np.nan
+            stats[rng.random(len(STAT_FIELDS)) < 0.05] = np.nan
+            stats = [None if np.isnan(value) else float(value) for value in stats]
+            games.append((start + datetime.timedelta(days=int(offset)), *stats, 'Team %d' % rng.integers(5)))
+        return games
+
+    def random_game_date(self, rng, games, past):
+        newest, oldest = games[0][0], games[-1][0]
+        if not past:
+            if rng.random() < 0.5:
+                return None
+            return pd.Timestamp(newest + datetime.timedelta(days=int(rng.integers(1, 15))))
+        if rng.random() < 0.3:
+            # the day of one of the games
+            return pd.Timestamp(games[int(rng.integers(len(games)))][0])
+        return pd.Timestamp(oldest + datetime.timedelta(days=int(rng.integers(-3, (newest - oldest).days + 1))))
+
+    def assertSameFeatures(self, expected, actual):
+        self.assertEqual(expected[0], actual[0])
+        np.testing.assert_allclose(actual[1], expected[1], equal_nan=True)
+        self.assertTrue(np.isclose(expected[2], actual[2]))
+
+    def test_upcoming_game_matches_pandas(self):
+        rng = np.random.default_rng(0)
+        for case in range(self.cases):
+            games = self.random_history(rng, int(rng.integers(1, 51)))
+            game_date = self.random_game_date(rng, games, past=False)
+            with self.subTest(case=case):
+                self.assertSameFeatures(pandas_features(games, game_date), upcoming_game_features(games, game_date))
+
+    def test_past_game_is_point_in_time(self):
+        # on or before the newest game: what the pandas computation gives on the games
+        # before that day, the game itself and later ones left out
+        rng = np.random.default_rng(1)
+        case = 0
+        while case < self.cases:
+            games = self.random_history(rng, int(rng.integers(1, 51)))
+            game_date = self.random_game_date(rng, games, past=True)
+            before = [game for game in games if game[0] < game_date.date()]
+            if not before:
+                continue
+            with self.subTest(case=case):
+                self.assertSameFeatures(pandas_features(before, game_date), upcoming_game_features(games, game_date))
+            case += 1
+
+
+class StatsListQueryTests(TestCase):
+    # a page of either stats list is a fixed number of queries (no query per row for the
+    # nested player), and the .values() path renders the same JSON as the serializer
+    list_queries = 2  # the data versions (ETag) and the page, players joined in
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(10):
+            player = Player.objects.create(name=f'Player {i}', team='Test Team', position='G')
+            SeasonStat.objects.create(player=player, season='2024-25', team='TST', points=float(i))
+            for day in range(1, 4):
+                PlayerGameStat.objects.create(
+                    player=player, game_date=datetime.date(2025, 1, day), team='Test Team', opponent='Other Team',
+                    points=float(i + day),
+                )
+
+    def page(self, url, page_size, fast):
+        # a cached response would skip the view
+        caches[CACHE_ALIAS].clear()
+        with self.settings(FAST_LIST_SERIALIZATION=fast), self.assertNumQueries(self.list_queries):
+            response = self.client.get(url, {'page_size': page_size, 'ordering': '-points'})
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_fixed_queries_and_same_json(self):
+        for url in ('/api/game-stats/', '/api/stats/'):
+            with self.subTest(url=url):
+                self.page(url, 2, True)
+                self.page(url, 2, False)
+                self.assertEqual(self.page(url, 30, True), self.page(url, 30, False))
+
+
+class RecentGamesPlanTests(TestCase):
+    # the recent-games query reads the (player, -game_date) index in order, without a sort
+    # (sqlite "USE TEMP B-TREE", MySQL "Using filesort", a PostgreSQL Sort node)
+    sort_patterns = (r'TEMP B-TREE', r'Using filesort', r'^\s*(->\s*)?Sort\b')
+
+    def test_plan_uses_the_index_without_a_sort(self):
+        if connection.vendor == 'postgresql':
+            self.skipTest('the planner prefers a sequential scan on a tiny table')
+        player = Player.objects.create(name='Test Player', team='Test Team', position='G')
+        for day in range(1, 21):
+            PlayerGameStat.objects.create(player=player, game_date=datetime.date(2025, 1, day), team='Test Team')
+        plan = recent_games_queryset(player.pk, 10).explain()
+        self.assertIn('gamestat_player_recent_idx', plan)
+        for pattern in self.sort_patterns:
+            self.assertIsNone(re.search(pattern, plan, re.MULTILINE), plan)
+
+
+def row_wise_minutes(value):
+    # the scalar rules clean_dataset applied row by row before it went column-wise
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    s = str(value).strip()
+    if s in ('', 'nan'):
+        return None
+    if ':' in s:
+        parts = s.split(':')
+        try:
+            return round(float(parts[0]) + float(parts[1]) / 60, 2)
+        except (ValueError, IndexError):
+            return None
+    try:
+        f = float(s)
+    except (ValueError, TypeError):
+        return None
+    return None if math.isnan(f) else f
+
+
+def row_wise_clean(df):
+    df['gameDateTimeEst'] = pd.to_datetime(df['gameDateTimeEst'], errors='coerce').dt.date
+    for col in TEAM_COLUMNS + LABEL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna('').astype(str).str.strip()
+    df['numMinutes'] = df['numMinutes'].apply(row_wise_minutes)
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+class CleanDatasetTests(SimpleTestCase):
+    # the column-wise clean_dataset gives the same values as the row-wise one it replaced
+    minutes = [
+        '', ' ', 'nan', 'NaN', None, np.nan, ' 12 ', '12', '0', '-3', '34.56', '34.565', '.5', '1e1', '1_0',
+        '23:31', ' 23:31 ', '0:00', '12:30:00', '12:', ':30', '12:3.5', '7:59.9', 'a:b', '12:nan', 'nan:30',
+        'inf', '-inf', '1e400', 'abc', '  48:00', '٣٤', 12, 12.5, 0.1 + 0.2, True, 'True',
+    ]
+    text = ['Los Angeles', ' Los Angeles', 'Los Angeles ', 'LA', ' LA ', '', ' ', None, np.nan, 'Miami', 12]
+
+    def fixture(self):
+        n = max(len(self.minutes), len(self.text)) * 3
+        text = [self.text[i % len(self.text)] for i in range(n)]
+        return pd.DataFrame({
+            'gameDateTimeEst': [['2024-01-02 19:30:00', '', None, 'not a date', '2024-01-02'][i % 5] for i in range(n)],
+            'playerteamCity': text,
+            'playerteamName': text[::-1],
+            'opponentteamCity': text[1:] + text[:1],
+            'opponentteamName': text[2:] + text[:2],
+            'gameType': text[3:] + text[:3],
+            'gameLabel': [None] * n,
+            'numMinutes': pd.Series([self.minutes[i % len(self.minutes)] for i in range(n)], dtype=object),
+            'points': [self.minutes[(i + 1) % len(self.minutes)] for i in range(n)],
+            'win': [1, 0, None] * (n // 3),
+        })
+
+    def assertSameValues(self, expected, actual):
+        # categoricals compared by their values, floats by value (NaN == NaN, None == NaN)
+        self.assertEqual(list(expected.columns), list(actual.columns))
+        for col in expected.columns:
+            left, right = expected[col].astype(object).tolist(), actual[col].astype(object).tolist()
+            for i, (a, b) in enumerate(zip(left, right)):
+                if a is pd.NaT and b is pd.NaT:
+                    continue
+                if isinstance(a, float) or isinstance(b, float) or a is None or b is None:
+                    a = np.nan if a is None else a
+                    b = np.nan if b is None else b
+                    if isinstance(a, float) and isinstance(b, float) and (a == b or (a != a and b != b)):
+                        continue
+                elif type(a) is type(b) and a == b:
+                    continue
+                self.fail(f'{col} row {i}: {a!r} (row-wise) != {b!r} (column-wise)')
+
+    def test_edge_cases(self):
+        self.assertSameValues(row_wise_clean(self.fixture()), clean_dataset(self.fixture()))
+
+    def test_parse_minutes_column(self):
+        for values in (pd.Series(self.minutes, dtype=object), pd.Series([1, 2, 3]), pd.Series([1.5, np.nan]),
+                       pd.Series([True, False]), pd.Series([], dtype=object)):
+            with self.subTest(values=values.tolist()):
+                expected = values.apply(row_wise_minutes) if len(values) else pd.Series([], dtype=float)
+                self.assertSameValues(expected.to_frame(), parse_minutes_column(values).to_frame())
+
+
+class GatedBundle:
+    # predicts x * 2 once `gate` is set, so requests queue up behind a running batch
+    def __init__(self):
+        self.gate = threading.Event()
+
+    def predict(self, features):
+        self.gate.wait(5)
+        return features * 2
+
+
+class PredictionCoalescerTests(SimpleTestCase):
+    # a waiter that gives up mid-flight must not take the collector thread down with it
+    def test_cancelled_waiter_in_a_batch(self):
+        coalescer = PredictionCoalescer(window_ms=50)
+        bundle = GatedBundle()
+        running = coalescer.submit(bundle, np.ones((1, 1)))
+        time.sleep(0.1)  # the collector is now blocked scoring it
+        cancelled = coalescer.submit(bundle, np.ones((1, 1)))
+        waiting = coalescer.submit(bundle, np.full((1, 1), 3.0))
+        self.assertTrue(cancelled.cancel())
+        bundle.gate.set()
+
+        self.assertEqual(running.result(5).tolist(), [[2.0]])
+        self.assertEqual(waiting.result(5).tolist(), [[6.0]])
+        self.assertEqual(coalescer.submit(bundle, np.full((1, 1), 4.0)).result(5).tolist(), [[8.0]])
+
+    def test_failed_batch_reaches_its_waiters(self):
+        coalescer = PredictionCoalescer(window_ms=1)
+        broken = GatedBundle()
+        broken.predict = lambda features: None  # fails slicing the output, outside predict
+        with self.assertRaises(TypeError):
+            coalescer.submit(broken, np.ones((1, 1))).result(5)
+        bundle = GatedBundle()
+        bundle.gate.set()
+        self.assertEqual(coalescer.submit(bundle, np.ones((1, 1))).result(5).tolist(), [[2.0]])
+
+
+class RollingLeaderboardTests(TestCase):
+    # the rolling board is the plain average of the last 5 played games, not the model's
+    # avg_*_last5 feature (which smooths over a newest game that wasn't played)
+    def test_average_of_last_five_played_games(self):
+        player = Player.objects.create(name='Test Player', team='Test Team', position='G')
+        for day, (minutes, points) in enumerate([(30, 40.0), (30, 6.0), (30, 8.0), (30, 10.0), (30, 7.0), (30, 9.0), (0, None)], 1):
+            PlayerGameStat.objects.create(
+                player=player, game_date=datetime.date(2025, 1, day), team='Test Team', minutes=minutes, points=points,
+            )
+        refresh_rolling_leaderboards()
+        [entry] = leaderboard(ROLLING, ROLLING_KEY, 'points')['points']
+        self.assertEqual((entry['player_id'], entry['value'], entry['games']), (player.pk, 8.0, 5))
+
+
+class ModelSchemaFailureTests(SimpleTestCase):
+    # a model that fails its schema check is read once, then every request gets the error
+    def setUp(self):
+        self.addCleanup(setattr, PlayerPredictionViewSet, '_watcher', PlayerPredictionViewSet._watcher)
+        self.addCleanup(setattr, PlayerPredictionViewSet, '_load_error', None)
+        PlayerPredictionViewSet._watcher = None
+
+    def test_failure_is_kept(self):
+        error = ModelSchemaError('Model abc expects features [...]')
+        with mock.patch.object(PlayerPredictionViewSet, 'findModel', side_effect=error) as find:
+            self.assertIsNone(PlayerPredictionViewSet.getModel())
+            self.assertIsNone(PlayerPredictionViewSet.getModel())
+        self.assertEqual(find.call_count, 1)
+        response = self.client.post('/api/player-predictions/predict/', {'player': 'x', 'opponent': 'y'}, content_type='application/json')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('expects features', response.json()['error'])
+
+
+class ImportVersionTests(TestCase):
+    # re-importing a file for known players must not invalidate the player caches
+    SEASON_HEADER = ['player', 'season', 'team', 'g', 'mp_per_game', 'fg_percent', 'x3p_percent', 'ft_percent',
+                     'trb_per_game', 'ast_per_game', 'stl_per_game', 'blk_per_game', 'tov_per_game', 'pf_per_game', 'pts_per_game']
+
+    def write_csv(self, header, rows):
+        f = tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False)
+        self.addCleanup(os.unlink, f.name)
+        with f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return f.name
+
+    def test_season_import_bumps_players_only_for_new_players(self):
+        row = ['Test Player', '2025', 'TST', '10', '30.0', '0.5', '0.4', '0.8', '5.0', '4.0', '1.0', '0.5', '2.0', '2.0', '20.0']
+        path = self.write_csv(self.SEASON_HEADER, [row])
+        call_command('import_season_stats', path, stdout=io.StringIO())
+        self.assertEqual(get_versions(PLAYERS, SEASON_STATS), {PLAYERS: 1, SEASON_STATS: 1})
+        call_command('import_season_stats', path, stdout=io.StringIO())
+        self.assertEqual(get_versions(PLAYERS, SEASON_STATS), {PLAYERS: 1, SEASON_STATS: 2})
+
+    def test_team_import_bumps_players_only_for_changes(self):
+        path = self.write_csv(['firstName', 'lastName', 'gameDate', 'playerteamCity', 'playerteamName'],
+                              [['Test', 'Player', '2025-01-01', 'Test', 'Team']])
+        call_command('import_player_team', path, stdout=io.StringIO())
+        call_command('import_player_team', path, stdout=io.StringIO())
+        self.assertEqual(get_versions(PLAYERS), {PLAYERS: 1})
+
+
+class MovingSerializer:
+    # stands in for an update that hands a game to another player
+    def __init__(self, instance, player):
+        self.instance, self.player = instance, player
+
+    def save(self):
+        self.instance.player = self.player
+        self.instance.save()
+
+
+class GameStatUpdateFeaturesTests(TestCase):
+    def test_moved_game_refreshes_both_players(self):
+        old, new = (Player.objects.create(name=name, team='Test Team', position='G') for name in ('Old Player', 'New Player'))
+        stat = PlayerGameStat.objects.create(player=old, game_date=datetime.date(2025, 1, 1), team='Test Team', minutes=30, points=20.0)
+        refresh_player_features([old.pk])
+        PlayerGameStatViewSet().perform_update(MovingSerializer(stat, new))
+        self.assertEqual(list(PlayerFeatures.objects.values_list('player_id', flat=True)), [new.pk])
+
+
+def small_forest(n_features=6, n_outputs=3, seed=0):
+    """A small multi-output forest trained with missing values, so NaN routing is learned."""
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(seed)
+    X = rng.random((400, n_features)) * 30
+    y = X[:, :n_outputs] * rng.random(n_outputs) + rng.normal(size=(400, n_outputs))
+    X[rng.random(X.shape) < 0.1] = np.nan
+    return RandomForestRegressor(n_estimators=10, max_depth=8, random_state=seed).fit(X, y)
+
+
+def rows_with_nan(n_rows, n_features, seed=1):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n_rows, n_features)) * 30
+    X[rng.random(X.shape) < 0.2] = np.nan
+    return X
+
+
+class CompactForestTests(SimpleTestCase):
+    # the flattened forest must predict what the fitted estimator predicts
+    def setUp(self):
+        self.model = small_forest()
+        self.X = rows_with_nan(200, self.model.n_features_in_)
+
+    def test_matches_predict(self):
+        compact = CompactForest.from_sklearn(self.model)
+        np.testing.assert_allclose(compact.predict(self.X), self.model.predict(self.X), rtol=1e-7, atol=1e-9)
+
+    def test_memory_mapped_export_matches_predict(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.pkl')
+            joblib.dump(self.model, path)
+            compact = load_compact_forest(path)
+            self.assertIsInstance(compact.value, np.memmap)
+            np.testing.assert_allclose(compact.predict(self.X), self.model.predict(self.X), rtol=1e-7, atol=1e-9)
+
+
+class TreeOutputsTests(SimpleTestCase):
+    # with the sklearn engine the per-tree outputs come from the shared memory-mapped export
+    def test_uses_memory_mapped_export(self):
+        model = small_forest(len(FEATURE_COLS), len(STAT_FIELDS))
+        X = rows_with_nan(20, len(FEATURE_COLS))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.pkl')
+            save_bundle(ModelBundle(model, FEATURE_COLS, STAT_FIELDS, {}), path)
+            bundle = load_bundle(path)
+            trees = bundle.tree_outputs(X)
+            self.assertTrue(os.path.isdir(f'{path}.forest'))
+            self.assertIsInstance(bundle._trees.value, np.memmap)
+        self.assertEqual(trees.shape, (20, model.n_estimators, len(STAT_FIELDS)))
+        np.testing.assert_allclose(trees.mean(axis=1), model.predict(X), rtol=1e-7, atol=1e-9)
+
+
+class PredictionIntervalTests(SimpleTestCase):
+    # the vectorized spread must equal np.percentile/std over each estimator's own predict
+    def test_matches_estimator_loop(self):
+        model = small_forest()
+        bundle = ModelBundle(model, FEATURE_COLS[:6], STAT_FIELDS[:3], {})
+        X = rows_with_nan(50, model.n_features_in_)
+        predictions, spread = bundle.predict_intervals(X)
+
+        trees = np.stack([estimator.predict(X) for estimator in model.estimators_], axis=1)
+        np.testing.assert_allclose(predictions, model.predict(X), rtol=1e-7, atol=1e-9)
+        for name, q in (('p10', 10), ('p50', 50), ('p90', 90)):
+            np.testing.assert_allclose(spread[name], np.percentile(trees, q, axis=1), rtol=1e-7, atol=1e-9)
+        np.testing.assert_allclose(spread['std'], trees.std(axis=1), rtol=1e-7, atol=1e-9)
+
+
+INGEST_TEAMS = [('Los Angeles', 'Lakers'), ('Boston', 'Celtics'), ('Miami', 'Heat'), ('Denver', 'Nuggets')]
+INGEST_GAME_TYPES = ['Regular Season', 'Regular Season', 'Playoffs', 'Preseason', 'Pre Season', 'All-Star Game', '']
+INGEST_STATS = {
+    'numMinutes': 'minutes', 'points': 'points', 'assists': 'assists', 'blocks': 'blocks', 'steals': 'steals',
+    'fieldGoalsPercentage': 'fg_percent', 'threePointersAttempted': 'threepa', 'threePointersMade': 'threep',
+    'threePointersPercentage': 'threep_percent', 'freeThrowsAttempted': 'fta', 'freeThrowsMade': 'ft',
+    'freeThrowsPercentage': 'ft_percent', 'reboundsTotal': 'total_rebounds', 'foulsPersonal': 'personal_fouls',
+    'turnovers': 'turnovers',
+}
+
+
+def row_by_row_ingest(new_rows):
+    # the loop update_database ran before ingest_game_rows (trade prints left out)
+    def parse_float(value):
+        if value is None:
+            return None
+        try:
+            f = float(value)
+        except (ValueError, TypeError):
+            return None
+        return None if math.isnan(f) else f
+
+    objs = []
+    for _, row in new_rows.iterrows():
+        player, _ = Player.objects.get_or_create(name=row['firstName'].strip() + ' ' + row['lastName'].strip())
+        game_type = row['gameType'] if row['gameType'] else ''
+        current_team = row['playerteamCity'] + ' ' + row['playerteamName']
+        if game_type not in ('All-Star Game', 'Pre Season', 'Preseason', '') and player.team != current_team:
+            player.team = current_team
+            player.save()
+        objs.append(PlayerGameStat(
+            player=player,
+            game_date=row['gameDateTimeEst'],
+            game_type=row['gameType'] if row['gameType'] else None,
+            team=current_team,
+            opponent=row['opponentteamCity'] + ' ' + row['opponentteamName'],
+            win=int(row['win']) if pd.notnull(row['win']) else None,
+            home=int(row['home']),
+            **{field: parse_float(row[column]) for column, field in INGEST_STATS.items()},
+        ))
+    PlayerGameStat.objects.bulk_create(objs)
+
+
+class IngestGameRowsTests(TestCase):
+    # the set-based ingest leaves the same games and player teams as the row-by-row loop
+    def setUp(self):
+        Player.objects.create(name='Known Player0', team='Los Angeles Lakers')
+        Player.objects.create(name='Known Player1', team='Boston Celtics')
+
+    def new_rows(self, n=80, seed=0):
+        # known and new players, trades, preseason / All-Star / untyped rows, missing stats
+        rng = np.random.default_rng(seed)
+        names = ['Known Player0', 'Known Player1', 'New Player0', 'New Player1', 'New Player2']
+        picks, team = rng.integers(0, len(names), n), rng.integers(0, len(INGEST_TEAMS), n)
+        opponent = (team + rng.integers(1, len(INGEST_TEAMS), n)) % len(INGEST_TEAMS)
+        df = pd.DataFrame({
+            'firstName': [names[i].split(' ')[0] for i in picks],
+            'lastName': [names[i].split(' ')[1] for i in picks],
+            'gameDateTimeEst': [datetime.date(2030, 1, 1) + datetime.timedelta(days=int(d)) for d in rng.integers(0, 30, n)],
+            'gameType': [INGEST_GAME_TYPES[i] for i in rng.integers(0, len(INGEST_GAME_TYPES), n)],
+            'playerteamCity': [INGEST_TEAMS[i][0] for i in team],
+            'playerteamName': [INGEST_TEAMS[i][1] for i in team],
+            'opponentteamCity': [INGEST_TEAMS[i][0] for i in opponent],
+            'opponentteamName': [INGEST_TEAMS[i][1] for i in opponent],
+            'win': np.where(rng.random(n) < 0.1, np.nan, rng.integers(0, 2, n)),
+            'home': rng.integers(0, 2, n),
+        })
+        for column in INGEST_STATS:
+            values = rng.random(n) * 30
+            values[rng.random(n) < 0.1] = np.nan
+            df[column] = values
+        return df
+
+    def state_after(self, ingest, df):
+        with transaction.atomic():
+            ingest(df)
+            games = sorted(PlayerGameStat.objects.values_list(
+                'player__name', 'game_date', 'game_type', 'team', 'opponent', 'win', 'home', *INGEST_STATS.values(),
+            ), key=repr)
+            players = dict(Player.objects.values_list('name', 'team'))
+            transaction.set_rollback(True)
+        return games, players
+
+    def test_matches_row_by_row(self):
+        df = self.new_rows()
+        expected = self.state_after(row_by_row_ingest, df)
+        self.assertEqual(self.state_after(ingest_game_rows, df), expected)
+        self.assertEqual(len(expected[0]), len(df))
+
+
+class ImportGameStatsTests(TestCase):
+    # bulk mode, in one go or interrupted and resumed, leaves what the row-by-row import does
+    def setUp(self):
+        Player.objects.create(name='Known Player0', team='Los Angeles Lakers')
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'games.csv')
+        rng = np.random.default_rng(0)
+        names = ['Known Player0', 'Imported Player0', 'Imported Player1', 'Imported Player2']
+        with open(self.path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['firstName', 'lastName', 'gameDate', 'gameType', 'playerteamCity', 'playerteamName',
+                             'opponentteamCity', 'opponentteamName', 'win', 'home', *INGEST_STATS])
+            for i in range(23):
+                first, last = names[i % len(names)].split(' ')
+                team, opponent = INGEST_TEAMS[i % 4], INGEST_TEAMS[(i + 1) % 4]
+                stats = [f'{value:.3f}' if value > 1 else '' for value in rng.random(len(INGEST_STATS)) * 30]
+                writer.writerow([f' {first}', last, f'2031-01-{1 + i:02d}', 'Regular Season', *team, *opponent,
+                                 i % 2, (i + 1) % 2, *stats])
+
+    def state_after(self, load):
+        with transaction.atomic():
+            load()
+            games = sorted(PlayerGameStat.objects.values_list(
+                'player__name', 'game_date', 'game_type', 'team', 'opponent', 'win', 'home', *INGEST_STATS.values(),
+            ), key=repr)
+            players = sorted(Player.objects.values_list('name', 'team', 'normalized_name'))
+            transaction.set_rollback(True)
+        return games, players
+
+    def test_bulk_matches_row_by_row(self):
+        expected = self.state_after(lambda: ImportGameStatsCommand(stdout=io.StringIO()).import_rows(self.path))
+        bulk = self.state_after(lambda: ImportGameStatsCommand(stdout=io.StringIO()).bulk_import(self.path, 5, True))
+        self.assertEqual(bulk, expected)
+        self.assertEqual(len(expected[0]), 23)
+
+    def test_interrupted_load_resumes_without_duplicates(self):
+        expected = self.state_after(lambda: ImportGameStatsCommand(stdout=io.StringIO()).import_rows(self.path))
+        bulk_create, calls = PlayerGameStat.objects.bulk_create, 0
+
+        def interrupt(*args, **kwargs):
+            # like a load killed part way through its third batch
+            nonlocal calls
+            calls += 1
+            if calls == 3:
+                raise KeyboardInterrupt
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(PlayerGameStat.objects, 'bulk_create', side_effect=interrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('import_player_game_stats', self.path, batch_size=5, stdout=io.StringIO())
+        self.assertEqual(PlayerGameStat.objects.count(), 10)
+
+        out = io.StringIO()
+        resumed = self.state_after(lambda: call_command('import_player_game_stats', self.path, batch_size=5, stdout=out))
+        self.assertIn('Resuming after row 10', out.getvalue())
+        self.assertEqual(resumed, expected)
+
+
+SEASON_STAT_COLUMNS = {
+    'mp_per_game': 'minutes', 'fg_percent': 'fg_percent', 'x3p_percent': 'threep_percent', 'ft_percent': 'ft_percent',
+    'trb_per_game': 'rebounds', 'ast_per_game': 'assists', 'stl_per_game': 'steals', 'blk_per_game': 'blocks',
+    'tov_per_game': 'turnovers', 'pf_per_game': 'personal_fouls', 'pts_per_game': 'points',
+}
+
+
+def per_row_season_import(csv_file):
+    # import_season_stats' loop before the set-based upsert
+    with open(csv_file, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            player, _ = Player.objects.get_or_create(name=row['player'].strip())
+            SeasonStat.objects.update_or_create(
+                player=player, season=row['season'].strip(), team=row['team'],
+                defaults=dict(
+                    {field: parse_season_float(row[column]) for column, field in SEASON_STAT_COLUMNS.items()},
+                    games_played=int(row['g']),
+                ),
+            )
+
+
+def per_row_team_import(csv_file):
+    # import_player_team's loop before the set-based writes
+    latest_entries = {}
+    with open(csv_file, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            player_name = row['firstName'].strip() + ' ' + row['lastName'].strip()
+            date = datetime.datetime.strptime(row['gameDate'], '%Y-%m-%d')
+            if player_name not in latest_entries or date > latest_entries[player_name]['date']:
+                latest_entries[player_name] = {'team': row['playerteamCity'] + ' ' + row['playerteamName'], 'date': date}
+    for player_name, data in latest_entries.items():
+        Player.objects.update_or_create(name=player_name, defaults={'team': data['team']})
+
+
+class SeasonImportTests(TestCase):
+    # the set-based season and team imports leave the rows their per-row loops did
+    names = ['Known Player0', 'Known Player1', 'Season Player0', 'Season Player1', 'Season Player2']
+
+    def setUp(self):
+        Player.objects.create(name='Known Player0', team='Old Team')
+        Player.objects.create(name='Known Player1', team='Team T3')
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def season_file(self, seed):
+        # traded players get a row per team plus a TOT row; blank cells are missing stats
+        rng = np.random.default_rng(seed)
+        path = os.path.join(self.dir, f'seasons{seed}.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['player', 'season', 'team', 'g', *SEASON_STAT_COLUMNS])
+            for season in ('2030', '2031'):
+                for i, name in enumerate(self.names):
+                    for team in (['LAL', 'BOS', 'TOT'] if i % 3 == 0 else ['MIA']):
+                        stats = [f'{value:.3f}' if value > 3 else '' for value in rng.random(len(SEASON_STAT_COLUMNS)) * 30]
+                        writer.writerow([f'{name} ', season, team, rng.integers(1, 83), *stats])
+        return path
+
+    def team_file(self):
+        # several games per player, some on the same day
+        rng = np.random.default_rng(0)
+        path = os.path.join(self.dir, 'games.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['firstName', 'lastName', 'gameDate', 'playerteamCity', 'playerteamName'])
+            for name in self.names:
+                first, last = name.split(' ')
+                for day in rng.integers(1, 6, 6):
+                    writer.writerow([f' {first}', last, f'2031-03-{day:02d}', 'Team', f'T{rng.integers(0, 5)}'])
+        return path
+
+    def state_after(self, *loads):
+        with transaction.atomic():
+            for load in loads:
+                load()
+            stats = sorted(SeasonStat.objects.values_list(
+                'player__name', 'season', 'team', 'games_played', *SEASON_STAT_COLUMNS.values(),
+            ), key=repr)
+            players = sorted(Player.objects.values_list('name', 'team', 'normalized_name'))
+            transaction.set_rollback(True)
+        return stats, players
+
+    def test_season_import(self):
+        first, changed = self.season_file(0), self.season_file(1)
+
+        def command(path):
+            call_command('import_season_stats', path, stdout=io.StringIO())
+
+        # a first import, then a re-import where every row is an update
+        self.assertEqual(
+            self.state_after(lambda: command(first)), self.state_after(lambda: per_row_season_import(first)),
+        )
+        self.assertEqual(
+            self.state_after(lambda: command(first), lambda: command(changed)),
+            self.state_after(lambda: per_row_season_import(first), lambda: per_row_season_import(changed)),
+        )
+
+    def test_team_import(self):
+        path = self.team_file()
+        self.assertEqual(
+            self.state_after(lambda: call_command('import_player_team', path, stdout=io.StringIO())),
+            self.state_after(lambda: per_row_team_import(path)),
+        )
+
+
+def pandas_splits(player_id):
+    """The split families grouped in pandas over the player's games, rest days from add_recent_average_features."""
+    games = pd.DataFrame(list(
+        PlayerGameStat.objects.filter(player_id=player_id).order_by('id')
+        .values('id', 'player_id', 'game_date', 'home', 'opponent', *STAT_FIELDS)
+    ))
+    played = games['minutes'].fillna(0) > 0
+    games = add_recent_average_features(games)
+    games['played'] = played.reindex(games.index)
+    games[SPLIT_STATS] = games[SPLIT_STATS].fillna(0)
+    games['bucket'] = np.searchsorted(REST_BUCKETS, games['rest_days'], side='right') - 1
+
+    def grouped(key, label):
+        rows = {}
+        for value, group in games.dropna(subset=[key]).groupby(key):
+            on_court = group[group['played']]
+            rows[label(value)] = dict(
+                games=len(group), played=len(on_court),
+                **{f'avg_{field}': on_court[field].mean() if len(on_court) else None for field in SPLIT_STATS},
+            )
+        return rows
+
+    return {
+        'home_away': grouped('home', lambda value: 'home' if value else 'away'),
+        'opponent': grouped('opponent', str),
+        'rest_days': grouped('bucket', lambda value: rest_bucket_label(int(value))),
+    }
+
+
+class PlayerSplitsTests(TestCase):
+    # the GROUP BY splits match the same grouping done in pandas
+    def test_matches_pandas(self):
+        player = Player.objects.create(name='Test Player', team='Test Team', position='G')
+        rng = np.random.default_rng(0)
+        day = datetime.date(2025, 1, 1)
+        for i in range(40):
+            # gaps of 0 to 12 days (two games on one day, long breaks), DNPs and missing stats
+            day += datetime.timedelta(days=int(rng.choice([0, 1, 1, 2, 3, 4, 5, 12])))
+            minutes = None if i % 9 == 0 else float(rng.choice([0, 12, 30]))
+            stats = {field: None if rng.random() < 0.1 else float(rng.integers(0, 30)) for field in STAT_FIELDS}
+            PlayerGameStat.objects.create(**dict(
+                stats, player=player, game_date=day, team='Test Team', home=i % 2,
+                opponent=['Boston Celtics', 'Miami Heat', None][i % 3], minutes=minutes,
+            ))
+
+        expected = pandas_splits(player.pk)
+        for family in SPLIT_FAMILIES:
+            with self.subTest(family=family):
+                rows = {row['split']: row for row in family_rows(player.pk, family)}
+                self.assertEqual(rows.keys(), expected[family].keys())
+                for split, want in expected[family].items():
+                    for key, value in want.items():
+                        if value is None:
+                            self.assertIsNone(rows[split][key], (split, key))
+                        else:
+                            self.assertAlmostEqual(rows[split][key], value, places=9, msg=(split, key))
@@ -1,15 +1,19 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PlayerViewSet, SeasonStatViewSet, PlayerGameStatViewSet, PlayerPredictionViewSet
+from .views import PlayerViewSet, SeasonStatViewSet, PlayerGameStatViewSet, PlayerPredictionViewSet, LeaderboardViewSet, GameStatsExportView, predict_async
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 router = DefaultRouter()
 router.register(r'players', PlayerViewSet)
 router.register(r'stats', SeasonStatViewSet)
 router.register(r'game-stats', PlayerGameStatViewSet)
+router.register(r'leaderboards', LeaderboardViewSet, basename='leaderboards')
 router.register(r'player-predictions', PlayerPredictionViewSet, basename='player-predictions')
 
 urlpatterns = [
+    # ahead of the router, which would read predict-async / export as a pk
+    path('player-predictions/predict-async/', predict_async, name='player-predictions-predict-async'),
+    path('game-stats/export/', GameStatsExportView.as_view(), name='game-stats-export'),
     path('', include(router.urls)),
 
     #JWT authentication endpoints for obtaining and refreshing tokens
@@ -0,0 +1,77 @@
+# read-only serialization straight from .values() rows
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# fields whose to_representation leaves the database value as it is (a pk for the related field)
+PASSTHROUGH_FIELDS = (
+    serializers.CharField, serializers.IntegerField, serializers.FloatField, serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesSerializer:
+    """
+    Produces what a ModelSerializer's .data would for a list, from .values() dicts.
+
+    The serializer's fields are compiled once into (output key, values() lookup,
+    converter) entries; nested ModelSerializers become lookups across the relation
+    (`player__name`), so the queryset joins instead of loading related objects. Each row
+    is then built with plain dict lookups instead of per-object field binding and
+    attribute access. Only for reads: it never validates or saves.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.lookups = []
+        self.fields = self._compile(serializer_class(), '')
+
+    def values(self, queryset):
+        return queryset.values(*self.lookups)
+
+    def to_representation(self, rows):
+        return [self._row(row, self.fields) for row in rows]
+
+    def _row(self, row, fields):
+        data = {}
+        for key, lookup, convert in fields:
+            if convert is None:
+                data[key] = row[lookup]
+            elif isinstance(convert, tuple):
+                # nested serializer: (lookup of the related pk, its fields)
+                pk_lookup, nested = convert
+                data[key] = None if row[pk_lookup] is None else self._row(row, nested)
+            else:
+                value = row[lookup]
+                data[key] = None if value is None else convert(value)
+        return data
+
+    def _compile(self, serializer, prefix):
+        compiled = []
+        for key, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or isinstance(field, serializers.ListSerializer):
+                raise ValueError(f'{type(serializer).__name__}.{key} can\'t be read from .values() rows')
+            lookup = prefix + field.source.replace('.', '__')
+            if isinstance(field, serializers.BaseSerializer):
+                model = field.Meta.model
+                nested = self._compile(field, lookup + '__')
+                pk_lookup = f'{lookup}__{model._meta.pk.attname}'
+                if pk_lookup not in self.lookups:
+                    self.lookups.append(pk_lookup)
+                compiled.append((key, lookup, (pk_lookup, nested)))
+                continue
+            self.lookups.append(lookup)
+            compiled.append((key, lookup, self._converter(field)))
+        return compiled
+
+    @staticmethod
+    def _converter(field):
+        if isinstance(field, PASSTHROUGH_FIELDS):
+            return None
+        if isinstance(field, serializers.DateField) and not isinstance(field, serializers.DateTimeField):
+            output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+            if output_format is None:
+                return None
+            if output_format.lower() == ISO_8601:
+                return lambda value: value.isoformat()
+        return field.to_representation
@@ -0,0 +1,40 @@
+# data-version counters bumped by ingestion and API writes
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DataVersion
+
+PLAYERS = 'players'
+GAME_STATS = 'game_stats'
+SEASON_STATS = 'season_stats'
+LEADERBOARDS = 'leaderboards'
+
+
+def get_versions(*scopes):
+    """Current version of each scope in one query; scopes never bumped are at 0."""
+    versions = dict.fromkeys(scopes, 0)
+    versions.update(DataVersion.objects.filter(scope__in=scopes).values_list('scope', 'version'))
+    return versions
+
+
+def get_watermark(*scopes):
+    """
+    (versions, last_modified) for the scopes in one query: the version of each scope
+    (0 if never bumped) and the latest time any of them changed (None if none has).
+    """
+    versions = dict.fromkeys(scopes, 0)
+    last_modified = None
+    for scope, version, updated_at in DataVersion.objects.filter(scope__in=scopes).values_list(
+        'scope', 'version', 'updated_at'
+    ):
+        versions[scope] = version
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+    return versions, last_modified
+
+
+def bump_version(*scopes):
+    """Mark the given scopes as changed."""
+    for scope in scopes:
+        DataVersion.objects.get_or_create(scope=scope)
+        DataVersion.objects.filter(scope=scope).update(version=F('version') + 1, updated_at=timezone.now())
@@ -2,92 +2,381 @@ from rest_framework import viewsets, filters, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from .models import Player, SeasonStat, PlayerGameStat
-from .serializers import PlayerSerializer, SeasonStatSerializer, PlayerGameStatSerializer
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
-import joblib
-import numpy as np
-import pandas as pd
+from .serializers import PlayerSerializer, SeasonStatSerializer, PlayerGameStatSerializer, PlayerGameSerializer
+from .prediction import MAX_BATCH_SIZE, ItemError, known_opponents, parse_game_date, predict_slate
+from .prediction_cache import CachedPrediction, cached_predict_items, cache_stats
+from .coalescer import get_coalescer, predictor
+from .feature_store import refresh_player_features
+from .leaderboards import (
+    LEADERBOARD_SIZE, LEADERBOARD_STATS, ROLLING, ROLLING_KEY, SEASON, latest_season, leaderboard,
+    refresh_all_leaderboards, refresh_rolling_leaderboards, refresh_season_leaderboards,
+)
+from .model_watcher import ModelWatcher
+from .name_index import get_name_index
+from .pagination import KeysetPagination
+from .export import CONTENT_TYPES, CSV, EXPORT_FORMATS, export_queryset, parse_export_filters, stream_export
+from .splits import SPLIT_FAMILIES, player_splits
+from .values_serializer import ValuesSerializer
+from .renderers import COLUMNAR_RENDERERS
+from .response_cache import cached_get
+from ml_models.model_bundle import ModelSchemaError, load_bundle
+from .versioning import bump_version, GAME_STATS, LEADERBOARDS, PLAYERS, SEASON_STATS
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
+from rest_framework.renderers import JSONRenderer
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+from rest_framework.settings import api_settings
 import os
+import json
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from ml_models.data_preperation import add_recent_average_features
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 # extras for deployment (Downloading model from HF because too big to push to github)
 import io
 import requests
 from huggingface_hub import hf_hub_download
 
-class PlayerViewSet(viewsets.ModelViewSet):
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+RECENT_GAMES_DEFAULT = 10
+LEADERBOARD_LIMIT = 10
+RECENT_GAMES_MAX = 100
+_recent_games_serializer = None
+
+def recent_games_serializer():
+    global _recent_games_serializer
+    if _recent_games_serializer is None:
+        _recent_games_serializer = ValuesSerializer(PlayerGameSerializer)
+    return _recent_games_serializer
+
+def recent_games_queryset(player_id, n):
+    # order_by replaces Meta.ordering, so the (player, -game_date) index order is the
+    # result order and no sort runs (RecentGamesPlanTests checks the plan)
+    games = PlayerGameStat.objects.filter(player_id=player_id).order_by('-game_date')
+    return recent_games_serializer().values(games)[:n]
+
+def wants_intervals(request):
+    # ?intervals=true adds p10/p50/p90/std per stat from the individual trees
+    return request.GET.get('intervals', '').lower() in ('1', 'true', 'yes')
+
+class DataVersionMixin:
+    # bumps the viewset's data scopes after any write made through the API
+    data_scopes = ()
+
+    def data_changed(self, instance):
+        bump_version(*self.data_scopes)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.data_changed(serializer.instance)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.data_changed(serializer.instance)
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        self.data_changed(instance)
+
+class CachedReadMixin:
+    # GETs carry an ETag/Last-Modified from the data versions in read_scopes and are
+    # answered with a 304 or from the response cache before the handler runs (see
+    # cached_get), but only after DRF has authenticated the request and checked permissions
+    read_scopes = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        method = request.method.lower()
+        if method in ('get', 'head') and hasattr(self, method):
+            setattr(self, method, self.cached_handler(getattr(self, method)))
+
+    def cached_handler(self, handler):
+        def cached(request, *args, **kwargs):
+            # a miss renders the handler's response here so cached_get can store its bytes
+            view = lambda: self.finalize_response(request, handler(request, *args, **kwargs), *args, **kwargs)
+            return cached_get(request, self.read_scopes, view)
+        return cached
+
+class PlayerViewSet(CachedReadMixin, DataVersionMixin, viewsets.ModelViewSet):
     queryset = Player.objects.all()
     serializer_class = PlayerSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'team', 'position']
     permission_classes = [IsAuthenticatedOrReadOnly]
+    data_scopes = (PLAYERS,)
+    read_scopes = (PLAYERS,)
+
+    def data_changed(self, instance):
+        if self.action == 'destroy':
+            # the player's leaderboard rows went with them; re-rank the boards
+            refresh_all_leaderboards()
+        super().data_changed(instance)
+
+    # typeahead: accent/case-insensitive prefix match on the full name or any later word
+    # GET /api/players/autocomplete/?q=leb&limit=10
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT)), AUTOCOMPLETE_MAX_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'limit must be at least 1'}, status=status.HTTP_400_BAD_REQUEST)
+        matches = get_name_index().search(query, limit)
+        return Response([
+            {'player_id': pk, 'name': name, 'team': team, 'position': position}
+            for pk, name, team, position in matches
+        ])
+
+    # a player's last n games, newest first, read off the (player, -game_date) index
+    # GET /api/players/12/recent-games/?n=10
+    @action(detail=True, methods=['get'], url_path='recent-games', read_scopes=(GAME_STATS, PLAYERS))
+    def recent_games(self, request, pk=None):
+        try:
+            n = min(int(request.query_params.get('n', RECENT_GAMES_DEFAULT)), RECENT_GAMES_MAX)
+        except ValueError:
+            return Response({'error': 'n must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if n < 1:
+            return Response({'error': 'n must be at least 1'}, status=status.HTTP_400_BAD_REQUEST)
+        player = self.get_object()
+        games = recent_games_serializer().to_representation(recent_games_queryset(player.pk, n))
+        return Response({'player': PlayerSerializer(player).data, 'games': games})
 
-class SeasonStatViewSet(viewsets.ModelViewSet):
-    queryset = SeasonStat.objects.all()
+    # home/away, per-opponent and rest-days averages, grouped in the database (splits.py)
+    # GET /api/players/12/splits/?split=rest_days
+    @action(detail=True, methods=['get'], read_scopes=(GAME_STATS, PLAYERS))
+    def splits(self, request, pk=None):
+        split = request.query_params.get('split')
+        if split and split not in SPLIT_FAMILIES:
+            return Response({'error': f'split must be one of {list(SPLIT_FAMILIES)}'}, status=status.HTTP_400_BAD_REQUEST)
+        player = self.get_object()
+        splits = player_splits(player.pk, (split,) if split else SPLIT_FAMILIES)
+        return Response({'player': PlayerSerializer(player).data, 'splits': splits})
+
+class ValuesListMixin:
+    # list() builds the response from .values() rows (see ValuesSerializer) instead of
+    # a ModelSerializer per object; FAST_LIST_SERIALIZATION=False goes back to the serializer
+    _values_serializer = None
+
+    @classmethod
+    def values_serializer(cls):
+        if cls._values_serializer is None or cls._values_serializer.serializer_class is not cls.serializer_class:
+            cls._values_serializer = ValuesSerializer(cls.serializer_class)
+        return cls._values_serializer
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_LIST_SERIALIZATION:
+            return super().list(request, *args, **kwargs)
+        reader = self.values_serializer()
+        queryset = reader.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(reader.to_representation(page))
+        return Response(reader.to_representation(queryset))
+
+class SeasonStatViewSet(CachedReadMixin, ValuesListMixin, DataVersionMixin, viewsets.ModelViewSet):
+    queryset = SeasonStat.objects.select_related('player')
     serializer_class = SeasonStatSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['player__name', 'season', 'team']
-    ordering_fields = ['points', 'rebounds', 'assists', 'steals', 'blocks']
+    ordering_fields = ['season', 'points', 'rebounds', 'assists', 'steals', 'blocks']
+    ordering = 'season'
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthenticatedOrReadOnly]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, *COLUMNAR_RENDERERS]
+    data_scopes = (SEASON_STATS,)
+    read_scopes = (SEASON_STATS, PLAYERS)  # rows nest their player
+
+    # keep the season leaderboards in step with edits made through the API
+    def perform_update(self, serializer):
+        self.previous_season = serializer.instance.season
+        super().perform_update(serializer)
+
+    def data_changed(self, instance):
+        refresh_season_leaderboards({instance.season, getattr(self, 'previous_season', instance.season)})
+        super().data_changed(instance)
 
     #season filter
     def get_queryset(self):
+        queryset = super().get_queryset()
         season = self.request.query_params.get('season')
         if season:
-            return SeasonStat.objects.filter(season=season)
-        return SeasonStat.objects.all()
+            return queryset.filter(season=season)
+        return queryset
     
-class PlayerGameStatViewSet(viewsets.ModelViewSet):
-    queryset = PlayerGameStat.objects.all()
+class PlayerGameStatViewSet(CachedReadMixin, ValuesListMixin, DataVersionMixin, viewsets.ModelViewSet):
+    queryset = PlayerGameStat.objects.select_related('player')
     serializer_class = PlayerGameStatSerializer
     filter_backends = (filters.SearchFilter, filters.OrderingFilter)
     search_fields = ['player__name', 'team', 'opponent', 'game_date']
-    ordering_fields = ['points', 'rebounds', 'assists', 'steals', 'blocks']
+    ordering_fields = ['game_date', 'points', 'total_rebounds', 'assists', 'steals', 'blocks']
+    ordering = 'game_date'
+    pagination_class = KeysetPagination
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, *COLUMNAR_RENDERERS]
+    data_scopes = (GAME_STATS,)
+    read_scopes = (GAME_STATS, PLAYERS)  # rows nest their player
+
+    # keep the stored features in step with edits made through the API; an update
+    # that moves a game to another player changes both players' features
+    def perform_update(self, serializer):
+        self.previous_player_id = serializer.instance.player_id
+        super().perform_update(serializer)
+
+    def data_changed(self, instance):
+        refresh_player_features([instance.player_id, getattr(self, 'previous_player_id', instance.player_id)])
+        refresh_rolling_leaderboards()
+        super().data_changed(instance)
+
+class GameStatsExportView(APIView):
+    """
+    The whole PlayerGameStat table (or a filtered part) streamed for offline jobs.
+
+    GET /api/game-stats/export/?format=csv|ndjson|parquet&start=2024-10-01&end=2025-04-30&team=LAL&player=LeBron James
+
+    Rows are read in pk-ordered chunks of EXPORT_CHUNK_SIZE and written out as each
+    chunk arrives, so memory stays flat however big the table is. Not served through the
+    response cache: the body is never held in one piece. Signed-in users only, and
+    throttled per user (EXPORT_THROTTLE_RATE) since every request scans the table.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'export'
+    renderer_classes = [JSONRenderer]  # errors only; the export streams its own bytes
+
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= picks the export format here, not a renderer
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        fmt = request.query_params.get('format', CSV)
+        if fmt not in EXPORT_FORMATS:
+            return Response({'error': f'format must be one of {list(EXPORT_FORMATS)}'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            filters = parse_export_filters(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(stream_export(fmt, export_queryset(**filters)), content_type=CONTENT_TYPES[fmt])
+        response['Content-Disposition'] = f'attachment; filename="game_stats.{fmt}"'
+        return response
+
+class LeaderboardViewSet(CachedReadMixin, viewsets.ViewSet):
+    # precomputed leaders (leaderboards.py), served in stored rank order with no sort
+    # GET /api/leaderboards/?board=season&season=2024-25&stat=points&limit=10
+    # GET /api/leaderboards/?board=rolling
     permission_classes = [IsAuthenticatedOrReadOnly]
+    read_scopes = (LEADERBOARDS, PLAYERS)
+
+    def list(self, request):
+        board = request.query_params.get('board', SEASON)
+        stat = request.query_params.get('stat') or None
+        if board not in (SEASON, ROLLING):
+            return Response({'error': f'board must be {SEASON!r} or {ROLLING!r}'}, status=status.HTTP_400_BAD_REQUEST)
+        if stat is not None and stat not in LEADERBOARD_STATS:
+            return Response({'error': f'stat must be one of {list(LEADERBOARD_STATS)}'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', LEADERBOARD_LIMIT)), LEADERBOARD_SIZE)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'limit must be at least 1'}, status=status.HTTP_400_BAD_REQUEST)
+
+        key = ROLLING_KEY if board == ROLLING else request.query_params.get('season') or latest_season()
+        return Response({'board': board, 'key': key, 'leaders': leaderboard(board, key, stat, limit)})
 
 class PlayerPredictionViewSet(viewsets.ModelViewSet):
    permission_classes = [AllowAny] #TODO: switch back to IsAuthenticatedOrReadOnly later
-   _model = None
-  
+   _watcher = None  # ModelWatcher holding the served ModelBundle
+   _load_error = None  # ModelSchemaError of a model file that doesn't match serving
+
+   @classmethod
+   def readModel(cls, path):
+       # raises ModelSchemaError when the file doesn't match the features serving builds
+       return load_bundle(
+           path,
+           mmap=settings.MODEL_MMAP,
+           legacy_opponents=known_opponents,
+           engine=settings.PREDICTION_ENGINE,
+       )
+
    @classmethod
-   def getModel(cls):
-       if cls._model is not None:
-           return cls._model
+   def loadModel(cls, path, resolve=None, source=None):
+       watcher = ModelWatcher(path, cls.readModel, interval=settings.MODEL_RELOAD_INTERVAL, resolve=resolve, source=source)
+       model = watcher.load_initial()
+       cls._watcher = watcher
+       print(f"Model version {model.version} (trained on data up to {model.watermark.get('last_game_date', 'unknown')})")
+       return model
 
+   @classmethod
+   def getModel(cls, watch=True):
+       if cls._watcher is None and cls._load_error is None:
+           try:
+               cls.findModel()
+           except ModelSchemaError as e:
+               # a mismatched file won't start matching: keep the error rather than read the
+               # whole file again on every request (restart once the model is replaced)
+               print(f"Model failed its schema check: {e}")
+               cls._load_error = e
+       if cls._watcher is None:
+           return None
+       if watch:
+           # poll for a new model file from this worker on (threads don't survive the fork)
+           cls._watcher.start()
+       return cls._watcher.bundle
+
+   @classmethod
+   def unavailable(cls):
+       # the 503 message when getModel() returned None
+       if cls._load_error is not None:
+           return f'Model not loaded: {cls._load_error}'
+       return 'Model not loaded.'
+
+   @classmethod
+   def findModel(cls):
 
        # Try local model first
        local_model_path = os.path.join(settings.BASE_DIR, 'ml_models', 'player_multioutput_projection.pkl')
        if os.path.exists(local_model_path):
            print(f"Loading local model from {local_model_path}")
-           cls._model = joblib.load(local_model_path)
-           return cls._model
+           return cls.loadModel(local_model_path)
 
 
        # Try model path from environment variable
        env_model_path = os.environ.get("MODEL_PATH")
        if env_model_path and os.path.exists(env_model_path):
            print(f"Loading model from MODEL_PATH: {env_model_path}")
-           cls._model = joblib.load(env_model_path)
-           return cls._model
+           return cls.loadModel(env_model_path)
 
 
        # Download from Hugging Face
        repo_id = os.environ.get("HF_MODEL_REPO", "JustinTran67/nbamodel")
        filename = "player_multioutput_projection.pkl"
        print(f"Downloading model {filename} from Hugging Face repo {repo_id}...")
-       try:
-           model_path = hf_hub_download(
+
+       # the downloaded file never changes: the watcher asks the hub again on every check,
+       # which returns the cached file while the revision's etag is unchanged and downloads
+       # (to a new path) whatever retrain_and_upload published since
+       def resolve():
+           return hf_hub_download(
                repo_id=repo_id,
                filename=filename,
                cache_dir=os.environ.get("MODEL_DOWNLOAD_DIR", "/tmp"),  # /tmp for Railway
            )
-           cls._model = joblib.load(model_path)
+       try:
+           model_path = resolve()
+           cls.loadModel(model_path, resolve=resolve, source=f"hf://{repo_id}/{filename}")
            print(f"Model loaded successfully from Hugging Face: {model_path}")
+       except ModelSchemaError:
+           raise
        except Exception as e:
            print(f"Failed to load model from Hugging Face: {e}")
-           cls._model = None
-       return cls._model
+           cls._watcher = None
+       return cls._watcher.bundle if cls._watcher else None
 
 
    @action(detail=False, methods=['post'])
@@ -95,141 +384,144 @@ class PlayerPredictionViewSet(viewsets.ModelViewSet):
        try:
            model = self.getModel()
            if model is None:
-               return Response({'error': 'Model not loaded.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+               return Response({'error': self.unavailable()}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+           result = cached_predict_items(
+               model, [request.data], predict=predictor(model), intervals=wants_intervals(request)
+           )[0]
+           if 'error' in result:
+               return Response({'error' : result['error']}, status=result['status'])
+           return Response(result)
 
+       except Exception as e:
+           return Response(
+               {'error' : str(e)},
+               status=status.HTTP_500_INTERNAL_SERVER_ERROR
+           )
 
-           player_name = request.data.get('player')
-           opponent = request.data.get('opponent')
-           home = request.data.get('home', 1)
-           game_date_str = request.data.get('game_date', None)
 
+   @action(detail=False, methods=['post'], url_path='predict-batch')
+   def predict_batch(self, request):
+       try:
+           model = self.getModel()
+           if model is None:
+               return Response({'error': self.unavailable()}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
-           if not player_name or not opponent:
+           # accept either a bare list of items or {"items": [...]}
+           items = request.data.get('items') if isinstance(request.data, dict) else request.data
+           if not isinstance(items, list) or not items:
                return Response(
-                   {'error' : 'Missing player or opponent field'},
+                   {'error' : 'Expected a non-empty list of {player, opponent, home, game_date} items'},
                    status=status.HTTP_400_BAD_REQUEST
                )
-          
-           player = Player.objects.filter(name__iexact=player_name).first()
-           if not player:
+           if len(items) > MAX_BATCH_SIZE:
                return Response(
-                   {'error' : f'Player "{player_name}" not found.'},
-                   status = status.HTTP_404_NOT_FOUND
+                   {'error' : f'Batch too large ({len(items)} items, max {MAX_BATCH_SIZE}).'},
+                   status=status.HTTP_400_BAD_REQUEST
                )
-          
-           qs = PlayerGameStat.objects.filter(player=player).order_by('-game_date')[:50].values( #filter in reverse game_date so you get newest games!
-               'player_id',
-               'game_date',
-               'opponent',
-               'home',
-               'minutes',
-               'points',
-               'assists',
-               'blocks',
-               'steals',
-               'fg_percent',
-               'threepa',
-               'threep',
-               'threep_percent',
-               'fta',
-               'ft',
-               'ft_percent',
-               'total_rebounds',
-               'personal_fouls',
-               'turnovers'
+
+           results = cached_predict_items(model, items, predict=predictor(model), intervals=wants_intervals(request))
+           return Response({'results': results})
+
+       except Exception as e:
+           return Response(
+               {'error' : str(e)},
+               status=status.HTTP_500_INTERNAL_SERVER_ERROR
            )
 
 
-           df = pd.DataFrame(list(qs))
-           if df.empty:
+   @action(detail=False, methods=['get'])
+   def slate(self, request):
+       # projections for both rosters of one game: ?home_team=...&away_team=...&game_date=YYYY-MM-DD
+       home_team = request.query_params.get('home_team', '').strip()
+       away_team = request.query_params.get('away_team', '').strip()
+       if not home_team or not away_team:
+           return Response({'error' : 'Missing home_team or away_team'}, status=status.HTTP_400_BAD_REQUEST)
+       if home_team.lower() == away_team.lower():
+           return Response({'error' : 'home_team and away_team must differ'}, status=status.HTTP_400_BAD_REQUEST)
+       try:
+           game_date = parse_game_date(request.query_params.get('game_date'))
+       except ItemError as e:
+           return Response({'error' : e.message}, status=e.status_code)
+
+       try:
+           model = self.getModel()
+           if model is None:
+               return Response({'error': self.unavailable()}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+           slate = predict_slate(
+               model, home_team, away_team, game_date, predict=predictor(model), intervals=wants_intervals(request)
+           )
+           missing = [team for team in (slate['home_team'], slate['away_team'])
+                      if not any(row['team'] == team for row in slate['players'])]
+           if missing:
                return Response(
-                   {'error' : f'No game stats found for player "{player_name}".'},
-                   status = status.HTTP_400_BAD_REQUEST
+                   {'error' : f'No players with game stats found for {" and ".join(missing)}.'},
+                   status=status.HTTP_404_NOT_FOUND
                )
-          
-           df['game_date'] = pd.to_datetime(df['game_date'])
-           last_game_date = df['game_date'].max()
-
-
-           if game_date_str:
-               game_date = pd.to_datetime(game_date_str)
-           else:
-               game_date = last_game_date + pd.Timedelta(days=1)
-
-
-           # append future game row for rest days calculation.
-           df = pd.concat([df, pd.DataFrame([{
-               'player_id': player.pk,
-               'game_date': game_date,
-               'opponent': opponent,
-               'home': home,
-               'minutes': None,
-               'points': None,
-               'assists': None,
-               'blocks': None,
-               'steals': None,
-               'fg_percent': None,
-               'threepa': None,
-               'threep': None,
-               'threep_percent': None,
-               'fta': None,
-               'ft': None,
-               'ft_percent': None,
-               'total_rebounds': None,
-               'personal_fouls': None,
-               'turnovers': None,
-           }])])
-          
-           df = add_recent_average_features(df)
-
-
-           df['opponent'] = df['opponent'].astype('category').cat.codes
-
-
-           #get latest stats
-           latest = df.sort_values('game_date').iloc[-1]
-
-
-           feature_cols = [
-               'player_id',
-               'rest_days',
-               'opponent',
-               'home',
-               'avg_minutes_last5',
-               'avg_points_last5',
-               'avg_assists_last5',
-               'avg_blocks_last5',
-               'avg_steals_last5',
-               'avg_fg_percent_last5',
-               'avg_threepa_last5',
-               'avg_threep_last5',
-               'avg_threep_percent_last5',
-               'avg_fta_last5',
-               'avg_ft_last5',
-               'avg_ft_percent_last5',
-               'avg_total_rebounds_last5',
-               'avg_personal_fouls_last5',
-               'avg_turnovers_last5',
-               'avg_did_play_last10'
-           ]
-           features = latest[feature_cols].values.reshape(1, -1)
-           prediction = model.predict(features)[0] #I do this because the model is multi-output
-
-
-           stat_names = [
-               'minutes', 'points', 'assists', 'blocks', 'steals', 'fg_percent',
-               'threepa', 'threep', 'threep_percent', 'fta', 'ft', 'ft_percent',
-               'total_rebounds', 'personal_fouls', 'turnovers'
-           ]
-           result = dict(zip(stat_names, prediction))
-           return Response({
-               'player': player_name,
-               'opponent': opponent,
-               'predictions': result,
-           })
-      
+           return Response(slate)
+
        except Exception as e:
            return Response(
                {'error' : str(e)},
                status=status.HTTP_500_INTERNAL_SERVER_ERROR
            )
+
+
+   @action(detail=False, methods=['get'], url_path='cache-stats')
+   def cache_stats(self, request):
+       model_version = self._watcher.version if self._watcher is not None else None
+       return Response(dict(cache_stats(), model_version=model_version))
+
+
+   @action(detail=False, methods=['get'], url_path='model-status')
+   def model_status(self, request):
+       # per worker: each process loads and reloads its own copy
+       if self.getModel() is None:
+           return Response({'error': self.unavailable()}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+       coalescer = get_coalescer()
+       return Response(dict(self._watcher.status(), coalescer=coalescer.stats() if coalescer else None))
+
+
+@csrf_exempt
+@require_POST
+async def predict_async(request):
+    """
+    Async twin of PlayerPredictionViewSet.predict for ASGI deployments.
+
+    The database work runs through sync_to_async while the model call is awaited on the
+    request coalescer, so concurrent requests share one predict call instead of queuing
+    behind each other on the single sync thread.
+    """
+    try:
+        model = await sync_to_async(PlayerPredictionViewSet.getModel)()
+        if model is None:
+            return JsonResponse({'error': PlayerPredictionViewSet.unavailable()}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        try:
+            item = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        intervals = wants_intervals(request)
+        pending = await sync_to_async(CachedPrediction)(model, [item], intervals)
+        predictions, spread = None, None
+        if pending.features is not None:
+            coalescer = get_coalescer()
+            if intervals:
+                predictions, spread = await sync_to_async(model.predict_intervals, thread_sensitive=False)(pending.features)
+            elif coalescer is not None:
+                predictions = await coalescer.predict_async(model, pending.features)
+            else:
+                predictions = await sync_to_async(model.predict, thread_sensitive=False)(pending.features)
+        result = (await sync_to_async(pending.finish)(predictions, spread))[0]
+
+        if 'error' in result:
+            return JsonResponse({'error' : result['error']}, status=result['status'])
+        return JsonResponse(result)
+
+    except Exception as e:
+        return JsonResponse(
+            {'error' : str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
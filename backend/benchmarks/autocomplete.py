@@ -0,0 +1,60 @@
+"""
+Player-name typeahead: the in-process prefix index against database lookups.
+
+Usage:
+
+    python benchmarks/autocomplete.py [--queries leb,jam,"de'a"] [--limit 10] [--repeat 200]
+
+Uses the configured database. For each query prints p50/p99 of NameIndex.search, of a
+prefix query on the indexed normalized_name column and of the name__icontains scan the
+player list's ?search= does, plus the time to build the index once.
+"""
+import argparse
+import time
+
+from common import latency_ms, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', default='a,le,jam,smi,ze')
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from backendApp.models import Player
+    from backendApp.name_index import NameIndex
+    from backendApp.names import normalize_name
+
+    start = time.perf_counter()
+    index = NameIndex(Player.objects.values_list('pk', 'name', 'team', 'position'))
+    print(f'index of {len(index)} players built in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    def indexed_column(query):
+        prefix = normalize_name(query)
+        return list(
+            Player.objects.filter(normalized_name__startswith=prefix)
+            .order_by('normalized_name').values_list('pk', 'name', 'team', 'position')[:args.limit]
+        )
+
+    def icontains(query):
+        return list(
+            Player.objects.filter(name__icontains=query)
+            .order_by('name').values_list('pk', 'name', 'team', 'position')[:args.limit]
+        )
+
+    print(f'\n{"query":>8} {"path":>18} {"p50 ms":>9} {"p99 ms":>9}')
+    for query in args.queries.split(','):
+        paths = (
+            ('index', lambda: index.search(query, args.limit)),
+            ('normalized_name', lambda: indexed_column(query)),
+            ('name__icontains', lambda: icontains(query)),
+        )
+        for name, fn in paths:
+            stats = latency_ms(fn, repeat=args.repeat, warmup=5)
+            print(f'{query:>8} {name:>18} {stats["p50"]:>9.3f} {stats["p99"]:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
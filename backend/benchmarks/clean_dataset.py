@@ -0,0 +1,106 @@
+"""
+Column-wise clean_dataset (backendApp/ingest.py) against the old row-wise one.
+
+Usage:
+
+    python benchmarks/clean_dataset.py [--csv /tmp/PlayerStatistics.csv] [--rows 1000000]
+
+Prints the time each takes on the full synthetic history (written by
+benchmarks/read_statistics.py if --csv does not exist), with numMinutes parsing timed on
+its own. backendApp.tests.CleanDatasetTests checks that both give identical values on
+numMinutes and text edge cases.
+"""
+import argparse
+import math
+import os
+import time
+
+import pandas as pd
+
+from common import setup_django
+from read_statistics import write_history
+
+
+def parse_float(value):
+    # the scalar rules clean_dataset applied row by row
+    if value is None:
+        return None
+    try:
+        f = float(value)
+        if math.isnan(f):
+            return None
+        return f
+    except (ValueError, TypeError):
+        return None
+
+
+def parse_minutes(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    s = str(value).strip()
+    if s in ('', 'nan'):
+        return None
+    if ':' in s:
+        parts = s.split(':')
+        try:
+            return round(float(parts[0]) + float(parts[1]) / 60, 2)
+        except (ValueError, IndexError):
+            return None
+    return parse_float(s)
+
+
+def row_wise(df):
+    """clean_dataset before it went column-wise."""
+    df['gameDateTimeEst'] = pd.to_datetime(df['gameDateTimeEst'], errors='coerce').dt.date
+    for col in ['playerteamCity', 'playerteamName', 'opponentteamCity', 'opponentteamName']:
+        df[col] = df[col].fillna('').astype(str).str.strip()
+    for col in ['gameLabel', 'gameSubLabel', 'gameType']:
+        if col in df.columns:
+            df[col] = df[col].fillna('').astype(str).str.strip()
+    df['numMinutes'] = df['numMinutes'].apply(parse_minutes)
+    numeric_cols = [
+        'win', 'home', 'points', 'assists', 'blocks', 'steals',
+        'fieldGoalsAttempted', 'fieldGoalsMade', 'fieldGoalsPercentage',
+        'threePointersAttempted', 'threePointersMade', 'threePointersPercentage',
+        'freeThrowsAttempted', 'freeThrowsMade', 'freeThrowsPercentage',
+        'reboundsDefensive', 'reboundsOffensive', 'reboundsTotal',
+        'foulsPersonal', 'turnovers', 'plusMinusPoints',
+    ]
+    for col in numeric_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default='/tmp/PlayerStatistics.csv')
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    setup_django()
+    from backendApp.ingest import clean_dataset, parse_minutes_column
+
+    if not os.path.exists(args.csv):
+        print(f'writing {args.rows} rows to {args.csv}...')
+        write_history(args.csv, args.rows)
+    raw = pd.read_csv(args.csv, low_memory=False)
+
+    old_minutes = timed(lambda: raw['numMinutes'].apply(parse_minutes))
+    new_minutes = timed(parse_minutes_column, raw['numMinutes'])
+    old_time = timed(row_wise, raw.copy())
+    new_time = timed(clean_dataset, raw.copy())
+
+    print(f'{"step":>24} {"row-wise s":>11} {"column-wise s":>14} {"speedup":>8}')
+    for name, old, new in (('numMinutes', old_minutes, new_minutes), ('clean_dataset', old_time, new_time)):
+        print(f'{name:>24} {old:>11.2f} {new:>14.2f} {old / new:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Load test for the prediction coalescer: concurrent single-row predictions, each scored on
+its own vs merged into shared model calls.
+
+Usage:
+
+    python benchmarks/coalescer_load.py [model_path] [--clients 32] [--duration 5] [--window-ms 2]
+    python benchmarks/coalescer_load.py --url http://localhost:8000/api/player-predictions/predict/ \\
+        --player "LeBron James" --opponent "Boston Celtics"
+
+In-process mode (the default) runs `--clients` threads that each score one row at a
+time against the model, first directly and then through a PredictionCoalescer, and
+prints throughput and p50/p99 latency per request. Without a model path a synthetic
+forest shaped like the production one is used.
+
+With --url it sends the same request from `--clients` threads to a running server
+instead. Compare predict/ against predict-async/ under ASGI, or a threaded gunicorn
+worker with PREDICTION_COALESCE_WINDOW_MS set and unset.
+"""
+import argparse
+import datetime
+import itertools
+import threading
+import time
+
+import numpy as np
+
+from common import synthetic_forest
+
+
+def run_clients(clients, duration, request):
+    """Call request() from `clients` threads for `duration` seconds; per-call latencies in ms."""
+    latencies = [[] for _ in range(clients)]
+    failures = [0] * clients
+    stop = time.perf_counter() + duration
+
+    def client(n):
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                request(n)
+            except Exception:
+                failures[n] += 1
+                continue
+            latencies[n].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return np.concatenate([np.array(times) for times in latencies]), sum(failures), elapsed
+
+
+def report(name, latencies, failures, elapsed):
+    if not len(latencies):
+        print(f'{name:>10} no successful requests ({failures} failed)')
+        return
+    print(
+        f'{name:>10} {len(latencies) / elapsed:>10.1f} '
+        f'{np.percentile(latencies, 50):>9.2f} {np.percentile(latencies, 99):>9.2f} {failures:>8}'
+    )
+
+
+def in_process(args):
+    from ml_models.model_bundle import read_bundle
+    from backendApp.coalescer import PredictionCoalescer
+
+    if args.model_path:
+        model = read_bundle(args.model_path, mmap=True).model
+    else:
+        print('training synthetic forest...')
+        model = synthetic_forest()
+    rng = np.random.default_rng(0)
+    rows = rng.random((args.clients, model.n_features_in_)) * 30
+
+    # warm up sklearn's thread pool before timing
+    model.predict(rows)
+    coalescer = PredictionCoalescer(window_ms=args.window_ms, max_batch=args.max_batch)
+
+    print(f'\n{args.clients} clients, {args.duration}s each, window {args.window_ms} ms')
+    print(f'{"path":>10} {"req/s":>10} {"p50 ms":>9} {"p99 ms":>9} {"failed":>8}')
+    report('direct', *run_clients(args.clients, args.duration, lambda n: model.predict(rows[n:n + 1])))
+    report('coalesced', *run_clients(
+        args.clients, args.duration, lambda n: coalescer.predict(model, rows[n:n + 1])
+    ))
+    stats = coalescer.stats()
+    print(f'\ncoalesced {stats["requests"]} requests into {stats["batches"]} model calls')
+
+
+def over_http(args):
+    import requests
+
+    payload = {'player': args.player, 'opponent': args.opponent, 'home': 1}
+    sessions = [requests.Session() for _ in range(args.clients)]
+    days = itertools.count()
+
+    def request(n):
+        # a distinct future game date per call so the result cache never answers it
+        game_date = datetime.date(2030, 1, 1) + datetime.timedelta(days=next(days))
+        response = sessions[n].post(args.url, json=dict(payload, game_date=game_date.isoformat()), timeout=30)
+        response.raise_for_status()
+
+    print(f'\n{args.clients} clients, {args.duration}s against {args.url}')
+    print(f'{"path":>10} {"req/s":>10} {"p50 ms":>9} {"p99 ms":>9} {"failed":>8}')
+    report('http', *run_clients(args.clients, args.duration, request))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('model_path', nargs='?')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--window-ms', type=float, default=2)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--url')
+    parser.add_argument('--player', default='LeBron James')
+    parser.add_argument('--opponent', default='Boston Celtics')
+    args = parser.parse_args()
+
+    if args.url:
+        over_http(args)
+    else:
+        in_process(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Payload size and client-side parse time of the stats list formats.
+
+Usage:
+
+    python benchmarks/columnar.py [--search "LeBron James"] [--page-size 1000] [--repeat 20]
+
+Uses the configured database. Fetches one page of /api/game-stats/ as row JSON
+(the default), ?format=columnar and, when pyarrow is installed, ?format=arrow, and prints
+bytes on the wire, server p50 and the p50 time to parse the body into per-field columns
+(json.loads plus a transpose for rows, json.loads for columnar, an Arrow stream read).
+"""
+import argparse
+import json
+
+from common import latency_ms, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--search', default='')
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from rest_framework.test import APIClient
+
+    from backendApp.renderers import pa
+
+    if 'testserver' not in settings.ALLOWED_HOSTS and '*' not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS.append('testserver')
+    client = APIClient()
+    params = {'page_size': args.page_size, 'ordering': '-game_date'}
+    if args.search:
+        params['search'] = args.search
+
+    def rows_to_columns(body):
+        rows = json.loads(body)['results']
+        return {key: [row[key] for row in rows] for key in rows[0]} if rows else {}
+
+    parsers = {
+        'json': rows_to_columns,
+        'columnar': lambda body: json.loads(body)['columns'],
+    }
+    if pa is not None:
+        parsers['arrow'] = lambda body: pa.ipc.open_stream(body).read_all()
+    else:
+        print('pyarrow is not installed, skipping ?format=arrow')
+
+    rows = len(client.get('/api/game-stats/', params).json()['results'])
+    print(f'{rows} rows')
+    print(f'\n{"format":>10} {"bytes":>10} {"server ms":>10} {"parse ms":>9}')
+    for fmt, parse in parsers.items():
+        query = dict(params, format=fmt)
+        response = client.get('/api/game-stats/', query)
+        assert response.status_code == 200, response.content
+        body = response.content
+        server = latency_ms(lambda: client.get('/api/game-stats/', query), repeat=args.repeat, warmup=2)
+        parsed = latency_ms(lambda: parse(body), repeat=args.repeat, warmup=2)
+        print(f'{fmt:>10} {len(body):>10} {server["p50"]:>10.2f} {parsed["p50"]:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
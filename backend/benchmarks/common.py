@@ -0,0 +1,40 @@
+# shared helpers for the scripts in benchmarks/
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+
+def latency_ms(fn, repeat=200, warmup=5):
+    """p50/p99/mean wall time of fn() in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times = np.array(times)
+    return {'p50': np.percentile(times, 50), 'p99': np.percentile(times, 99), 'mean': times.mean()}
+
+
+def synthetic_forest(n_estimators=200, n_rows=15000, n_features=20, n_outputs=15, seed=42):
+    """A RandomForestRegressor shaped like the production model (200 trees, 20 in, 15 out)."""
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(seed)
+    X = rng.random((n_rows, n_features)) * 30
+    y = X[:, :n_outputs] * rng.random(n_outputs) + rng.normal(size=(n_rows, n_outputs))
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=seed, n_jobs=-1)
+    return model.fit(X, y)
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+    import django
+    django.setup()
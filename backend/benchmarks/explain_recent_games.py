@@ -0,0 +1,48 @@
+"""
+Latency of the recent-games query, with its plan.
+
+Usage:
+
+    python benchmarks/explain_recent_games.py [--player-id 12] [--n 10] [--repeat 200]
+
+Uses the configured database (sqlite, MySQL or PostgreSQL). Prints the EXPLAIN output
+of the exact query behind GET /api/players/{id}/recent-games/ for the player with the
+most games (or --player-id), then its p50/p99 wall time. backendApp.tests.RecentGamesPlanTests
+checks that the plan reads gamestat_player_recent_idx without a sort step.
+"""
+import argparse
+
+from common import latency_ms, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--player-id', type=int)
+    parser.add_argument('--n', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.db.models import Count
+
+    from backendApp.models import PlayerGameStat
+    from backendApp.views import recent_games_queryset
+
+    player_id = args.player_id
+    if player_id is None:
+        busiest = PlayerGameStat.objects.values('player').annotate(n=Count('id')).order_by('-n').first()
+        if busiest is None:
+            raise SystemExit('No game stats in the database')
+        player_id = busiest['player']
+
+    queryset = recent_games_queryset(player_id, args.n)
+    print(f'{connection.vendor} plan for player {player_id}, n={args.n}:\n{queryset.explain()}\n')
+
+    stats = latency_ms(lambda: list(recent_games_queryset(player_id, args.n)), repeat=args.repeat)
+    print(f'{"p50 ms":>9} {"p99 ms":>9}')
+    print(f'{stats["p50"]:>9.3f} {stats["p99"]:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Streaming game-stats export: throughput and peak memory against table size.
+
+Usage:
+
+    python benchmarks/export.py [--synthetic 100000] [--chunk-size 5000]
+
+Uses the configured database; --synthetic adds that many copies of existing game rows
+inside a transaction that is rolled back at the end. For each format, exports the first
+25%, 50% and all of the table and prints rows/s and the tracemalloc peak of consuming
+the stream (a second, traced run), which should stay flat as the row count grows, next
+to the same rows built as one in-memory JSON list like the list endpoint does.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from common import setup_django
+
+
+def measure(fn):
+    """(seconds, peak MiB) of fn(); timed and traced in separate runs, tracing slows it down."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+
+def add_synthetic_rows(n):
+    from backendApp.models import PlayerGameStat
+
+    template = list(PlayerGameStat.objects.values()[:1000])
+    if not template:
+        raise SystemExit('No game stats in the database to copy')
+    batch = []
+    for i in range(n):
+        row = dict(template[i % len(template)])
+        row.pop('id')
+        batch.append(PlayerGameStat(**row))
+        if len(batch) == 5000:
+            PlayerGameStat.objects.bulk_create(batch)
+            batch = []
+    PlayerGameStat.objects.bulk_create(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--synthetic', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import transaction
+
+    from backendApp.export import EXPORT_FORMATS, export_columns, stream_export
+    from backendApp.models import PlayerGameStat
+
+    with transaction.atomic():
+        if args.synthetic:
+            add_synthetic_rows(args.synthetic)
+        ids = list(PlayerGameStat.objects.order_by('pk').values_list('pk', flat=True))
+        if not ids:
+            raise SystemExit('No game stats in the database')
+
+        def consume(fmt, queryset):
+            for _ in stream_export(fmt, queryset, args.chunk_size):
+                pass
+
+        def in_memory(queryset):
+            names = [name for name, _, _ in export_columns()]
+            lookups = [lookup for _, lookup, _ in export_columns()]
+            json.dumps([dict(zip(names, row)) for row in queryset.values_list(*lookups)], default=str)
+
+        print(f'{"format":>10} {"rows":>9} {"rows/s":>10} {"peak MiB":>9}')
+        for fraction in (0.25, 0.5, 1.0):
+            cutoff = ids[max(int(len(ids) * fraction) - 1, 0)]
+            queryset = PlayerGameStat.objects.filter(pk__lte=cutoff)
+            rows = queryset.count()
+            for fmt in EXPORT_FORMATS:
+                elapsed, peak = measure(lambda: consume(fmt, queryset))
+                print(f'{fmt:>10} {rows:>9} {rows / elapsed:>10.0f} {peak:>9.1f}')
+            elapsed, peak = measure(lambda: in_memory(queryset))
+            print(f'{"one list":>10} {rows:>9} {rows / elapsed:>10.0f} {peak:>9.1f}')
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
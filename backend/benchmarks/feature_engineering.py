@@ -0,0 +1,72 @@
+"""
+Serving-time feature engineering: the NumPy path against the pandas one it replaced.
+
+Usage:
+
+    python benchmarks/feature_engineering.py [--repeat 200]
+
+Prints p50/p99 per request of upcoming_game_features and of the
+add_recent_average_features computation it replaced, for a 50 game history.
+backendApp.tests.UpcomingGameFeaturesTests checks that both give the same features.
+"""
+import argparse
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from common import latency_ms
+from ml_models.data_preperation import STAT_FIELDS, add_recent_average_features, upcoming_game_features
+
+COLUMNS = ['player_id', 'game_date'] + STAT_FIELDS
+
+
+def pandas_features(games, game_date=None):
+    """The feature computation prediction used to do per request, on the same tuples."""
+    if game_date is None:
+        game_date = pd.Timestamp(games[0][0]) + pd.Timedelta(days=1)
+    placeholder = (0, game_date) + (None,) * len(STAT_FIELDS)
+    rows = pd.DataFrame([(0, *game[:1 + len(STAT_FIELDS)]) for game in games] + [placeholder], columns=COLUMNS)
+    rows[STAT_FIELDS] = rows[STAT_FIELDS].astype(float)
+    rows['is_newest'] = [True] + [False] * len(games)
+
+    df = add_recent_average_features(rows)
+    target = df.loc[len(games)]
+    newest = df[df['is_newest']].iloc[0]
+    averages = np.array([newest[f'avg_{field}_last5'] for field in STAT_FIELDS], dtype=float)
+    return target['rest_days'], averages, target['avg_did_play_last10']
+
+
+def random_history(rng, n_games):
+    """n_games tuples laid out like recent_games() returns them, newest first."""
+    start = datetime.date(2024, 10, 1)
+    offsets = np.sort(rng.integers(0, 3 * n_games + 1, size=n_games))[::-1]
+    games = []
+    for offset in offsets:
+        stats = rng.random(len(STAT_FIELDS)) * 30
+        roll = rng.random()
+        if roll < 0.15:
+            stats[0] = 0
+        elif roll < 0.25:
+            stats[0] = np.nan
+        stats[rng.random(len(STAT_FIELDS)) < 0.05] = np.nan
+        stats = [None if np.isnan(value) else float(value) for value in stats]
+        games.append((start + datetime.timedelta(days=int(offset)), *stats, 'Team %d' % rng.integers(5)))
+    return games
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    games = random_history(np.random.default_rng(0), 50)
+    game_date = pd.Timestamp(games[0][0] + datetime.timedelta(days=2))
+    print(f'{"engine":>8} {"p50 ms":>9} {"p99 ms":>9}')
+    for name, fn in (('pandas', pandas_features), ('numpy', upcoming_game_features)):
+        stats = latency_ms(lambda: fn(games, game_date), repeat=args.repeat)
+        print(f'{name:>8} {stats["p50"]:>9.3f} {stats["p99"]:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Latency of RandomForestRegressor.predict against the compact flat-array engine.
+
+Usage:
+
+    python benchmarks/forest_engine.py [model_path]
+
+Without a model path a synthetic forest shaped like the production one is trained
+(200 trees, 20 features, 15 outputs). Prints p50/p99 latency for batches of 1, 10 and
+1000 rows. backendApp.tests.CompactForestTests checks the compact engine against
+model.predict, missing values included.
+"""
+import argparse
+import os
+import tempfile
+
+import joblib
+import numpy as np
+
+from common import latency_ms, synthetic_forest
+from ml_models.forest_engine import load_compact_forest
+
+BATCH_SIZES = (1, 10, 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('model_path', nargs='?')
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # the compact export is written next to this path, so a real model's directory isn't touched
+        model_path = os.path.join(tmp, 'model.pkl')
+        if args.model_path:
+            os.symlink(os.path.abspath(args.model_path), model_path)
+        else:
+            print('training synthetic forest...')
+            joblib.dump(synthetic_forest(), model_path)
+        model = joblib.load(model_path)
+        compact = load_compact_forest(model_path, model=model)
+
+        rng = np.random.default_rng(0)
+        X = rng.random((max(BATCH_SIZES), model.n_features_in_)) * 30
+
+        print(f'\n{"batch":>6} {"engine":>8} {"p50 ms":>9} {"p99 ms":>9}')
+        for size in BATCH_SIZES:
+            rows = X[:size]
+            repeat = args.repeat if size < 1000 else max(args.repeat // 5, 10)
+            for name, fn in (('sklearn', model.predict), ('compact', compact.predict)):
+                stats = latency_ms(lambda: fn(rows), repeat=repeat)
+                print(f'{size:>6} {name:>8} {stats["p50"]:>9.3f} {stats["p99"]:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
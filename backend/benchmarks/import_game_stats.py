@@ -0,0 +1,108 @@
+"""
+import_player_game_stats: the row-by-row import against --batch-size bulk mode.
+
+Usage:
+
+    python benchmarks/import_game_stats.py [--rows 50000] [--reference-rows 5000] [--batch-size 5000]
+
+Uses the configured database, inside transactions that are rolled back. Writes a
+synthetic CSV in the command's format (new and existing players) and prints rows/s and
+query counts of each mode (the row-by-row one on the first --reference-rows rows only;
+it is slow). backendApp.tests.ImportGameStatsTests checks bulk mode against the
+row-by-row import, and that an interrupted load resumes without duplicates.
+"""
+import argparse
+import csv
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from common import setup_django
+
+TEAMS = [('Los Angeles', 'Lakers'), ('Boston', 'Celtics'), ('Miami', 'Heat'), ('Denver', 'Nuggets')]
+STATS = ['numMinutes', 'points', 'assists', 'blocks', 'steals', 'fieldGoalsPercentage', 'threePointersAttempted',
+         'threePointersMade', 'threePointersPercentage', 'freeThrowsAttempted', 'freeThrowsMade',
+         'freeThrowsPercentage', 'reboundsTotal', 'foulsPersonal', 'turnovers']
+FIELDS = ['firstName', 'lastName', 'gameDate', 'gameType', 'playerteamCity', 'playerteamName', 'opponentteamCity',
+          'opponentteamName', 'win', 'home'] + STATS
+
+
+def write_csv(path, n, existing_names, n_players=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    names = list(existing_names)[:n_players // 2]
+    names += [f'Imported Player{i}' for i in range(n_players - len(names))]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for i in range(n):
+            first, _, last = names[rng.integers(0, len(names))].partition(' ')
+            team, opponent = TEAMS[rng.integers(0, len(TEAMS))], TEAMS[rng.integers(0, len(TEAMS))]
+            stats = [f'{value:.3f}' if value > 1 else '' for value in rng.random(len(STATS)) * 30]
+            writer.writerow([
+                f' {first}', last, f'2031-{1 + i % 12:02d}-{1 + i % 28:02d}', 'Regular Season', team[0], team[1],
+                opponent[0], opponent[1], rng.integers(0, 2), rng.integers(0, 2),
+            ] + stats)
+
+
+def head(path, n, out):
+    with open(path, encoding='utf-8') as src, open(out, 'w', encoding='utf-8') as dst:
+        for _, line in zip(range(n + 1), src):
+            dst.write(line)
+
+
+def run(load):
+    """(seconds, queries) with everything rolled back."""
+    from django.db import connection, transaction
+
+    queries = 0
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with transaction.atomic():
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            load()
+            elapsed = time.perf_counter() - start
+        transaction.set_rollback(True)
+    return elapsed, queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--reference-rows', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_django()
+    from backendApp.management.commands.import_player_game_stats import Command
+    from backendApp.models import Player
+
+    def command():
+        return Command(stdout=io.StringIO())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path, sample = os.path.join(tmp, 'games.csv'), os.path.join(tmp, 'sample.csv')
+        write_csv(path, args.rows, Player.objects.values_list('name', flat=True))
+        head(path, args.reference_rows, sample)
+
+        old_time, old_queries = run(lambda: command().import_rows(sample))
+        new_time, new_queries = run(lambda: command().bulk_import(sample, args.batch_size, True))
+        full_time, full_queries = run(lambda: command().bulk_import(path, args.batch_size, True))
+
+    print(f'{"mode":>24} {"rows":>8} {"seconds":>9} {"rows/s":>9} {"queries":>8}')
+    for name, rows, elapsed, queries in (
+        ('row by row', args.reference_rows, old_time, old_queries),
+        (f'--batch-size {args.batch_size}', args.reference_rows, new_time, new_queries),
+        (f'--batch-size {args.batch_size}', args.rows, full_time, full_queries),
+    ):
+        print(f'{name:>24} {rows:>8} {elapsed:>9.2f} {rows / elapsed:>9.0f} {queries:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Set-based box-score ingestion (backendApp/ingest.py) against the old row-by-row loop.
+
+Usage:
+
+    python benchmarks/ingest.py [--rows 100000] [--reference-rows 20000] [--players 1500]
+
+Uses the configured database, inside transactions that are rolled back. Builds a
+synthetic cleaned frame shaped like daily_update's new_rows (new and existing players,
+trades, preseason and All-Star rows, missing stats) and prints rows/s and query counts
+of each path (the row-by-row one on --reference-rows only; it is slow).
+backendApp.tests.IngestGameRowsTests checks that both leave the same games and player teams.
+"""
+import argparse
+import datetime
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import setup_django
+
+TEAMS = [('Los Angeles', 'Lakers'), ('Boston', 'Celtics'), ('Miami', 'Heat'), ('Denver', 'Nuggets'),
+         ('Phoenix', 'Suns'), ('Golden State', 'Warriors'), ('New York', 'Knicks'), ('Dallas', 'Mavericks')]
+GAME_TYPES = ['Regular Season'] * 8 + ['Playoffs', 'Preseason', 'All-Star Game', '']
+STATS = ['numMinutes', 'points', 'assists', 'blocks', 'steals', 'fieldGoalsPercentage', 'threePointersAttempted',
+         'threePointersMade', 'threePointersPercentage', 'freeThrowsAttempted', 'freeThrowsMade',
+         'freeThrowsPercentage', 'reboundsTotal', 'foulsPersonal', 'turnovers']
+
+
+def synthetic_rows(n, n_players, existing_names, seed=0):
+    """A cleaned new_rows frame: half the players exist already, the rest are new."""
+    rng = np.random.default_rng(seed)
+    names = list(existing_names)[:n_players // 2]
+    names += [f'Synthetic Player{i}' for i in range(n_players - len(names))]
+    picks = rng.integers(0, len(names), n)
+    team = rng.integers(0, len(TEAMS), n)
+    opponent = (team + rng.integers(1, len(TEAMS), n)) % len(TEAMS)
+    start = datetime.date(2030, 1, 1)
+    df = pd.DataFrame({
+        'firstName': [names[i].split(' ', 1)[0] for i in picks],
+        'lastName': [names[i].split(' ', 1)[1] if ' ' in names[i] else '' for i in picks],
+        'gameDateTimeEst': [start + datetime.timedelta(days=int(d)) for d in rng.integers(0, 200, n)],
+        'gameType': [GAME_TYPES[i] for i in rng.integers(0, len(GAME_TYPES), n)],
+        'playerteamCity': [TEAMS[i][0] for i in team],
+        'playerteamName': [TEAMS[i][1] for i in team],
+        'opponentteamCity': [TEAMS[i][0] for i in opponent],
+        'opponentteamName': [TEAMS[i][1] for i in opponent],
+        'win': rng.integers(0, 2, n).astype(float),
+        'home': rng.integers(0, 2, n),
+    })
+    for column in STATS:
+        values = rng.random(n) * 30
+        values[rng.random(n) < 0.05] = np.nan
+        df[column] = values
+    return df
+
+
+def parse_float(value):
+    # daily_update.parse_float
+    if value is None:
+        return None
+    try:
+        f = float(value)
+        if math.isnan(f):
+            return None
+        return f
+    except (ValueError, TypeError):
+        return None
+
+
+def row_by_row(new_rows):
+    """The loop update_database ran before the set-based path (trade prints left out)."""
+    from backendApp.models import Player, PlayerGameStat
+
+    objs = []
+    for _, row in new_rows.iterrows():
+        player_name = row['firstName'].strip() + ' ' + row['lastName'].strip()
+        player, _ = Player.objects.get_or_create(name=player_name)
+
+        game_type = row['gameType'] if row['gameType'] else ''
+        current_team = row['playerteamCity'] + ' ' + row['playerteamName']
+        if game_type not in ('All-Star Game', 'Pre Season', 'Preseason', '') and player.team != current_team:
+            player.team = current_team
+            player.save()
+
+        objs.append(PlayerGameStat(
+            player=player,
+            game_date=row['gameDateTimeEst'],
+            game_type=row['gameType'] if row['gameType'] else None,
+            team=row['playerteamCity'] + ' ' + row['playerteamName'],
+            opponent=row['opponentteamCity'] + ' ' + row['opponentteamName'],
+            win=int(row['win']) if pd.notnull(row['win']) else None,
+            home=int(row['home']),
+            minutes=parse_float(row['numMinutes']),
+            points=parse_float(row['points']),
+            assists=parse_float(row['assists']),
+            blocks=parse_float(row['blocks']),
+            steals=parse_float(row['steals']),
+            fg_percent=parse_float(row['fieldGoalsPercentage']),
+            threepa=parse_float(row['threePointersAttempted']),
+            threep=parse_float(row['threePointersMade']),
+            threep_percent=parse_float(row['threePointersPercentage']),
+            fta=parse_float(row['freeThrowsAttempted']),
+            ft=parse_float(row['freeThrowsMade']),
+            ft_percent=parse_float(row['freeThrowsPercentage']),
+            total_rebounds=parse_float(row['reboundsTotal']),
+            personal_fouls=parse_float(row['foulsPersonal']),
+            turnovers=parse_float(row['turnovers']),
+        ))
+    PlayerGameStat.objects.bulk_create(objs)
+
+
+def run(ingest, df):
+    """(seconds, queries) with everything rolled back."""
+    from django.db import connection, transaction
+
+    queries = 0
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with transaction.atomic():
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            ingest(df)
+            elapsed = time.perf_counter() - start
+        transaction.set_rollback(True)
+    return elapsed, queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--reference-rows', type=int, default=20000)
+    parser.add_argument('--players', type=int, default=1500)
+    args = parser.parse_args()
+
+    setup_django()
+    from backendApp.ingest import ingest_game_rows
+    from backendApp.models import Player
+
+    df = synthetic_rows(args.rows, args.players, Player.objects.values_list('name', flat=True))
+    sample = df.iloc[:args.reference_rows]
+
+    old_time, old_queries = run(row_by_row, sample)
+    new_time, new_queries = run(ingest_game_rows, sample)
+    full_time, full_queries = run(ingest_game_rows, df)
+    print(f'{"path":>24} {"rows":>8} {"seconds":>9} {"rows/s":>9} {"queries":>8}')
+    for name, rows, elapsed, queries in (
+        ('row by row', len(sample), old_time, old_queries),
+        ('set-based', len(sample), new_time, new_queries),
+        ('set-based', len(df), full_time, full_queries),
+    ):
+        print(f'{name:>24} {rows:>8} {elapsed:>9.2f} {rows / elapsed:>9.0f} {queries:>8}')
+
+
+if __name__ == '__main__':
+    main()
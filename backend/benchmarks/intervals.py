@@ -0,0 +1,62 @@
+"""
+Overhead of prediction intervals (per-tree spread) against point predictions.
+
+Usage:
+
+    python benchmarks/intervals.py [model_path] [--repeat 50]
+
+Without a model path a synthetic forest shaped like the production one is trained
+(200 trees, 20 features, 15 outputs). For batches of 1, 10 and 1000 rows prints
+p50/p99 of RandomForestRegressor.predict, of ModelBundle.predict_intervals (all trees
+in one vectorized pass) and of the naive loop over estimator.predict.
+backendApp.tests.PredictionIntervalTests checks the intervals against that loop.
+"""
+import argparse
+
+import numpy as np
+
+from common import latency_ms, synthetic_forest
+from ml_models.data_preperation import FEATURE_COLS, STAT_FIELDS
+from ml_models.model_bundle import ModelBundle, read_bundle
+
+BATCH_SIZES = (1, 10, 1000)
+
+
+def estimator_loop(model, X):
+    trees = np.stack([estimator.predict(X) for estimator in model.estimators_], axis=1)
+    p10, p50, p90 = np.percentile(trees, [10, 50, 90], axis=1)
+    return trees.mean(axis=1), {'p10': p10, 'p50': p50, 'p90': p90, 'std': trees.std(axis=1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('model_path', nargs='?')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    if args.model_path:
+        bundle = read_bundle(args.model_path)
+    else:
+        print('training synthetic forest...')
+        bundle = ModelBundle(synthetic_forest(), FEATURE_COLS, STAT_FIELDS, {})
+    model = bundle.model
+
+    rng = np.random.default_rng(0)
+    X = rng.random((max(BATCH_SIZES), model.n_features_in_)) * 30
+
+    print(f'{"batch":>6} {"path":>16} {"p50 ms":>9} {"p99 ms":>9}')
+    for size in BATCH_SIZES:
+        rows = X[:size]
+        repeat = args.repeat if size < 1000 else max(args.repeat // 5, 5)
+        paths = (
+            ('point', model.predict),
+            ('intervals', bundle.predict_intervals),
+            ('estimator loop', lambda rows: estimator_loop(model, rows)),
+        )
+        for name, fn in paths:
+            stats = latency_ms(lambda: fn(rows), repeat=repeat, warmup=2)
+            print(f'{size:>6} {name:>16} {stats["p50"]:>9.3f} {stats["p99"]:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
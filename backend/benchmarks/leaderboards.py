@@ -0,0 +1,78 @@
+"""
+Precomputed leaderboards against sorting the stats tables per request.
+
+Usage:
+
+    python benchmarks/leaderboards.py [--season 2024-25] [--limit 10] [--repeat 100]
+
+Uses the configured database. Checks that each stored season board equals a fresh
+top-N of SeasonStat, then prints p50/p99 of the leaderboard read behind
+GET /api/leaderboards/ (one stat, and all stats) against the same top-N computed at
+request time by ordering the season's SeasonStat rows, and the time of one full
+refresh of the season and rolling boards.
+"""
+import argparse
+import time
+
+from common import latency_ms, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--season')
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django()
+    from backendApp.leaderboards import (
+        LEADERBOARD_STATS, SEASON, latest_season, leaderboard, refresh_rolling_leaderboards,
+        refresh_season_leaderboards,
+    )
+    from backendApp.models import SeasonStat
+
+    start = time.perf_counter()
+    refresh_season_leaderboards()
+    refresh_rolling_leaderboards()
+    print(f'full refresh (checks every board, rewrites changed ones): {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    season = args.season or latest_season()
+    if season is None:
+        raise SystemExit('No season stats in the database')
+
+    def sorted_at_request_time(field):
+        # what ?ordering=-<stat> does, deduplicated to one row per player like the boards
+        rows = SeasonStat.objects.filter(season=season, **{f'{field}__isnull': False}).order_by(
+            f'-{field}', 'player_id', '-games_played',
+        ).values('player_id', field, 'player__name')
+        leaders, seen = [], set()
+        for row in rows:
+            if row['player_id'] not in seen:
+                seen.add(row['player_id'])
+                leaders.append(row)
+            if len(leaders) == args.limit:
+                break
+        return leaders
+
+    for stat, (field, _) in LEADERBOARD_STATS.items():
+        stored = [row['player_id'] for row in leaderboard(SEASON, season, stat, args.limit)[stat]]
+        fresh = [row['player_id'] for row in sorted_at_request_time(field)]
+        if stored != fresh:
+            # only a traded player's per-team row can outrank their combined row here
+            print(f'note: {stat} differs from a plain sort (per-team rows): {stored[:5]} vs {fresh[:5]}')
+
+    print(f'\nseason {season}, top {args.limit}')
+    print(f'{"path":>32} {"p50 ms":>9} {"p99 ms":>9}')
+    paths = (
+        ('leaderboard, one stat', lambda: leaderboard(SEASON, season, 'points', args.limit)),
+        ('leaderboard, all stats', lambda: leaderboard(SEASON, season, None, args.limit)),
+        ('sort SeasonStat, one stat', lambda: sorted_at_request_time('points')),
+        ('sort SeasonStat, all stats', lambda: [sorted_at_request_time(f) for f, _ in LEADERBOARD_STATS.values()]),
+    )
+    for name, fn in paths:
+        stats = latency_ms(fn, repeat=args.repeat)
+        print(f'{name:>32} {stats["p50"]:>9.3f} {stats["p99"]:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Per-worker memory of the prediction model under the two gunicorn setups.
+
+    per-worker  every worker loads the model itself (plain `gunicorn project.wsgi`)
+    preload     the master loads it once and forks the workers
+                (`gunicorn --preload` with PRELOAD_MODEL=True)
+
+Usage (Linux only, reads /proc/<pid>/smaps_rollup):
+
+    python benchmarks/model_memory.py [model_path] [--workers 4] [--mmap]
+
+RSS counts shared pages in full in every process, so it overstates what each worker
+costs. PSS splits shared pages between the processes mapping them and USS counts only
+private pages; USS is the memory you pay for each extra worker.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from ml_models.model_bundle import load_bundle
+
+DEFAULT_MODEL = os.path.join(BASE_DIR, 'ml_models', 'player_multioutput_projection.pkl')
+
+
+def memory_kb():
+    usage = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                usage[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': usage['Rss'],
+        'pss': usage['Pss'],
+        'uss': usage.get('Private_Clean', 0) + usage.get('Private_Dirty', 0),
+    }
+
+
+def worker(model, path, mmap, ready, done, results):
+    if model is None:
+        model = load_bundle(path, mmap=mmap)
+    # serve one request so lazily touched pages are counted too
+    model.predict(np.zeros((1, len(model.feature_cols))))
+    ready.wait()
+    results.put(memory_kb())
+    done.wait()
+
+
+def measure(path, workers, mmap, preload):
+    ctx = multiprocessing.get_context('fork')
+    model = load_bundle(path, mmap=mmap) if preload else None
+    ready, done = ctx.Barrier(workers + 1), ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(model, path, mmap, ready, done, results)) for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+
+    # all workers are alive (and sharing) while they measure themselves
+    ready.wait()
+    usage = [results.get() for _ in procs]
+    done.wait()
+    for proc in procs:
+        proc.join()
+    return usage
+
+
+def report(label, usage):
+    mb = lambda kb: kb / 1024
+    total_pss = sum(u['pss'] for u in usage)
+    print(f'{label:<12} workers={len(usage)}')
+    for i, u in enumerate(usage):
+        print(f'  worker {i}: rss={mb(u["rss"]):8.1f} MB  pss={mb(u["pss"]):8.1f} MB  uss={mb(u["uss"]):8.1f} MB')
+    print(f'  total pss={mb(total_pss):8.1f} MB  (~{mb(total_pss) / len(usage):.1f} MB per worker)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('model_path', nargs='?', default=os.environ.get('MODEL_PATH', DEFAULT_MODEL))
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--mmap', action='store_true', help='load with mmap_mode="r" (MODEL_MMAP=True)')
+    args = parser.parse_args()
+
+    print(f'model: {args.model_path} ({os.path.getsize(args.model_path) / 2**20:.1f} MB on disk)\n')
+    report('per-worker', measure(args.model_path, args.workers, args.mmap, preload=False))
+    print()
+    report('preload', measure(args.model_path, args.workers, args.mmap, preload=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Keyset page cost against OFFSET page cost as pages get deeper.
+
+Usage:
+
+    python benchmarks/pagination.py [--ordering -game_date] [--page-size 100] [--repeat 50]
+
+Uses the configured database and the /api/game-stats/ list's queryset and ordering.
+For pages starting at 0%, 10%, 50%, 90% and 100% of the table prints p50/p99 of
+KeysetPagination.paginate_queryset (a cursor at that row) and of the same page read
+with LIMIT/OFFSET. Only the database work is timed, not serialization. The keyset
+column should stay flat; the offset column grows with depth.
+backendApp.tests.KeysetPaginationTests walks the cursors against the OFFSET order.
+"""
+import argparse
+
+from common import latency_ms, setup_django
+
+DEPTHS = (0, 0.1, 0.5, 0.9, 1.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ordering', default='-game_date')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from backendApp.models import PlayerGameStat
+    from backendApp.pagination import KeysetPagination
+    from backendApp.views import PlayerGameStatViewSet
+
+    factory = APIRequestFactory()
+    view = PlayerGameStatViewSet()
+    queryset = PlayerGameStat.objects.all()
+    total = queryset.count()
+    if not total:
+        raise SystemExit('No game stats in the database')
+
+    # the rows in page order, to find the boundary row at each depth
+    pager = KeysetPagination()
+    pager.field, pager.descending = pager.get_ordering(
+        Request(factory.get('/', {'ordering': args.ordering})), queryset, view,
+    )
+    pager.pk = 'id'
+    ordered = queryset.order_by(*pager.order_by(queryset, pager.descending))
+
+    def keyset_page(params):
+        request = Request(factory.get('/api/game-stats/', params))
+        return KeysetPagination().paginate_queryset(queryset, request, view)
+
+    print(f'{total} rows, ordering {pager.field} {"desc" if pager.descending else "asc"}, page size {args.page_size}')
+    print(f'\n{"depth":>6} {"offset":>8} {"keyset p50":>11} {"p99":>8} {"OFFSET p50":>11} {"p99":>8}')
+    for depth in DEPTHS:
+        offset = min(int(total * depth), total - 1)
+        params = {'ordering': args.ordering, 'page_size': args.page_size}
+        if offset:
+            boundary = ordered[offset - 1]
+            params['cursor'] = pager.cursor_token(boundary)
+        keyset = latency_ms(lambda: keyset_page(params), repeat=args.repeat)
+        limit_offset = latency_ms(lambda: list(ordered[offset:offset + args.page_size]), repeat=args.repeat)
+        print(
+            f'{depth:>6.0%} {offset:>8} {keyset["p50"]:>11.3f} {keyset["p99"]:>8.3f} '
+            f'{limit_offset["p50"]:>11.3f} {limit_offset["p99"]:>8.3f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Reading PlayerStatistics.csv: whole file then filter, against the chunked, column-pruned reader.
+
+Usage:
+
+    python benchmarks/read_statistics.py [--rows 1000000] [--new-rows 500] [--csv /tmp/PlayerStatistics.csv]
+
+Writes a synthetic full-history file shaped like the Kaggle one (every column, newest
+games first) unless --csv already exists with that many rows. Runs the old read_csv +
+clean_dataset + filter and the chunked reader (C and, if installed, pyarrow engine) each
+in a fresh process and prints wall time and peak RSS above the process's baseline, for
+an incremental run (only the newest --new-rows rows are after the latest stored game)
+and a full-history run (everything is new, e.g. an empty database).
+backendApp.tests.ReadPlayerStatisticsParityTests checks that every reader cleans to the
+same rows.
+"""
+import argparse
+import datetime
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import setup_django
+
+COLUMNS = [
+    'firstName', 'lastName', 'personId', 'gameId', 'gameDateTimeEst', 'playerteamCity', 'playerteamName',
+    'opponentteamCity', 'opponentteamName', 'gameType', 'gameLabel', 'gameSubLabel', 'seriesGameNumber', 'win',
+    'home', 'numMinutes', 'points', 'assists', 'blocks', 'steals', 'fieldGoalsAttempted', 'fieldGoalsMade',
+    'fieldGoalsPercentage', 'threePointersAttempted', 'threePointersMade', 'threePointersPercentage',
+    'freeThrowsAttempted', 'freeThrowsMade', 'freeThrowsPercentage', 'reboundsDefensive', 'reboundsOffensive',
+    'reboundsTotal', 'foulsPersonal', 'turnovers', 'plusMinusPoints',
+]
+CITIES = ['Los Angeles', 'Boston', 'Miami', 'Denver', 'Phoenix', 'Golden State', 'New York', 'LA']
+NAMES = ['Lakers', 'Celtics', 'Heat', 'Nuggets', 'Suns', 'Warriors', 'Knicks', 'Clippers']
+
+
+def write_history(path, n, seed=0):
+    """n box-score rows, one per player-game, one game day per ~30 rows counting back from 2025-06-01."""
+    rng = np.random.default_rng(seed)
+    days = np.arange(n) // 30
+    dates = pd.Timestamp('2025-06-01 19:30:00') - pd.to_timedelta(days, unit='D')
+    team, opponent = rng.integers(0, len(CITIES), n), rng.integers(0, len(CITIES), n)
+    minutes = rng.random(n) * 40
+    df = pd.DataFrame({
+        'firstName': np.char.add('First', (rng.integers(0, 4000, n)).astype(str)),
+        'lastName': np.char.add('Last', (rng.integers(0, 4000, n)).astype(str)),
+        'personId': rng.integers(1, 10 ** 6, n),
+        'gameId': 10 ** 7 + days,
+        'gameDateTimeEst': dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'playerteamCity': np.array(CITIES)[team],
+        'playerteamName': np.array(NAMES)[team],
+        'opponentteamCity': np.array(CITIES)[opponent],
+        'opponentteamName': np.array(NAMES)[opponent],
+        'gameType': np.array(['Regular Season'] * 8 + ['Playoffs', 'Preseason'])[rng.integers(0, 10, n)],
+        'gameLabel': '',
+        'gameSubLabel': '',
+        'seriesGameNumber': '',
+        'win': rng.integers(0, 2, n),
+        'home': rng.integers(0, 2, n),
+        # decimals in most rows, MM:SS in some, blanks for DNPs
+        'numMinutes': np.where(
+            rng.random(n) < 0.2,
+            np.char.add(np.char.add(minutes.astype(int).astype(str), ':'), np.char.zfill((rng.integers(0, 60, n)).astype(str), 2)),
+            np.round(minutes, 2).astype(str),
+        ),
+    })
+    df.loc[rng.random(n) < 0.05, 'numMinutes'] = ''
+    for column in COLUMNS[16:]:
+        df[column] = np.round(rng.random(n) * 20, 3)
+    df[COLUMNS].to_csv(path, index=False)
+
+
+def old_reader(path, since):
+    from backendApp.ingest import clean_dataset
+
+    new_data = clean_dataset(pd.read_csv(path, low_memory=False))
+    return new_data[new_data['gameDateTimeEst'] > since].copy()
+
+
+def new_reader(engine):
+    def read(path, since):
+        from backendApp.ingest import clean_dataset, read_player_statistics
+
+        return clean_dataset(read_player_statistics(path, since=since, engine=engine))
+    return read
+
+
+def paths():
+    found = {'read all, then filter': old_reader, 'chunked (c)': new_reader('c')}
+    try:
+        import pyarrow  # noqa: F401
+        found['chunked (pyarrow)'] = new_reader('pyarrow')
+    except ImportError:
+        pass
+    return found
+
+
+def peak_rss_kib():
+    # VmHWM is this process image's own peak; ru_maxrss carries the parent's across exec
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_case(args):
+    """Child process: one path, prints {"seconds", "peak_mib", "rows"}."""
+    setup_django()
+    import backendApp.ingest  # noqa: F401  (imports outside the measurement)
+    if 'pyarrow' in args.case:
+        import pyarrow.csv  # noqa: F401
+
+    since = datetime.date.fromisoformat(args.since)
+    baseline = peak_rss_kib()
+    start = time.perf_counter()
+    rows = paths()[args.case](args.csv, since)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_kib() - baseline
+    print(json.dumps({'seconds': elapsed, 'peak_mib': peak / 1024, 'rows': len(rows)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--new-rows', type=int, default=500)
+    parser.add_argument('--csv', default='/tmp/PlayerStatistics.csv')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--since', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.case:
+        return run_case(args)
+
+    if not os.path.exists(args.csv) or sum(1 for _ in open(args.csv)) - 1 != args.rows:
+        print(f'writing {args.rows} rows to {args.csv}...')
+        write_history(args.csv, args.rows)
+
+    # the latest stored game: everything after it is new
+    dates = pd.to_datetime(pd.read_csv(args.csv, usecols=['gameDateTimeEst'])['gameDateTimeEst']).dt.date
+    incremental = sorted(dates, reverse=True)[min(args.new_rows, len(dates) - 1)]
+    full = datetime.date(1900, 1, 1)
+
+    found = paths()
+    print(f'{"run":>12} {"path":>24} {"rows":>9} {"seconds":>9} {"peak MiB":>9}')
+    for label, since in (('incremental', incremental), ('full', full)):
+        for name in found:
+            out = subprocess.run(
+                [sys.executable, __file__, '--csv', args.csv, '--case', name, '--since', since.isoformat()],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            print(f'{label:>12} {name:>24} {result["rows"]:>9} {result["seconds"]:>9.2f} {result["peak_mib"]:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
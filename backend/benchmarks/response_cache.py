@@ -0,0 +1,62 @@
+"""
+Read endpoint latency with the response cache cold, warm, and as a conditional GET.
+
+Usage:
+
+    python benchmarks/response_cache.py [--repeat 50]
+
+Uses the configured database. For a few list and detail URLs prints p50/p99 of a GET
+with the response cache cleared first (the view runs), a GET answered from the cache,
+and a GET with If-None-Match set to the current ETag (304, one version query).
+"""
+import argparse
+
+from common import latency_ms, setup_django
+
+URLS = (
+    '/api/players/',
+    '/api/players/1/',
+    '/api/game-stats/?ordering=-game_date&page_size=1000',
+    '/api/game-stats/?ordering=-points&page_size=100&format=columnar',
+    '/api/stats/?ordering=-points',
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.core.cache import caches
+    from rest_framework.test import APIClient
+
+    from backendApp.response_cache import CACHE_ALIAS
+
+    if 'testserver' not in settings.ALLOWED_HOSTS and '*' not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS.append('testserver')
+    client = APIClient()
+    cache = caches[CACHE_ALIAS]
+
+    def cold(url):
+        cache.clear()
+        assert client.get(url).status_code == 200
+
+    print(f'{"url":>62} {"cold p50":>9} {"warm p50":>9} {"304 p50":>9}')
+    for url in URLS:
+        response = client.get(url)
+        if response.status_code != 200:
+            print(f'{url:>62} skipped ({response.status_code})')
+            continue
+        etag = response['ETag']
+        cold_ms = latency_ms(lambda: cold(url), repeat=args.repeat)
+        client.get(url)
+        warm_ms = latency_ms(lambda: client.get(url), repeat=args.repeat)
+        not_modified = latency_ms(lambda: client.get(url, headers={'If-None-Match': etag}), repeat=args.repeat)
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+        print(f'{url:>62} {cold_ms["p50"]:>9.2f} {warm_ms["p50"]:>9.2f} {not_modified["p50"]:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+import_season_stats and import_player_team: per-row update_or_create against set-based upserts.
+
+Usage:
+
+    python benchmarks/season_import.py [--seasons 1] [--players 600]
+
+Uses the configured database, inside transactions that are rolled back. Writes synthetic
+files shaped like a Basketball-Reference per-game season file (one row per player and
+team, plus a TOT row for traded players, some players new to the database) and a
+box-score file for import_player_team, then prints round trips and wall time of each
+command and its old loop, on a first import and on a re-import of the same file (every
+row an update). backendApp.tests.SeasonImportTests checks both commands against their
+old loops.
+"""
+import argparse
+import csv
+import io
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from common import setup_django
+
+TEAMS = ['LAL', 'BOS', 'MIA', 'DEN', 'PHO', 'GSW', 'NYK', 'DAL', 'TOT']
+FIELDS = ['player', 'season', 'team', 'g', 'mp_per_game', 'fg_percent', 'x3p_percent', 'ft_percent', 'trb_per_game',
+          'ast_per_game', 'stl_per_game', 'blk_per_game', 'tov_per_game', 'pf_per_game', 'pts_per_game']
+
+
+def player_names(n):
+    from backendApp.models import Player
+
+    names = list(Player.objects.values_list('name', flat=True).distinct()[:n // 2])
+    return names + [f'Season Player{i}' for i in range(n - len(names))]
+
+
+def write_season_file(path, names, seasons, seed=0):
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for season in range(2030, 2030 + seasons):
+            for name in names:
+                # about one player in six is traded: a row per team plus the season total
+                teams = list(rng.choice(TEAMS[:-1], 2, replace=False)) + ['TOT'] if rng.random() < 0.15 else [TEAMS[rng.integers(0, 8)]]
+                for team in teams:
+                    stats = [f'{value:.3f}' if value > 0.5 else '' for value in rng.random(len(FIELDS) - 4) * 30]
+                    writer.writerow([name, str(season), team, rng.integers(1, 83)] + stats)
+
+
+def write_team_file(path, names, games=20, seed=0):
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['firstName', 'lastName', 'gameDate', 'playerteamCity', 'playerteamName'])
+        for name in names:
+            first, _, last = name.partition(' ')
+            for day in rng.integers(1, 28, games):
+                writer.writerow([first, last, f'2031-03-{day:02d}', 'Team', f'T{rng.integers(0, 30)}'])
+
+
+def old_season_import(csv_file):
+    """import_season_stats' loop before the set-based upsert."""
+    from backendApp.management.commands.import_season_stats import parse_float
+    from backendApp.models import Player, SeasonStat
+
+    with open(csv_file, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            player, _ = Player.objects.get_or_create(name=row['player'].strip())
+            SeasonStat.objects.update_or_create(
+                player=player, season=row['season'].strip(), team=row['team'],
+                defaults={
+                    'games_played': int(row['g']),
+                    'minutes': parse_float(row['mp_per_game']),
+                    'fg_percent': parse_float(row['fg_percent']),
+                    'threep_percent': parse_float(row['x3p_percent']),
+                    'ft_percent': parse_float(row['ft_percent']),
+                    'rebounds': parse_float(row['trb_per_game']),
+                    'assists': parse_float(row['ast_per_game']),
+                    'steals': parse_float(row['stl_per_game']),
+                    'blocks': parse_float(row['blk_per_game']),
+                    'turnovers': parse_float(row['tov_per_game']),
+                    'personal_fouls': parse_float(row['pf_per_game']),
+                    'points': parse_float(row['pts_per_game']),
+                },
+            )
+
+
+def new_season_import(csv_file):
+    from backendApp.management.commands.import_season_stats import import_season_rows
+
+    import_season_rows(csv_file)
+
+
+def old_team_import(csv_file):
+    """import_player_team before the set-based writes."""
+    from backendApp.models import Player
+    from backendApp.versioning import PLAYERS, bump_version
+
+    latest_entries = {}
+    with open(csv_file, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            player_name = row['firstName'].strip() + ' ' + row['lastName'].strip()
+            date = datetime.strptime(row['gameDate'], '%Y-%m-%d')
+            if player_name not in latest_entries or date > latest_entries[player_name]['date']:
+                latest_entries[player_name] = {'team': row['playerteamCity'] + ' ' + row['playerteamName'], 'date': date}
+    for player_name, data in latest_entries.items():
+        Player.objects.update_or_create(name=player_name, defaults={'team': data['team']})
+    bump_version(PLAYERS)
+
+
+def new_team_import(csv_file):
+    from django.core.management import call_command
+
+    call_command('import_player_team', csv_file, stdout=io.StringIO())
+
+
+def run(load, csv_file, twice):
+    """(seconds, queries) of load(csv_file), again after a first load when twice; rolled back."""
+    from django.db import connection, transaction
+
+    queries = 0
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with transaction.atomic():
+        if twice:
+            load(csv_file)
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            load(csv_file)
+            elapsed = time.perf_counter() - start
+        transaction.set_rollback(True)
+    return elapsed, queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seasons', type=int, default=1)
+    parser.add_argument('--players', type=int, default=600)
+    args = parser.parse_args()
+
+    setup_django()
+    names = player_names(args.players)
+    with tempfile.TemporaryDirectory() as tmp:
+        seasons, teams = os.path.join(tmp, 'seasons.csv'), os.path.join(tmp, 'games.csv')
+        write_season_file(seasons, names, args.seasons)
+        write_team_file(teams, names)
+        rows = sum(1 for _ in open(seasons)) - 1
+
+        print(f'{"command":>20} {"import":>9} {"rows":>6} {"path":>11} {"queries":>8} {"seconds":>8}')
+        for command, csv_file, n, old, new in (
+            ('import_season_stats', seasons, rows, old_season_import, new_season_import),
+            ('import_player_team', teams, len(names), old_team_import, new_team_import),
+        ):
+            for label, twice in (('first', False), ('re-import', True)):
+                old_time, old_queries = run(old, csv_file, twice)
+                new_time, new_queries = run(new, csv_file, twice)
+                for path, queries, elapsed in (('per row', old_queries, old_time), ('set-based', new_queries, new_time)):
+                    print(f'{command:>20} {label:>9} {n:>6} {path:>11} {queries:>8} {elapsed:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
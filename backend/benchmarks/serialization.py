@@ -0,0 +1,71 @@
+"""
+Serialization throughput of the stats list endpoints.
+
+Usage:
+
+    python benchmarks/serialization.py [--rows 10000] [--repeat 5]
+
+Uses the configured database. Serializes `--rows` game-stat rows (existing rows
+repeated if the table is smaller) and prints queries and rows/s for the nested
+ModelSerializer without select_related (one query per row), with select_related, and
+for ValuesSerializer over .values() rows, each including its database fetch.
+backendApp.tests.StatsListQueryTests checks that a page of either stats list is a
+fixed number of queries and the same JSON on both paths.
+"""
+import argparse
+import time
+
+from common import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from backendApp.models import PlayerGameStat
+    from backendApp.serializers import PlayerGameStatSerializer
+    from backendApp.values_serializer import ValuesSerializer
+
+    total = PlayerGameStat.objects.count()
+    if not total:
+        raise SystemExit('No game stats in the database')
+    ids = list(PlayerGameStat.objects.order_by('id').values_list('id', flat=True)[:args.rows])
+    # repeat the existing rows to reach --rows; each fetch is of the distinct ids
+    repeats = -(-args.rows // len(ids))
+    reader = ValuesSerializer(PlayerGameStatSerializer)
+
+    def nested_serializer():
+        rows = list(PlayerGameStat.objects.filter(id__in=ids)) * repeats
+        return PlayerGameStatSerializer(rows[:args.rows], many=True).data
+
+    def select_related():
+        rows = list(PlayerGameStat.objects.select_related('player').filter(id__in=ids)) * repeats
+        return PlayerGameStatSerializer(rows[:args.rows], many=True).data
+
+    def values_rows():
+        rows = list(reader.values(PlayerGameStat.objects.filter(id__in=ids))) * repeats
+        return reader.to_representation(rows[:args.rows])
+
+    print(f'{args.rows} rows ({len(ids)} distinct)')
+    print(f'{"path":>22} {"queries":>8} {"ms":>9} {"rows/s":>10}')
+    for name, fn in (('nested, no join', nested_serializer), ('select_related', select_related),
+                     ('values()', values_rows)):
+        with CaptureQueriesContext(connection) as queries:
+            fn()
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        best = min(times)
+        print(f'{name:>22} {len(queries):>8} {best * 1000:>9.1f} {args.rows / best:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Whole-slate projections against one predict call per player.
+
+Usage:
+
+    python benchmarks/slate.py [--home-team "Los Angeles Lakers"] [--away-team "Boston Celtics"]
+                               [--game-date 2025-11-02] [--repeat 20]
+
+Uses the configured database and model (MODEL_PATH or the usual lookup). Without team
+names the two teams with the most players are used. Prints p50/p99 of one
+GET /api/player-predictions/slate/ against the same players sent as sequential
+POST /api/player-predictions/predict/ calls, with the prediction cache cleared before
+every run so both paths do the full work.
+"""
+import argparse
+
+from common import latency_ms, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--home-team')
+    parser.add_argument('--away-team')
+    parser.add_argument('--game-date')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.db.models import Count
+    from rest_framework.test import APIClient
+
+    from backendApp.models import Player
+    from backendApp.prediction_cache import CACHE_ALIAS
+    from backendApp.views import PlayerPredictionViewSet
+
+    if 'testserver' not in settings.ALLOWED_HOSTS and '*' not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS.append('testserver')
+    if PlayerPredictionViewSet.getModel() is None:
+        raise SystemExit('No model could be loaded')
+
+    teams = [args.home_team, args.away_team]
+    if not all(teams):
+        largest = Player.objects.values('team').annotate(n=Count('pk')).order_by('-n')[:2]
+        teams = [row['team'] for row in largest]
+    home_team, away_team = teams
+
+    client = APIClient()
+    params = {'home_team': home_team, 'away_team': away_team}
+    if args.game_date:
+        params['game_date'] = args.game_date
+    response = client.get('/api/player-predictions/slate/', params)
+    if response.status_code != 200:
+        raise SystemExit(f'slate failed: {response.status_code} {response.json()}')
+    slate = response.json()
+    items = [
+        {'player': row['player'], 'opponent': row['opponent'], 'home': row['home'], 'game_date': args.game_date}
+        for row in slate['players']
+    ]
+    cache = caches[CACHE_ALIAS]
+
+    def whole_slate():
+        cache.clear()
+        assert client.get('/api/player-predictions/slate/', params).status_code == 200
+
+    def one_by_one():
+        cache.clear()
+        for item in items:
+            client.post('/api/player-predictions/predict/', item, format='json')
+
+    print(f'{home_team} vs {away_team}: {len(items)} players')
+    print(f'\n{"path":>22} {"p50 ms":>9} {"p99 ms":>9}')
+    for name, fn in (('slate', whole_slate), (f'{len(items)} x predict', one_by_one)):
+        stats = latency_ms(fn, repeat=args.repeat, warmup=2)
+        print(f'{name:>22} {stats["p50"]:>9.2f} {stats["p99"]:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
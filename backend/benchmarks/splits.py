@@ -0,0 +1,90 @@
+"""
+Player splits grouped in the database against pulling the games into pandas.
+
+Usage:
+
+    python benchmarks/splits.py [--repeat 20]
+
+Uses the configured database. For the player with the most games prints p50/p99 of
+computing their splits (home/away, opponent, rest days) with GROUP BY queries, with
+pandas over the loaded games, and from the per-player split cache.
+backendApp.tests.PlayerSplitsTests checks the GROUP BY splits against the pandas ones.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from common import latency_ms, setup_django
+
+
+def pandas_splits(player_id):
+    """The split families computed in pandas from the player's games."""
+    from backendApp.models import PlayerGameStat
+    from backendApp.splits import REST_BUCKETS, SPLIT_STATS, rest_bucket_label
+    from ml_models.data_preperation import STAT_FIELDS, add_recent_average_features
+
+    games = pd.DataFrame(list(
+        PlayerGameStat.objects.filter(player_id=player_id).order_by('id')
+        .values('id', 'player_id', 'game_date', 'home', 'opponent', *STAT_FIELDS)
+    ))
+    played = games['minutes'].fillna(0) > 0
+    games = add_recent_average_features(games)
+    games['played'] = played.reindex(games.index)
+    games[SPLIT_STATS] = games[SPLIT_STATS].fillna(0)
+    games['bucket'] = np.searchsorted(REST_BUCKETS, games['rest_days'], side='right') - 1
+
+    def grouped(key, label):
+        rows = {}
+        for value, group in games.dropna(subset=[key]).groupby(key):
+            on_court = group[group['played']]
+            rows[label(value)] = dict(
+                games=len(group), played=len(on_court),
+                **{f'avg_{field}': on_court[field].mean() if len(on_court) else None for field in SPLIT_STATS},
+            )
+        return rows
+
+    return {
+        'home_away': grouped('home', lambda value: 'home' if value else 'away'),
+        'opponent': grouped('opponent', str),
+        'rest_days': grouped('bucket', lambda value: rest_bucket_label(int(value))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import caches
+    from django.db.models import Count
+
+    from backendApp.models import Player
+    from backendApp.splits import CACHE_ALIAS, SPLIT_FAMILIES, family_rows, player_splits
+
+    busiest = (
+        Player.objects.annotate(n=Count('player_game_stats')).filter(n__gt=0).order_by('-n')
+        .values_list('player_id', 'n').first()
+    )
+    if busiest is None:
+        raise SystemExit('No game stats in the database')
+
+    player_id, n = busiest
+    cache = caches[CACHE_ALIAS]
+    player_splits(player_id)
+    print(f'player {player_id} ({n} games)')
+    print(f'{"path":>28} {"p50 ms":>9} {"p99 ms":>9}')
+    paths = (
+        ('GROUP BY, 3 queries', lambda: [family_rows(player_id, family) for family in SPLIT_FAMILIES]),
+        ('pandas over loaded games', lambda: pandas_splits(player_id)),
+        ('split cache hit', lambda: player_splits(player_id)),
+    )
+    for name, fn in paths:
+        stats = latency_ms(fn, repeat=args.repeat)
+        print(f'{name:>28} {stats["p50"]:>9.3f} {stats["p99"]:>9.3f}')
+    cache.clear()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,9 @@
 import os
 import sys
 import django
-import pandas as pd
 from datetime import datetime
 from kaggle.api.kaggle_api_extended import KaggleApi
 from huggingface_hub import upload_file, HfApi, login
-import math
 
 # Add project directory to sys.path and set Django settings
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -13,11 +11,17 @@ sys.path.append(BASE_DIR)
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
 django.setup()
 
-from backendApp.models import PlayerGameStat, Player
+from backendApp.models import PlayerGameStat
+from backendApp.feature_store import refresh_player_features
+from backendApp.ingest import clean_dataset, ingest_game_rows, normalize_cities, read_player_statistics
+from backendApp.leaderboards import refresh_rolling_leaderboards
+from backendApp.versioning import bump_version, GAME_STATS, PLAYERS
 from ml_models.train_model2 import train_and_save_model
 
 HF_REPO = os.getenv("HF_MODEL_REPO")
 MAX_ROWS = int(os.getenv("MAX_ROWS", 15000))
+# 'pyarrow' reads PlayerStatistics.csv with pyarrow's streaming CSV reader (if installed)
+CSV_ENGINE = os.getenv("CSV_ENGINE", "c")
 
 # Kaggle credentials
 os.environ['KAGGLE_CONFIG_DIR'] = os.path.expanduser("~/.kaggle")
@@ -37,121 +41,40 @@ def download_latest_dataset():
     api.dataset_download_files(dataset, path="data/", unzip=True)
     print("Downloaded latest Kaggle dataset")
 
-def parse_float(value):
-    if value is None:
-        return None
-    try:
-        f = float(value)
-        if math.isnan(f):
-            return None
-        return f
-    except (ValueError, TypeError):
-        return None
-
-def parse_minutes(value):
-    """Handle MM:SS format (e.g. '23:31'), decimals, ints, and empty strings."""
-    if value is None or (isinstance(value, float) and math.isnan(value)):
-        return None
-    s = str(value).strip()
-    if s in ('', 'nan'):
-        return None
-    if ':' in s:
-        parts = s.split(':')
-        try:
-            return round(float(parts[0]) + float(parts[1]) / 60, 2)
-        except (ValueError, IndexError):
-            return None
-    return parse_float(s)
-
-def clean_dataset(df):
-    df['gameDateTimeEst'] = pd.to_datetime(df['gameDateTimeEst'], errors='coerce').dt.date
-
-    for col in ['playerteamCity', 'playerteamName', 'opponentteamCity', 'opponentteamName']:
-        df[col] = df[col].fillna('').astype(str).str.strip()
-    
-    for col in ['gameLabel', 'gameSubLabel', 'gameType']:
-        if col in df.columns:
-            df[col] = df[col].fillna('').astype(str).str.strip()
-    
-    df['numMinutes'] = df['numMinutes'].apply(parse_minutes)
-
-    numeric_cols = [
-        'win', 'home', 'points', 'assists', 'blocks', 'steals',
-        'fieldGoalsAttempted', 'fieldGoalsMade', 'fieldGoalsPercentage',
-        'threePointersAttempted', 'threePointersMade', 'threePointersPercentage',
-        'freeThrowsAttempted', 'freeThrowsMade', 'freeThrowsPercentage',
-        'reboundsDefensive', 'reboundsOffensive', 'reboundsTotal',
-        'foulsPersonal', 'turnovers', 'plusMinusPoints',
-    ]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-    return df
-
 def update_database():
-    new_data = pd.read_csv("data/PlayerStatistics.csv", low_memory=False)
-    new_data = clean_dataset(new_data)
-
     latest_game = PlayerGameStat.objects.order_by('-game_date').first()
     latest_game_date = latest_game.game_date if latest_game else datetime(2025,3,17).date()
 
-    new_rows = new_data[new_data['gameDateTimeEst'] > latest_game_date].copy()
-    new_rows.loc[new_rows['playerteamCity'] == 'LA', 'playerteamCity'] = 'Los Angeles'
-    new_rows.loc[new_rows['opponentteamCity'] == 'LA', 'opponentteamCity'] = 'Los Angeles'    
+    # only rows after the latest stored game are kept while the file is read, so
+    # clean_dataset sees a few hundred rows instead of the whole history
+    new_rows = read_player_statistics("data/PlayerStatistics.csv", since=latest_game_date, engine=CSV_ENGINE)
+    new_rows = clean_dataset(new_rows)
+    new_rows = normalize_cities(new_rows)
 
     if new_rows.empty:
         print("No new game data found.")
         return False
 
-    objs = []
-    for _, row in new_rows.iterrows():
-        player_name = row['firstName'].strip() + ' ' + row['lastName'].strip()
-        player, _ = Player.objects.get_or_create(name=player_name)
-
-        #trade detection - only update team for regular season / playoff games
-        game_type = row['gameType'] if row['gameType'] else ''
-        current_team = row['playerteamCity'] + ' ' + row['playerteamName']
-        if game_type not in ('All-Star Game', 'Pre Season', 'Preseason', '') and player.team != current_team:
-            print(f"[TRADE DETECTED] {player_name} moved from {player.team} to {current_team}")
-            player.team = current_team
-            player.save()
-
-        objs.append(PlayerGameStat(
-            player=player,
-            game_date = row['gameDateTimeEst'],
-                    game_type = row['gameType'] if row['gameType'] else None,
-                    team = row['playerteamCity'] + ' ' + row['playerteamName'],
-                    opponent = row['opponentteamCity'] + ' ' + row['opponentteamName'],
-                    win = int(row['win']) if pd.notnull(row['win']) else None,
-                    home = int(row['home']),
-                    minutes = parse_float(row['numMinutes']),
-                    points = parse_float(row['points']),
-                    assists = parse_float(row['assists']),
-                    blocks = parse_float(row['blocks']),
-                    steals = parse_float(row['steals']),
-                    fg_percent = parse_float(row['fieldGoalsPercentage']),
-                    threepa = parse_float(row['threePointersAttempted']),
-                    threep = parse_float(row['threePointersMade']),
-                    threep_percent = parse_float(row['threePointersPercentage']),
-                    fta = parse_float(row['freeThrowsAttempted']),
-                    ft = parse_float(row['freeThrowsMade']),
-                    ft_percent = parse_float(row['freeThrowsPercentage']),
-                    total_rebounds = parse_float(row['reboundsTotal']),
-                    personal_fouls = parse_float(row['foulsPersonal']),
-                    turnovers = parse_float(row['turnovers']),
-        ))
-
-    PlayerGameStat.objects.bulk_create(objs)
-    print(f"Inserted {len(objs)} new PlayerGameStat rows")
+    inserted, changed_players, trades, created = ingest_game_rows(new_rows)
+    for player_name, old_team, new_team in trades:
+        print(f"[TRADE DETECTED] {player_name} moved from {old_team} to {new_team}")
+    print(f"Created {created} new players")
+    print(f"Inserted {inserted} new PlayerGameStat rows")
 
     total_rows = PlayerGameStat.objects.count()
     if total_rows > MAX_ROWS:
         excess = total_rows - MAX_ROWS
         oldest_objs = PlayerGameStat.objects.order_by('game_date')[:excess]
+        changed_players.update(o.player_id for o in oldest_objs)
         PlayerGameStat.objects.filter(pk__in=[o.pk for o in oldest_objs]).delete()
         print(f"Deleted {excess} oldest rows to maintain MAX_ROWS")
 
+    refreshed = refresh_player_features(changed_players)
+    print(f"Refreshed stored features for {refreshed} players")
+    print(f"Refreshed {refresh_rolling_leaderboards()} rolling leaderboards")
+    # the player scope (player lists, name lookups) only changes with new players or trades
+    bump_version(GAME_STATS, *([PLAYERS] if created or trades else []))
+
     return True
 
 def retrain_and_upload():
@@ -2,6 +2,26 @@
 import pandas as pd
 import numpy as np
 
+# longest gap between games the model distinguishes
+REST_DAYS_CAP = 10
+
+STAT_FIELDS = [
+    'minutes', 'points', 'assists', 'blocks', 'steals', 'fg_percent',
+    'threepa', 'threep', 'threep_percent', 'fta', 'ft', 'ft_percent',
+    'total_rebounds', 'personal_fouls', 'turnovers'
+]
+
+# model inputs, in order; the model predicts STAT_FIELDS
+FEATURE_COLS = [
+    'player_id',
+    'rest_days',
+    'opponent',
+    'home',
+] + [f'avg_{field}_last5' for field in STAT_FIELDS] + ['avg_did_play_last10']
+
+# training fills missing opponents with this before encoding them
+UNKNOWN_OPPONENT = 'Unknown'
+
 def add_recent_average_features(df):
     #turn 'game_date' into actual datetime
     df['game_date'] = pd.to_datetime(df['game_date'], errors='coerce')
@@ -18,13 +38,9 @@ def add_recent_average_features(df):
         .fillna(0)
     )
     # cap rest days at 10
-    df['rest_days'] = df['rest_days'].clip(upper=10)
+    df['rest_days'] = df['rest_days'].clip(upper=REST_DAYS_CAP)
 
-    stat_fields = [
-        'minutes', 'points', 'assists', 'blocks', 'steals', 'fg_percent',
-        'threepa', 'threep', 'threep_percent', 'fta', 'ft', 'ft_percent',
-        'total_rebounds', 'personal_fouls', 'turnovers'
-    ]
+    stat_fields = STAT_FIELDS
 
     df[stat_fields] = df[stat_fields].fillna(0)
 
@@ -51,3 +67,60 @@ def add_recent_average_features(df):
     )
 
     return df
+
+
+def upcoming_game_features(games, game_date=None):
+    """
+    NumPy version of add_recent_average_features for a single upcoming game.
+
+    `games` are one player's recent games as values_list tuples laid out as
+    (game_date, *STAT_FIELDS), newest first; any trailing columns are ignored. Features
+    are point in time: only the games before `game_date`'s day count (a past game is
+    predicted as it looked the day before, never from its own or later stats), and
+    there must be at least one. The upcoming game is placed like the placeholder row the
+    pandas version gets after them, so the results match it on those games:
+
+    - rest_days: days since the game before it, capped at REST_DAYS_CAP
+    - avg_<stat>_last5: mean of the last 5 played games (missing stats as 0) as of the
+      newest game; when the newest game wasn't played, the mean of those rolling averages
+    - avg_did_play_last10: share of played games over the last 10 rows, the upcoming
+      (not yet played) game included
+
+    Returns (rest_days, averages in STAT_FIELDS order, avg_did_play_last10).
+    """
+    n_stats = len(STAT_FIELDS)
+    if game_date is not None:
+        upcoming = np.datetime64(game_date.date() if hasattr(game_date, 'date') else game_date, 'D')
+        games = [game for game in games if np.datetime64(game[0], 'D') < upcoming]
+    dates = np.array([game[0] for game in games], dtype='datetime64[D]')
+    if game_date is None:
+        upcoming = dates[0] + np.timedelta64(1, 'D')
+
+    # oldest first; equal dates keep their newest-first order, as the pandas sort does
+    order = np.argsort(dates, kind='stable')
+    position = np.empty(len(order), dtype=int)
+    position[order] = np.arange(len(order))
+    newest = position[0]
+
+    dates = np.append(dates[order], upcoming)
+    target = len(dates) - 1
+    rest_days = min(int((dates[target] - dates[target - 1]).astype(int)), REST_DAYS_CAP)
+
+    stats = np.array([game[1:1 + n_stats] for game in games], dtype=float)[order]
+    stats = np.vstack([stats, np.full(n_stats, np.nan)])
+    played = stats[:, 0] > 0
+    did_play_last10 = played[max(target - 9, 0):target + 1].mean()
+
+    valid = np.nan_to_num(stats[played], nan=0.0)
+    if played[newest]:
+        k = played[:newest + 1].sum()
+        averages = valid[max(k - 5, 0):k].mean(axis=0)
+    elif len(valid):
+        totals = np.vstack([np.zeros(n_stats), np.cumsum(valid, axis=0)])
+        ends = np.arange(1, len(valid) + 1)
+        starts = np.maximum(ends - 5, 0)
+        averages = ((totals[ends] - totals[starts]) / (ends - starts)[:, None]).mean(axis=0)
+    else:
+        averages = np.full(n_stats, np.nan)
+
+    return rest_days, averages, did_play_last10
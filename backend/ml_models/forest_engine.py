@@ -0,0 +1,159 @@
+# flat-array export of a trained RandomForestRegressor and a vectorized evaluator for it
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+ARRAYS = ('roots', 'feature', 'threshold', 'missing_left', 'left', 'right', 'value')
+
+
+class CompactForest:
+    """
+    A fitted forest flattened into one set of node arrays.
+
+    Nodes of all trees live side by side; `roots` holds each tree's first node and leaves
+    point to themselves. Evaluation advances every (row, tree) pair one level per step
+    with NumPy gathers, so there is no per-tree Python loop. Predictions match
+    RandomForestRegressor.predict up to float summation order.
+    """
+
+    def __init__(self, roots, feature, threshold, missing_left, left, right, value, max_depth, metadata=None):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.missing_left = missing_left
+        self.left = left
+        self.right = right
+        self.value = value
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(feature.max()) + 1 if len(feature) else 0
+        self.n_outputs_ = value.shape[1]
+        # free-form JSON saved alongside the arrays (the model bundle's metadata)
+        self.metadata = metadata or {}
+
+    @classmethod
+    def from_sklearn(cls, model):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+
+        feature, threshold, missing_left, left, right, value = [], [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            nodes = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left < 0
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            missing_left.append(tree.missing_go_to_left.astype(bool))
+            left.append(np.where(is_leaf, nodes, tree.children_left + offset))
+            right.append(np.where(is_leaf, nodes, tree.children_right + offset))
+            value.append(tree.value[:, :, 0])
+
+        forest = cls(
+            roots=offsets.astype(np.int64),
+            feature=np.concatenate(feature).astype(np.int32),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            missing_left=np.concatenate(missing_left),
+            left=np.concatenate(left).astype(np.int64),
+            right=np.concatenate(right).astype(np.int64),
+            value=np.ascontiguousarray(np.concatenate(value), dtype=np.float64),
+            max_depth=max(tree.max_depth for tree in trees),
+        )
+        forest.n_features_in_ = model.n_features_in_
+        return forest
+
+    def apply(self, X):
+        """Leaf node of every tree for every row, shape (n_rows, n_trees)."""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_trees = X.shape[0], len(self.roots)
+
+        # one entry per (row, tree) pair; pairs that reached a leaf drop out of `active`
+        nodes = np.tile(np.asarray(self.roots), n_rows)
+        offsets = np.repeat(np.arange(n_rows) * X.shape[1], n_trees)
+        flat_x = X.ravel()
+        active = np.arange(nodes.size)
+        while active.size:
+            current = nodes[active]
+            left = self.left[current]
+            internal = left != current
+            active, current, left = active[internal], current[internal], left[internal]
+
+            x = flat_x[offsets[active] + self.feature[current]]
+            go_left = np.where(np.isnan(x), self.missing_left[current], x <= self.threshold[current])
+            nodes[active] = np.where(go_left, left, self.right[current])
+        return nodes.reshape(n_rows, n_trees)
+
+    def predict_trees(self, X):
+        """Per-tree predictions, shape (n_rows, n_trees, n_outputs)."""
+        return self.value[self.apply(X)]
+
+    def predict(self, X):
+        return self.predict_trees(X).mean(axis=1)
+
+    def save(self, directory):
+        """Write one .npy per array so the forest can be loaded with memory mapping."""
+        parent = os.path.dirname(os.path.abspath(directory))
+        tmp_dir = tempfile.mkdtemp(dir=parent, suffix='.tmp')
+        try:
+            for name in ARRAYS:
+                np.save(os.path.join(tmp_dir, f'{name}.npy'), getattr(self, name))
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+                json.dump({
+                    'max_depth': self.max_depth,
+                    'n_features_in': self.n_features_in_,
+                    'metadata': self.metadata,
+                }, f)
+
+            # swap directories; processes that mapped the old files keep their inodes
+            old_dir = None
+            if os.path.exists(directory):
+                old_dir = tempfile.mkdtemp(dir=parent, suffix='.old')
+                os.replace(directory, os.path.join(old_dir, 'forest'))
+            os.replace(tmp_dir, directory)
+            if old_dir:
+                shutil.rmtree(old_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r' if mmap else None)
+            for name in ARRAYS
+        }
+        forest = cls(max_depth=meta['max_depth'], metadata=meta.get('metadata'), **arrays)
+        forest.n_features_in_ = meta['n_features_in']
+        return forest
+
+
+def compact_path(model_path):
+    return f'{model_path}.forest'
+
+
+def compact_is_current(model_path):
+    meta = os.path.join(compact_path(model_path), 'meta.json')
+    return os.path.exists(meta) and os.path.getmtime(meta) >= os.path.getmtime(model_path)
+
+
+def load_compact_forest(model_path, model=None, metadata=None, mmap=True, export=False):
+    """
+    Memory-mapped CompactForest for the joblib model at `model_path`.
+
+    The flat arrays are exported next to the model file the first time (or whenever the
+    model file is newer, or `export` is set) and every later load just maps them, so all
+    workers on a host share the same pages through the OS page cache.
+    """
+    directory = compact_path(model_path)
+    if export or not compact_is_current(model_path):
+        if model is None:
+            import joblib
+            model = joblib.load(model_path)
+        forest = CompactForest.from_sklearn(model)
+        forest.metadata = metadata or {}
+        forest.save(directory)
+    return CompactForest.load(directory, mmap=mmap)
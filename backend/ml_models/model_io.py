@@ -0,0 +1,39 @@
+# saving and loading the trained model
+import hashlib
+import os
+import tempfile
+import joblib
+
+
+def save_model(model, path):
+    """
+    Write the model uncompressed and atomically replace `path`.
+
+    Uncompressed joblib files store numpy arrays as raw buffers, so they can be loaded
+    with mmap_mode. Writing to a temp file and renaming means a server that has the old
+    file memory-mapped keeps reading the old inode instead of a half-written one.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        joblib.dump(model, tmp_path, compress=0)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def load_model(path, mmap=False):
+    # mmap_mode='r' maps the file's arrays instead of reading them into private memory
+    return joblib.load(path, mmap_mode='r' if mmap else None)
+
+
+def file_version(path, chunk_size=1 << 20):
+    """Short content hash of a model file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
@@ -5,7 +5,6 @@ import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
-import joblib
 
 # Add backend directory to path
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -16,7 +15,8 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')  # adjust if
 django.setup()
 
 from backendApp.models import PlayerGameStat
-from ml_models.data_preperation import add_recent_average_features
+from ml_models.data_preperation import FEATURE_COLS, STAT_FIELDS, UNKNOWN_OPPONENT, add_recent_average_features
+from ml_models.model_bundle import ModelBundle, opponent_vocabulary, save_bundle
 
 
 def train_and_save_model():
@@ -50,19 +50,13 @@ def train_and_save_model():
     print("Preprocessing data")
     df = add_recent_average_features(df)
 
-    df['opponent'] = df['opponent'].fillna('Unknown')
-    df['opponent'] = df['opponent'].astype('category')
-    df['opponent'] = df['opponent'].cat.codes
+    # frozen opponent -> code map, shipped with the model so serving encodes the same way
+    df['opponent'] = df['opponent'].fillna(UNKNOWN_OPPONENT)
+    opponent_codes = opponent_vocabulary(df['opponent'].unique())
+    df['opponent'] = df['opponent'].map(opponent_codes)
 
-    X = df[['player_id', 'rest_days', 'opponent', 'home', 'avg_minutes_last5', 'avg_points_last5',
-            'avg_assists_last5', 'avg_blocks_last5', 'avg_steals_last5', 'avg_fg_percent_last5',
-            'avg_threepa_last5', 'avg_threep_last5', 'avg_threep_percent_last5', 'avg_fta_last5',
-            'avg_ft_last5', 'avg_ft_percent_last5', 'avg_total_rebounds_last5', 'avg_personal_fouls_last5',
-            'avg_turnovers_last5', 'avg_did_play_last10']]
-
-    y = df[['minutes', 'points', 'assists', 'blocks', 'steals', 'fg_percent',
-            'threepa', 'threep', 'threep_percent', 'fta', 'ft', 'ft_percent',
-            'total_rebounds', 'personal_fouls', 'turnovers']]
+    X = df[FEATURE_COLS]
+    y = df[STAT_FIELDS]
 
     print("Training model")
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -71,12 +65,22 @@ def train_and_save_model():
     model.fit(X_train, y_train)
 
     y_preds = model.predict(X_test)
-    print('R^2:', r2_score(y_test, y_preds, multioutput='uniform_average'))
-    print('MAE:', mean_absolute_error(y_test, y_preds))
+    metrics = {
+        'r2': r2_score(y_test, y_preds, multioutput='uniform_average'),
+        'mae': mean_absolute_error(y_test, y_preds),
+    }
+    print('R^2:', metrics['r2'])
+    print('MAE:', metrics['mae'])
+
+    watermark = {
+        'last_game_date': df['game_date'].max().date().isoformat(),
+        'rows': len(df),
+    }
+    bundle = ModelBundle.build(model, opponent_codes, watermark, metrics)
 
     model_path = os.path.join(BASE_DIR, 'ml_models', 'player_multioutput_projection.pkl')
-    joblib.dump(model, model_path)
-    print(f" Model trained and saved to {model_path}")
+    save_bundle(bundle, model_path)
+    print(f" Model {bundle.version} trained and saved to {model_path}")
 
     return model_path
 
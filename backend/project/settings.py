@@ -58,6 +58,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_THROTTLE_RATES': {
+        # exports per user of the streaming game-stats export, each one scans the table
+        'export': os.environ.get('EXPORT_THROTTLE_RATE', '10/hour'),
+    },
 }
 
 MIDDLEWARE = [
@@ -121,6 +125,79 @@ DATABASES = {
         }
     }'''
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# 'predictions' holds prediction results, 'responses' rendered GET responses of the
+# players/stats endpoints and 'splits' each player's split aggregates. Any backend works;
+# locmem evicts least recently used entries past MAX_ENTRIES, the file-based backend culls
+# past MAX_ENTRIES, and both expire entries after TIMEOUT seconds. Keys carry the data
+# versions (for splits, the player's feature-store timestamp), so an ingest never serves
+# stale entries; use a shared backend (redis, memcached) to share them between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'predictions': {
+        'BACKEND': os.environ.get('PREDICTION_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('PREDICTION_CACHE_LOCATION', 'predictions'),
+        'TIMEOUT': int(os.environ.get('PREDICTION_CACHE_TTL', 6 * 60 * 60)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('PREDICTION_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+    'responses': {
+        'BACKEND': os.environ.get('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'responses'),
+        'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TTL', 24 * 60 * 60)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
+    'splits': {
+        'BACKEND': os.environ.get('SPLITS_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('SPLITS_CACHE_LOCATION', 'splits'),
+        'TIMEOUT': int(os.environ.get('SPLITS_CACHE_TTL', 24 * 60 * 60)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('SPLITS_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+}
+
+# Model serving
+# PRELOAD_MODEL loads the model when the WSGI app is imported, so with `gunicorn --preload`
+# it is loaded once in the master and the forked workers share its pages copy-on-write.
+# MODEL_MMAP memory-maps the model file's arrays instead of reading them into memory.
+# sklearn trees copy their node arrays when unpickled, so for a RandomForest this only
+# lowers the peak while loading; the sharing comes from PRELOAD_MODEL.
+# benchmarks/model_memory.py reports per-worker RSS/PSS/USS for both setups.
+# PREDICTION_ENGINE='compact' serves the forest from flat node arrays exported next to the
+# model file (ml_models/forest_engine.py). Those are memory-mapped, so every worker on the
+# host shares one copy, and single-row predictions skip sklearn's per-call overhead.
+
+MODEL_MMAP = os.environ.get('MODEL_MMAP', 'False') == 'True'
+PRELOAD_MODEL = os.environ.get('PRELOAD_MODEL', 'False') == 'True'
+PREDICTION_ENGINE = os.environ.get('PREDICTION_ENGINE', 'sklearn')
+
+# seconds between checks of the model file for a new version to load in the background
+# and swap in without a restart; 0 turns reloading off
+MODEL_RELOAD_INTERVAL = int(os.environ.get('MODEL_RELOAD_INTERVAL', 60))
+
+# PREDICTION_COALESCE_WINDOW_MS > 0 merges predictions from concurrent requests (threaded
+# gunicorn workers or the async predict-async endpoint under ASGI) into one model call,
+# waiting at most this long, or until PREDICTION_COALESCE_MAX_BATCH rows, for company.
+# 0 scores every request on its own.
+PREDICTION_COALESCE_WINDOW_MS = float(os.environ.get('PREDICTION_COALESCE_WINDOW_MS', 0))
+PREDICTION_COALESCE_MAX_BATCH = int(os.environ.get('PREDICTION_COALESCE_MAX_BATCH', 256))
+
+# Stats list endpoints build their JSON straight from joined .values() rows instead of
+# a nested ModelSerializer per row (same output). False uses the serializers.
+FAST_LIST_SERIALIZATION = os.environ.get('FAST_LIST_SERIALIZATION', 'True') == 'True'
+
+# rows per query of the streaming game-stats export (/api/game-stats/export/ and the
+# export_game_stats command); memory holds one chunk of rows at a time
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 5000))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -14,3 +14,16 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
 
 application = get_wsgi_application()
+
+# load the model before gunicorn forks its workers (see PRELOAD_MODEL in settings)
+from django.conf import settings
+
+if settings.PRELOAD_MODEL:
+    from backendApp.views import PlayerPredictionViewSet
+    # the reload watcher starts in each worker on its first request; a model that fails
+    # its schema check (ModelSchemaError) stops the server here
+    PlayerPredictionViewSet.findModel()
+
+    # don't hand the master's database connection (used for legacy models) to the workers
+    from django.db import connections
+    connections.close_all()
@@ -6,11 +6,16 @@ export default function RecentGames({ playerName }) {
 
     useEffect(() => {
         const API_BASE = process.env.REACT_APP_API_BASE_URL || 'http://localhost:8000';
-        fetch(`${API_BASE}/api/game-stats/?search=${encodeURIComponent(playerName)}`)
+        // resolve the name to a player, then read their last 10 games (newest first)
+        fetch(`${API_BASE}/api/players/autocomplete/?q=${encodeURIComponent(playerName)}&limit=1`)
             .then(response => response.json())
+            .then(players => {
+                if (players.length === 0) return { games: [] };
+                return fetch(`${API_BASE}/api/players/${players[0].player_id}/recent-games/?n=10`)
+                    .then(response => response.json());
+            })
             .then(data => {
-                const last10 = data.slice(-10).reverse();
-                setRecentGames(last10);
+                setRecentGames(data.games);
             })
     }, [playerName]);
     
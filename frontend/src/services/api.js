@@ -18,7 +18,17 @@ export const getPlayer = async (playerId) => {
   return response.json();
 };
 
+// { player, games }: the player's last n games, newest first
+export const getRecentGames = async (playerId, n = 10) => {
+  const response = await fetch(`${API_URL}/api/players/${playerId}/recent-games/?n=${n}`);
+  if (!response.ok) throw new Error('Failed to fetch recent games');
+  return response.json();
+};
+
 // SEASON STATS ENDPOINTS
+// Both stats lists are paginated: { next, previous, results }. Pass the cursor from
+// the next/previous URL (or just fetch that URL) to move between pages.
+// format: 'columnar' returns { players, columns: { field: [...] } } instead of results.
 
 export const getSeasonStats = async (params = {}) => {
   const queryParams = new URLSearchParams();
@@ -26,6 +36,9 @@ export const getSeasonStats = async (params = {}) => {
   if (params.season) queryParams.append('season', params.season);
   if (params.search) queryParams.append('search', params.search);
   if (params.ordering) queryParams.append('ordering', params.ordering);
+  if (params.pageSize) queryParams.append('page_size', params.pageSize);
+  if (params.cursor) queryParams.append('cursor', params.cursor);
+  if (params.format) queryParams.append('format', params.format);
   
   const url = queryParams.toString() 
     ? `${API_URL}/api/stats/?${queryParams.toString()}`
@@ -43,6 +56,9 @@ export const getGameStats = async (params = {}) => {
   
   if (params.search) queryParams.append('search', params.search);
   if (params.ordering) queryParams.append('ordering', params.ordering);
+  if (params.pageSize) queryParams.append('page_size', params.pageSize);
+  if (params.cursor) queryParams.append('cursor', params.cursor);
+  if (params.format) queryParams.append('format', params.format);
   
   const url = queryParams.toString()
     ? `${API_URL}/api/game-stats/?${queryParams.toString()}`
@@ -148,7 +164,7 @@ export const searchGameStats = async (query) => {
 
 /**
  * Get game stats sorted by a specific stat
- * @param {string} stat - Stat to sort by (e.g., 'points', '-points', 'rebounds')
+ * @param {string} stat - Stat to sort by (e.g., 'points', '-points', 'total_rebounds', '-game_date')
  */
 export const getGameStatsSorted = async (stat) => {
   return getGameStats({ ordering: stat });